@@ -0,0 +1,122 @@
+# File: bench_save.py
+# Project: CS 422 Project 1
+# Authors: ARA Team
+# Creation date: 10-18-2026
+# Description: Benchmark for saving a chapter's notes. Compares the old per-section save
+#              (find_one + update per section) with Database.updateUserNotes, reporting
+#              round trips and latency against the number of sections. Needs a running
+#              mongod and works in a scratch database that is dropped afterwards.
+#              Usage: python Code/MongoDB/bench_save.py [mongodb uri]
+
+# Modifications:
+# Date        Author       Change
+# ----------- ------------ -----------------------------------------------------
+# 10-18-2026  ARA Team     Initial creation of the file
+# 10-18-2026  ARA Team     Saves carry the chapter version, so the new path is measured without merges
+# ==============================================================================
+
+import sys  # Used to read the command line arguments
+import time  # Used for timing
+import statistics  # Used for the median latency
+import io  # Used to silence the save messages while timing
+import contextlib
+from pymongo import monitoring
+
+from datastructs import Database, notesDS, MONGO_URI
+
+BENCH_DB_NAME = "ara_save_benchmark"
+SECTION_COUNTS = [1, 5, 10, 20, 40, 80]
+REPEATS = 20
+
+
+# Counts the commands sent to the server, i.e. the round trips
+class CommandCounter(monitoring.CommandListener):
+    def __init__(self):
+        self.count = 0
+
+    def started(self, event):
+        self.count += 1
+
+    def succeeded(self, event):
+        pass
+
+    def failed(self, event):
+        pass
+
+
+def legacyUpdateUserNotes(usersCollection, username, notedata):
+    # The save path before it was reworked, kept here for comparison
+    pdfID = notedata.pdfID
+    user = usersCollection.find_one({"username": username})
+    for note in user['notes']:
+        if note['pdf_id'] == pdfID:
+            usersCollection.update_one(
+                {"username": username, "notes.pdf_id": pdfID},
+                {"$set": {"notes.$.chapter.chapter_title": notedata.chapterTitle}}
+            )
+            usersCollection.update_one(
+                {"username": username, "notes.pdf_id": pdfID},
+                {"$set": {"notes.$.chapter.sections": []}}
+            )
+            for section in notedata.sections:
+                usersCollection.update_one(
+                    {"username": username, "notes.pdf_id": pdfID},
+                    {"$push": {"notes.$.chapter.sections": section}}
+                )
+            break
+
+
+def makeNotes(sectionCount):
+    # A chapter with sectionCount sections of realistic size
+    notes = notesDS("Benchmark Chapter", "Benchmark chapter title")
+    for i in range(sectionCount):
+        notes.addSection(f"Section {i}", "Some notes about this section. " * 20)
+    return notes
+
+
+def saveVersioned(db, username, notes):
+    # Saves notes made from the stored version and moves them to the version written, like
+    # the app does. A stale version would be merged, which takes extra round trips.
+    version = db.updateUserNotes(username, notes)
+    assert version == notes.version + 1, f"save from version {notes.version} was merged into version {version}"
+    notes.version = version
+
+
+def measure(save, counter):
+    # Returns (round trips per save, median latency in ms)
+    latencies = []
+    counter.count = 0
+    with contextlib.redirect_stdout(io.StringIO()):
+        for _ in range(REPEATS):
+            start = time.perf_counter()
+            save()
+            latencies.append((time.perf_counter() - start) * 1000)
+    return counter.count / REPEATS, statistics.median(latencies)
+
+
+def main():
+    uri = sys.argv[1] if len(sys.argv) > 1 else MONGO_URI
+    counter = CommandCounter()
+    db = Database(uri, BENCH_DB_NAME, "schema.json", event_listeners=[counter])
+    if not db.connected:
+        print("Benchmark needs a running MongoDB server.")
+        return
+
+    usersCollection = db.getCollection("users")
+    username = "benchmark_user"
+    print(f"{'sections':>8} {'old trips':>10} {'old ms':>8} {'new trips':>10} {'new ms':>8}")
+    try:
+        for sectionCount in SECTION_COUNTS:
+            notes = makeNotes(sectionCount)
+            notes.version = db.updateUserNotes(username, notes)  # Make sure the chapter exists for both paths
+
+            oldTrips, oldMs = measure(lambda: legacyUpdateUserNotes(usersCollection, username, notes), counter)
+            newTrips, newMs = measure(lambda: saveVersioned(db, username, notes), counter)
+            print(f"{sectionCount:>8} {oldTrips:>10.0f} {oldMs:>8.2f} {newTrips:>10.0f} {newMs:>8.2f}")
+    finally:
+        db.client.drop_database(BENCH_DB_NAME)
+        db.close()
+
+
+if __name__ == "__main__":
+    main()
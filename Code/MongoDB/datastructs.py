@@ -14,26 +14,193 @@
 # 04-22-2024  John Hooft   Implemented the logic for the updateUserNotes function in the Database class.
 # 04-24-2024  John Hooft   Added deleteSection() function to Database class.
 # 04-27-2024  Ethan Hyde   Fixed getNotes function to pull correctly from the DB
+# 10-18-2026  ARA Team     Added ConnectionManager, one shared pooled connection per process
+# 10-18-2026  ARA Team     updateUserNotes writes a chapter in one round trip
+# 10-18-2026  ARA Team     getNotes only fetches the requested chapter, users collection indexes
+# 10-18-2026  ARA Team     Stable section IDs, SectionStore (one document per section) layout
+# 10-18-2026  ARA Team     notesChanges and updateSections() for incremental saves
+# 10-18-2026  ARA Team     toDict()/fromDict() for notesDS and notesChanges, SectionStore.checkConnection()
+# 10-18-2026  ARA Team     NotesStore interface, STORAGE_BACKEND selects MongoDB or SQLite
+# 10-18-2026  ARA Team     CircuitBreaker, an unreachable server fails fast and is probed in the background
+# 10-18-2026  ARA Team     getAllNotes() on every store, used to build the notes search index
+# 10-18-2026  ARA Team     bulkUpdateNotes() and exportNotes() for batch import and export
+# 10-18-2026  ARA Team     STORAGE_BACKEND = "service" uses the notes service
+# 10-18-2026  ARA Team     Chapter versions with compare-and-set writes, merging on conflict, deleteSection() by ID
+# 10-18-2026  ARA Team     unionNotes() keeps the stored title when the newer notes never loaded it
+# 10-18-2026  ARA Team     SectionStore keeps the chapter version in the sections collection, one bulk write per save
+# 10-18-2026  ARA Team     requireIndexes(), SectionStore creates the indexes before writing if it started offline
+# 10-18-2026  ARA Team     saveBatch(), SectionStore sends many version checked saves in one bulk write
+# 10-18-2026  ARA Team     notesDS.fromDict() gives a section without an ID a new one
 # ==============================================================================
 
 import os
 import json
-from pymongo import MongoClient
+import copy
+import time
+import threading
+import uuid
+from collections import OrderedDict
+from pymongo import MongoClient, InsertOne, ReplaceOne, UpdateOne, DeleteMany
+from pymongo.errors import BulkWriteError, ConnectionFailure
+
+# Connection settings shared by the whole application
+MONGO_URI = "mongodb://localhost:27017/"
+DB_NAME = "active_reading_assistant"
+MAX_POOL_SIZE = 10              # Most sockets the shared client keeps open to the server
+MIN_POOL_SIZE = 0               # Sockets kept open even when idle
+HEALTH_CHECK_INTERVAL = 30      # Seconds a successful ping is trusted before pinging again
+BREAKER_BASE_BACKOFF = 1.0      # Seconds to fail fast after the server stops answering
+BREAKER_MAX_BACKOFF = 60.0      # Longest wait between background probes of a down server
+
+# Where notes are stored: "mongo" uses the MongoDB server above, "sqlite" a local SQLite
+# file (see sqlitestore.py) and needs no server, which suits a single user's install.
+# "service" goes through the notes service at SERVICE_URL (see notesservice.py), so a
+# whole class shares its database connections.
+STORAGE_BACKEND = "mongo"
+SQLITE_PATH = os.path.join(os.path.expanduser("~"), ".ara", "notes.db")
+SERVICE_URL = "http://127.0.0.1:8422/"
+
+# How MongoDB stores notes: "embedded" keeps them in arrays inside each users document,
+# "normalized" keeps one document per section (see SectionStore)
+NOTES_LAYOUT = "embedded"
+
+# Times a save is merged with the stored chapter and retried before giving up
+MAX_SAVE_ATTEMPTS = 5
+
+# sectionID of the document that holds a chapter's version in the normalized layout
+CHAPTER_HEADER_ID = "_chapter"
+# Fields read from the sections collection, for sections and chapter headers
+SECTION_FIELDS = {"_id": 0, "sectionID": 1, "sectionTitle": 1, "sectionNotes": 1, "chapter_title": 1, "version": 1}
+DUPLICATE_KEY = 11000 # MongoDB error code for a write refused by a unique index
+
+# Parsed schema files, so every Database shares one read of each
+_schemaCache = {}
+
+# Raised when a save kept conflicting with saves made elsewhere and was given up
+class SaveConflict(Exception):
+    pass
+
+
+# What the application needs from the place notes are kept. Database and SectionStore keep
+# them in MongoDB, SQLiteStore (sqlitestore.py) in a local file. getNotesStore() returns
+# the one STORAGE_BACKEND selects.
+class NotesStore:
+    connected = False # Whether the store can be reached
+
+    def checkConnection(self, wait=True):
+        # Checks again whether the store can be reached. With wait=False the check runs
+        # in the background and the last known state is returned right away.
+        return self.connected
+
+    def markOffline(self):
+        # Called when an operation could not reach the store
+        pass
+
+    def getNotes(self, username, pdfID):
+        # Loads a user's notes for one PDF as a notesDS, or None if there are none
+        raise NotImplementedError
+
+    def getAllNotes(self, username):
+        # Loads every chapter of a user's notes as a list of notesDS
+        raise NotImplementedError
+
+    # Every chapter has a version that goes up with each write. A save says which version
+    # it was made from and is only written if the chapter is still at that version, checked
+    # by the write itself, so this costs no extra round trip. If the chapter was saved
+    # elsewhere in the meantime (the same user on another computer), the save is merged
+    # with what is stored, by section ID, and tried again.
+
+    def updateUserNotes(self, username, notedata):
+        # Saves a whole chapter (a notesDS) made from version notedata.version, None if the
+        # chapter wasn't stored. On a conflict the sections only the stored chapter has are
+        # kept. Returns the chapter's new version.
+        for attempt in range(MAX_SAVE_ATTEMPTS):
+            version = self.writeChapter(username, notedata, notedata.version)
+            if version is not None:
+                return version
+            print("Chapter was saved elsewhere, merging.")
+            current = self.getNotes(username, notedata.pdfID)
+            if current is not None:
+                notedata = notesDS.fromDict(unionNotes(current.toDict(), notedata.toDict()))
+            else:
+                notedata = notesDS.fromDict(dict(notedata.toDict(), version=None))
+        raise SaveConflict(f"Chapter {notedata.pdfID} kept changing, save not written")
+
+    def updateSections(self, username, changes):
+        # Saves only what changed in a chapter (a notesChanges) since version
+        # changes.baseVersion. Changes are applied by section ID, so on a conflict they are
+        # simply sent again on top of the stored chapter: sections edited elsewhere keep
+        # those edits, and a section edited on both keeps this save's. Returns the new version.
+        baseVersion = changes.baseVersion
+        for attempt in range(MAX_SAVE_ATTEMPTS):
+            if baseVersion is not None:
+                version = self.writeChanges(username, changes, baseVersion)
+                if version is not None:
+                    return version
+                print("Chapter was saved elsewhere, merging.")
+            current = self.getNotes(username, changes.pdfID)
+            if current is not None:
+                baseVersion = current.version
+                continue
+            # The chapter isn't stored, save the changes as a new one
+            empty = {"pdfID": changes.pdfID, "chapterTitle": "", "sections": [], "version": None}
+            version = self.writeChapter(username, notesDS.fromDict(applyChanges(empty, changes.toDict())), None)
+            if version is not None:
+                return version
+        raise SaveConflict(f"Chapter {changes.pdfID} kept changing, save not written")
+
+    def writeChapter(self, username, notedata, baseVersion):
+        # Replaces a chapter with a notesDS if it is at baseVersion, or adds it if baseVersion
+        # is None and it isn't stored. Returns the new version, or None if it didn't match.
+        raise NotImplementedError
+
+    def writeChanges(self, username, changes, baseVersion):
+        # Applies a notesChanges to a chapter if it is at baseVersion. Returns the new
+        # version, or None if it didn't match (or isn't stored).
+        raise NotImplementedError
+
+    def deleteSection(self, username, pdfID, sectionID):
+        # Deletes a section of a chapter by ID. Deleting by ID can't conflict with other
+        # saves, so this doesn't need a version, but it does move the chapter to the next one.
+        raise NotImplementedError
+
+    def bulkUpdateNotes(self, chapters):
+        # Saves many whole chapters, a list of (username, notesDS). Stores that can send
+        # them in one batch override this.
+        for username, notedata in chapters:
+            self.updateUserNotes(username, notedata)
+        return len(chapters)
+
+    def saveBatch(self, saves):
+        # Saves a list of (username, notesDS or notesChanges) in order, each as
+        # updateUserNotes/updateSections would. Returns a list with each one's new version,
+        # or the exception that stopped it, like asyncio.gather(return_exceptions=True);
+        # ConnectionFailure is raised, as the saves after it can't be written either. Stores
+        # that can send the saves in one batch override this.
+        return [saveOne(self, username, notedata) for username, notedata in saves]
+
+    def exportNotes(self, batchSize=1000):
+        # Yields (username, notesDS) for every chapter of every user. The notes are
+        # streamed, so memory use doesn't depend on how many there are.
+        raise NotImplementedError
+
+    def close(self):
+        pass
+
 
 # Manages database connections, can be checked with json schema file
-class Database:
-    def __init__(self, uri, dbname, schema_file):
-        # Connection to MongoDB instance
-        self.client = MongoClient(uri, serverSelectionTimeoutMS=2000)
-        self.connected = False # Variable that stores whether or not DB is connected too
-        try:
-            # Attempt to list the available databases, if succesfull set connected to True.
-            db_names = self.client.list_database_names()
-            print("MongoDB server is running.")
-            self.connected = True
-        except Exception as e: # If unable to query Database, print error.
-            print("Error:", e)
-            print("MongoDB server is not running.")
+class Database(NotesStore):
+    def __init__(self, uri, dbname, schema_file, maxPoolSize=MAX_POOL_SIZE, minPoolSize=MIN_POOL_SIZE,
+                 **clientOptions):
+        # Connection to MongoDB instance, pymongo keeps a pool of sockets per client.
+        # Extra keyword arguments go straight to MongoClient (e.g. event_listeners).
+        self.client = MongoClient(uri, serverSelectionTimeoutMS=2000,
+                                  maxPoolSize=maxPoolSize, minPoolSize=minPoolSize, **clientOptions)
+        # Tracks whether DB is connected too, fails fast and probes in the background while it isn't
+        self.breaker = CircuitBreaker(self.ping)
+        self.indexesReady = False       # Whether ensureIndexes() has run on this client
+        self.indexLock = threading.Lock()
+        self.checkConnection()
         # Database name
         self.db = self.client[dbname]
         # Find the full path to the schema file
@@ -42,22 +209,126 @@ class Database:
         # Not used really, can check schema against JSON
         self.loadSchema(schema_file_path)
 
+    @property
+    def connected(self):
+        # Last known state, never waits for the server
+        return self.breaker.online
+
+    def checkConnection(self, wait=True):
+        # Pings the server and records whether it answered. Right after a failure this
+        # returns False at once instead of waiting out the server selection timeout.
+        if not wait:
+            self.breaker.checkInBackground()
+            return self.connected
+        return self.breaker.check()
+
+    def markOffline(self):
+        self.breaker.record(False)
+
+    def ping(self):
+        # Asks the server to answer, blocks for up to serverSelectionTimeoutMS
+        try:
+            self.client.admin.command("ping")
+            if not self.connected:
+                print("MongoDB server is running.")
+            return True
+        except Exception as e: # If unable to query Database, print error.
+            if self.connected or self.breaker.failures == 0:
+                print("Error:", e)
+                print("MongoDB server is not running.")
+            return False
+
     def loadSchema(self, schema_file_path):
-        # For validation with JSON schema
-        with open(schema_file_path, 'r') as f:
-            self.schema = json.load(f)
+        # For validation with JSON schema, only read from disk the first time
+        if schema_file_path not in _schemaCache:
+            with open(schema_file_path, 'r') as f:
+                _schemaCache[schema_file_path] = json.load(f)
+        self.schema = _schemaCache[schema_file_path]
+
+    def close(self):
+        # Closes every pooled connection of this client
+        self.client.close()
 
     def getCollection(self, collectionName):
         # Returns a collection from DB with a given name
         return self.db[collectionName]
+
+    def ensureIndexes(self):
+        # Creates the indexes the note lookups rely on. create_index does nothing
+        # when the index already exists, so this is safe to run on every startup.
+        usersCollection = self.getCollection("users")
+        usersCollection.create_index("username")
+        usersCollection.create_index("notes.pdf_id")
+
+        # Indexes for the normalized layout (SectionStore)
+        self.getCollection("chapters").create_index([("username", 1), ("pdf_id", 1)], unique=True)
+        sectionsCollection = self.getCollection("sections")
+        sectionsCollection.create_index([("username", 1), ("pdf_id", 1), ("sectionID", 1)], unique=True)
+        sectionsCollection.create_index([("username", 1), ("pdf_id", 1), ("position", 1)])
+
+    def requireIndexes(self):
+        # Runs ensureIndexes() the first time it is called while the server can be reached.
+        # SectionStore relies on the unique sectionID index to refuse stale saves, so its
+        # writes call this first: a store created offline gets the indexes once it is back.
+        with self.indexLock:
+            if not self.indexesReady:
+                self.ensureIndexes()
+                self.indexesReady = True
+
+    def getNotes(self, username, pdfID):
+        # Loads a user's notes for one PDF as a notesDS, or None if there are none
+        usersCollection = self.getCollection("users")
+
+        # Find the user by username, assumes unique username, i.e. no checking for duplicates.
+        # The projection makes the server send back only the requested PDF's notes instead
+        # of every chapter the user has ever annotated.
+        user = usersCollection.find_one(
+            {"username": username, "notes.pdf_id": pdfID},
+            {"_id": 0, "notes": {"$elemMatch": {"pdf_id": pdfID}}}
+        )
+        if not user:
+            print(f"No notes available for user {username} and PDF ID {pdfID}")
+            return None
+
+        return self.chapterNotes(username, user['notes'][0])
+
+    def getAllNotes(self, username):
+        # Loads every chapter of a user's notes in one round trip
+        user = self.getCollection("users").find_one({"username": username}, {"_id": 0, "notes": 1})
+        chapters = [self.chapterNotes(username, note) for note in (user or {}).get('notes') or []]
+        return [notes for notes in chapters if notes is not None]
+
+    def chapterNotes(self, username, note):
+        # Builds the notesDS of one entry of a user's notes array
+        pdfID = note.get('pdf_id')
+        try:
+            chapter_title = note['chapter']['chapter_title']
+            usernotes = notesDS(pdfID, chapter_title)
+            usernotes.version = note['chapter'].get('version', 0) # Saved before versions existed: 0
+
+            sections = note['chapter'].get('sections', [])
+            for position, section in enumerate(sections):
+                section_title = section['sectionTitle']
+                section_notes = section['sectionNotes']
+                # Sections saved before IDs existed get one derived from their position
+                section_id = section.get('sectionID')
+                if not section_id:
+                    section_id = legacySectionID(username, pdfID, position)
+                    usernotes.legacyIDs = True
+                usernotes.addSection(section_title, section_notes, section_id)
+            return usernotes
+        except KeyError as e:
+            print(f"Error processing notes for user {username} and PDF {pdfID}: {e}")
+            return None
     
-    def deleteSection(self, username, pdfID, targetTitle):
+    def deleteSection(self, username, pdfID, sectionID):
         usersCollection = self.getCollection("users")
 
         # Use update_one to directly remove the section
         result = usersCollection.update_one(
-            {"username": username, "notes.pdf_id": pdfID},
-            {"$pull": {"notes.$.chapter.sections": {"sectionTitle": targetTitle}}}
+            {"username": username, "notes": {"$elemMatch": {"pdf_id": pdfID}}},
+            {"$pull": {"notes.$.chapter.sections": {"sectionID": sectionID}},
+             "$inc": {"notes.$.chapter.version": 1}}
         )
 
         if result.modified_count > 0:
@@ -66,72 +337,598 @@ class Database:
             print("Section not found or deletion unsuccessful")
 
 
-    def updateUserNotes(self, username, notedata):
+    def writeChapter(self, username, notedata, baseVersion):
+        # Replaces a chapter with a single atomic update, so a save is one round trip no
+        # matter how many sections it has
         pdfID = notedata.pdfID
         usersCollection = self.getCollection("users")
+        chapter = {
+            "chapter_title": notedata.chapterTitle,
+            "sections": [{"sectionID": section["sectionID"],
+                          "sectionTitle": section["sectionTitle"],
+                          "sectionNotes": section["sectionNotes"]} for section in notedata.sections],
+            "version": (baseVersion or 0) + 1
+        }
 
-        # Check if user exists and get user data
-        user = usersCollection.find_one({"username": username})
-
-        if user:
-            # Check if this PDF already has notes
-            notes_exist = False
-            for note in user['notes']:
-                if note['pdf_id'] == pdfID:
-                    notes_exist = True
-                    #Update chapter title
-                    usersCollection.update_one(
-                        {"username": username, "notes.pdf_id": pdfID},
-                        {"$set": {"notes.$.chapter.chapter_title": notedata.chapterTitle}}
-                    )
-
-                    # Clear existing sections to replace them
-                    usersCollection.update_one(
-                        {"username": username, "notes.pdf_id": pdfID},
-                        {"$set": {"notes.$.chapter.sections": []}}
-                    )
-
-                    # Add sections
-                    for section in notedata.sections:
-                        usersCollection.update_one(
-                            {"username": username, "notes.pdf_id": pdfID},
-                            {"$push": {"notes.$.chapter.sections": {
-                                "sectionTitle": section["sectionTitle"],
-                                "sectionNotes": section["sectionNotes"]
-                            }}}
-                        )
-                    break
-
-            if not notes_exist:
-                # If PDF does not have notes, create new note entry
-                new_note = {
-                    "pdf_id": pdfID,
-                    "chapter": {
-                        "chapter_title": notedata.chapterTitle,
-                        "sections": notedata.sections
-                    }
-                }
-                usersCollection.update_one(
-                    {"username": username},
-                    {"$push": {"notes": new_note}}
-                )
+        if baseVersion is not None:
+            # Common case, the user already has notes for this PDF
+            result = usersCollection.update_one(
+                {"username": username, "notes": {"$elemMatch": {"pdf_id": pdfID, "chapter.version": versionMatch(baseVersion)}}},
+                {"$set": {"notes.$.chapter": chapter}}
+            )
+            if not result.matched_count:
+                return None
             print("Notes updated or added successfully.")
+            return chapter["version"]
 
-        else:
-            # If user does not exist, create a new user entry
-            new_user = {
-                "username": username,
-                "notes": [{
-                    "pdf_id": pdfID,
-                    "chapter": {
-                        "chapter_title": notedata.chapterTitle,
-                        "sections": notedata.sections
-                    }
-                }]
-            }
-            usersCollection.insert_one(new_user)
+        # First save of this PDF: append a new note entry unless one was added meanwhile
+        result = usersCollection.update_one(
+            {"username": username, "notes.pdf_id": {"$ne": pdfID}},
+            {"$push": {"notes": {"pdf_id": pdfID, "chapter": chapter}}}
+        )
+        if not result.matched_count:
+            # The user doesn't exist yet, or already has the chapter
+            result = usersCollection.update_one(
+                {"username": username},
+                {"$setOnInsert": {"notes": [{"pdf_id": pdfID, "chapter": chapter}]}},
+                upsert=True
+            )
+            if result.upserted_id is None:
+                return None
             print("New user created and notes saved successfully.")
+            return chapter["version"]
+        print("Notes updated or added successfully.")
+        return chapter["version"]
+
+    def writeChanges(self, username, changes, baseVersion):
+        # Applies the changes with one ordered bulk write. Its first operation moves the
+        # chapter from baseVersion to the next version and tags it with a token only this
+        # write knows; every other operation only matches a chapter with that token, so if
+        # the first one finds another version, the whole write does nothing. The write isn't
+        # atomic, so another save may replace the token partway through, after which the
+        # rest match nothing: every operation is built to match exactly once while the
+        # token is there, and fewer matches than that count as a conflict. What was applied
+        # is applied again by the retry, every operation is safe to repeat.
+        pdfID = changes.pdfID
+        usersCollection = self.getCollection("users")
+        token = uuid.uuid4().hex
+        chapterFilter = {"username": username, "notes": {"$elemMatch": {"pdf_id": pdfID, "chapter.writeToken": token}}}
+        operations = [UpdateOne(
+            {"username": username, "notes": {"$elemMatch": {"pdf_id": pdfID, "chapter.version": versionMatch(baseVersion)}}},
+            {"$set": {"notes.$.chapter.version": baseVersion + 1, "notes.$.chapter.writeToken": token}}
+        )]
+
+        if changes.chapterTitle is not None:
+            operations.append(UpdateOne(chapterFilter, {"$set": {"notes.$.chapter.chapter_title": changes.chapterTitle}}))
+
+        if changes.deletedIDs:
+            operations.append(UpdateOne(chapterFilter, {"$pull": {"notes.$.chapter.sections": {"sectionID": {"$in": changes.deletedIDs}}}}))
+
+        for section in changes.sections:
+            sectionID = section["sectionID"]
+            if section["isNew"]:
+                # Append the section only if the chapter doesn't have it yet. Exactly one of
+                # these two matches: the first (which changes nothing) if it has it.
+                operations.append(UpdateOne(
+                    {"username": username, "notes": {"$elemMatch": {"pdf_id": pdfID, "chapter.writeToken": token,
+                                                                    "chapter.sections.sectionID": sectionID}}},
+                    {"$set": {"notes.$.chapter.writeToken": token}}
+                ))
+                operations.append(UpdateOne(
+                    {"username": username, "notes": {"$elemMatch": {"pdf_id": pdfID, "chapter.writeToken": token,
+                                                                    "chapter.sections.sectionID": {"$ne": sectionID}}}},
+                    {"$push": {"notes.$.chapter.sections": {"sectionID": sectionID,
+                                                            "sectionTitle": section["sectionTitle"],
+                                                            "sectionNotes": section["sectionNotes"]}}}
+                ))
+            # Update the section in place
+            operations.append(UpdateOne(
+                chapterFilter,
+                {"$set": {"notes.$[note].chapter.sections.$[section].sectionTitle": section["sectionTitle"],
+                          "notes.$[note].chapter.sections.$[section].sectionNotes": section["sectionNotes"]}},
+                array_filters=[{"note.pdf_id": pdfID}, {"section.sectionID": sectionID}]
+            ))
+
+        expected = len(operations) - sum(1 for section in changes.sections if section["isNew"])
+        result = usersCollection.bulk_write(operations)
+        if result.matched_count < expected:
+            return None # Another save got in first or partway through
+        print("Notes updated successfully.")
+        return baseVersion + 1
+
+    def bulkUpdateNotes(self, chapters):
+        # Saves many whole chapters in one ordered bulk write. Each chapter is removed from
+        # its user's notes and appended again, creating the user if needed, so it takes two
+        # operations whether or not the chapter existed.
+        operations = []
+        for username, notedata in chapters:
+            operations.append(UpdateOne({"username": username}, {"$pull": {"notes": {"pdf_id": notedata.pdfID}}}, upsert=True))
+            operations.append(UpdateOne({"username": username}, {"$push": {"notes": {
+                "pdf_id": notedata.pdfID,
+                "chapter": {"chapter_title": notedata.chapterTitle, "sections": notedata.sections,
+                            "version": notedata.version or 0}
+            }}}))
+        if operations:
+            self.getCollection("users").bulk_write(operations)
+        return len(chapters)
+
+    def exportNotes(self, batchSize=1000):
+        # Streams every user's notes, one users document at a time
+        cursor = self.getCollection("users").find({}, {"_id": 0, "username": 1, "notes": 1}, batch_size=batchSize)
+        for user in cursor:
+            for note in user.get("notes") or []:
+                notes = self.chapterNotes(user.get("username"), note)
+                if notes is not None:
+                    yield user.get("username"), notes
+
+
+def versionMatch(version):
+    # Filter for a chapter at this version, chapters saved before versions existed are at 0
+    return {"$in": [0, None]} if version == 0 else version
+
+
+def saveOne(store, username, notedata):
+    # One save of NotesStore.saveBatch: its new version, or the exception that stopped it
+    try:
+        if isinstance(notedata, notesChanges):
+            return store.updateSections(username, notedata)
+        return store.updateUserNotes(username, notedata)
+    except ConnectionFailure:
+        raise
+    except Exception as e:
+        return e
+
+
+# Circuit breaker for the database connection. Once the server stops answering, callers
+# are told it is offline right away instead of each waiting out the server selection
+# timeout, while a background thread probes it with exponential backoff until it is back.
+class CircuitBreaker:
+    def __init__(self, probe, baseBackoff=BREAKER_BASE_BACKOFF, maxBackoff=BREAKER_MAX_BACKOFF):
+        self.probe = probe              # Blocking check, returns True if the server answered
+        self.baseBackoff = baseBackoff
+        self.maxBackoff = maxBackoff
+        self.online = False             # Whether the server answered last time
+        self.failures = 0               # Failures since the server last answered
+        self.retryAt = 0.0              # time.monotonic() until which check() fails fast
+        self.probing = False            # Whether the background probe thread is running
+        self.lock = threading.Lock()
+
+    def check(self):
+        # Probes the server now and returns whether it answered, or returns False right
+        # away while inside the backoff window of a recent failure
+        with self.lock:
+            if not self.online and time.monotonic() < self.retryAt:
+                return False
+        return self.record(self.probe())
+
+    def checkInBackground(self):
+        # Probes the server on the background thread, e.g. for a periodic health check
+        with self.lock:
+            if self.probing:
+                return
+            self.probing = True
+        threading.Thread(target=self.probeLoop, args=(0,), name="db-probe", daemon=True).start()
+
+    def record(self, ok):
+        # Records whether a probe or database operation reached the server. A failure
+        # opens the breaker and starts probing in the background. Returns ok.
+        with self.lock:
+            backoff = self.update(ok)
+            startProbing = not ok and not self.probing
+            if startProbing:
+                self.probing = True
+        if startProbing:
+            threading.Thread(target=self.probeLoop, args=(backoff,), name="db-probe", daemon=True).start()
+        return ok
+
+    def update(self, ok):
+        # Applies a result (lock held), returns how long to wait before the next probe
+        if ok:
+            self.online = True
+            self.failures = 0
+            self.retryAt = 0.0
+            return 0
+        self.online = False
+        self.failures += 1
+        backoff = min(self.maxBackoff, self.baseBackoff * 2 ** (self.failures - 1))
+        self.retryAt = time.monotonic() + backoff
+        return backoff
+
+    def probeLoop(self, delay):
+        # Probes until the server answers, waiting longer after every failure
+        while True:
+            time.sleep(delay)
+            ok = self.probe()
+            with self.lock:
+                delay = self.update(ok)
+                if ok:
+                    self.probing = False
+                    return
+
+
+# Hands out one lazily created, pooled Database shared by the whole process, so callers
+# don't pay for a new client and server round trip each time they touch the database
+class ConnectionManager:
+    def __init__(self, uri, dbname, maxPoolSize=MAX_POOL_SIZE, minPoolSize=MIN_POOL_SIZE,
+                 healthCheckInterval=HEALTH_CHECK_INTERVAL):
+        self.uri = uri
+        self.dbname = dbname
+        self.maxPoolSize = maxPoolSize
+        self.minPoolSize = minPoolSize
+        self.healthCheckInterval = healthCheckInterval
+        self.database = None            # Created on first use
+        self.lastCheck = 0.0            # time.monotonic() of the last health check
+        self.lock = threading.Lock()    # Background threads may ask for the database too
 
+    def getDatabase(self):
+        # Returns the shared Database. Only the first call waits for the server, after that
+        # health checks run in the background and a down server is probed by its breaker.
+        with self.lock:
+            if self.database is None:
+                self.database = Database(self.uri, self.dbname, "schema.json",
+                                         maxPoolSize=self.maxPoolSize, minPoolSize=self.minPoolSize)
+                self.lastCheck = time.monotonic()
+            elif self.database.connected and time.monotonic() - self.lastCheck > self.healthCheckInterval:
+                self.database.checkConnection(wait=False)
+                self.lastCheck = time.monotonic()
+            if self.database.connected:
+                self.database.requireIndexes()
+            return self.database
+
+    def close(self):
+        # Closes the shared client, the next getDatabase() creates a fresh one
+        with self.lock:
+            if self.database is not None:
+                self.database.close()
+                self.database = None
+
+
+# Process-wide connection manager used by every part of the application
+connectionManager = ConnectionManager(MONGO_URI, DB_NAME)
+
+def getDatabase():
+    # Returns the shared Database for this process
+    return connectionManager.getDatabase()
+
+
+# Alternative notes layout: one document per section in the "sections" collection and
+# one per (user, PDF) in "chapters", instead of arrays inside the users document. Saves
+# and deletes touch only small documents, and heavy users never approach MongoDB's
+# 16 MB document limit. Has the same notes methods as Database.
+class SectionStore(NotesStore):
+    def __init__(self, database):
+        self.database = database
+        self.chapters = database.getCollection("chapters")
+        self.sections = database.getCollection("sections")
+
+    @property
+    def connected(self):
+        return self.database.connected
+
+    def checkConnection(self, wait=True):
+        return self.database.checkConnection(wait)
+
+    def markOffline(self):
+        self.database.markOffline()
+
+    def getNotes(self, username, pdfID):
+        # Loads a user's notes for one PDF as a notesDS, or None if there are none
+        chapter = self.chapters.find_one({"username": username, "pdf_id": pdfID}, {"_id": 0, "chapter_title": 1})
+        if not chapter:
+            print(f"No notes available for user {username} and PDF ID {pdfID}")
+            return None
+
+        usernotes = notesDS(pdfID, chapter["chapter_title"])
+        usernotes.version = 0 # No header yet: saved before versions existed
+        cursor = self.sections.find({"username": username, "pdf_id": pdfID}, SECTION_FIELDS)
+        for section in cursor.sort("position", 1):
+            if section["sectionID"] == CHAPTER_HEADER_ID:
+                readHeader(usernotes, section)
+            else:
+                usernotes.addSection(section["sectionTitle"], section["sectionNotes"], section["sectionID"])
+        return usernotes
+
+    def getAllNotes(self, username):
+        # Loads every chapter of a user's notes, with one query for the chapters and one
+        # for all of their sections
+        chapters = {}
+        for chapter in self.chapters.find({"username": username}, {"_id": 0, "pdf_id": 1, "chapter_title": 1}):
+            chapters[chapter["pdf_id"]] = notesDS(chapter["pdf_id"], chapter["chapter_title"])
+            chapters[chapter["pdf_id"]].version = 0
+        cursor = self.sections.find({"username": username}, dict(SECTION_FIELDS, pdf_id=1))
+        for section in cursor.sort([("pdf_id", 1), ("position", 1)]):
+            usernotes = chapters.get(section["pdf_id"])
+            if usernotes is None:
+                continue
+            if section["sectionID"] == CHAPTER_HEADER_ID:
+                readHeader(usernotes, section)
+            else:
+                usernotes.addSection(section["sectionTitle"], section["sectionNotes"], section["sectionID"])
+        return list(chapters.values())
+
+    # The version of a chapter is kept in a header document in the sections collection
+    # (sectionID CHAPTER_HEADER_ID, first by position), so a save is one ordered bulk write
+    # on that collection, like the embedded layout's. Its first operation moves the header
+    # from baseVersion to the next version and tags it with a token only this write knows;
+    # if the header is at another version, that operation tries to add a second header,
+    # which the unique sectionID index refuses, and the ordered write stops there. Its last
+    # operation does the same unless the header still has the token, so a save made
+    # elsewhere partway through is a conflict as well, and the retry writes this one again
+    # on top of it. The header also has the title, the chapters document only lists the
+    # chapter and is written once, when the chapter is added.
+
+    def headerOperations(self, username, pdfID, chapterTitle, baseVersion):
+        # The operations that go before and after a save's own, and the version the chapter
+        # moves to: (version, first, last)
+        token = uuid.uuid4().hex
+        headerFilter = {"username": username, "pdf_id": pdfID, "sectionID": CHAPTER_HEADER_ID}
+        version = 1 if baseVersion is None else baseVersion + 1
+        update = {"version": version, "writeToken": token, "position": -1}
+        if chapterTitle is not None:
+            update["chapter_title"] = chapterTitle
+        if baseVersion is None:
+            first = InsertOne(dict(headerFilter, **update))
+        else:
+            first = UpdateOne(dict(headerFilter, version=versionMatch(baseVersion)), {"$set": update}, upsert=True)
+        last = UpdateOne(dict(headerFilter, writeToken=token), {"$set": {"writeToken": token}}, upsert=True)
+        return version, first, last
+
+    def writeSections(self, username, pdfID, chapterTitle, baseVersion, operations):
+        # Runs operations between the two header operations. Returns the new version, or
+        # None if the chapter wasn't at baseVersion or was saved elsewhere in the meantime.
+        self.database.requireIndexes() # Without the unique index a stale save would go through
+        version, first, last = self.headerOperations(username, pdfID, chapterTitle, baseVersion)
+        if baseVersion is None:
+            # The chapter is new, list it first so a write cut short is still found
+            self.chapters.bulk_write([listChapter(username, pdfID, chapterTitle)])
+
+        try:
+            self.sections.bulk_write([first] + operations + [last])
+        except BulkWriteError as e:
+            if conflictIndex(e) in (0, len(operations) + 1):
+                return None
+            raise
+        return version
+
+    def chapterOperations(self, username, notedata):
+        # Writes every section of a chapter and removes the ones that no longer exist
+        pdfID = notedata.pdfID
+        operations = [
+            ReplaceOne({"username": username, "pdf_id": pdfID, "sectionID": section["sectionID"]},
+                       sectionDocument(username, pdfID, position, section), upsert=True)
+            for position, section in enumerate(notedata.sections)
+        ]
+        sectionIDs = [section["sectionID"] for section in notedata.sections] + [CHAPTER_HEADER_ID]
+        operations.append(DeleteMany({"username": username, "pdf_id": pdfID, "sectionID": {"$nin": sectionIDs}}))
+        return operations
+
+    def changesOperations(self, username, changes):
+        # Writes only what changed in a chapter (a notesChanges). Sections are upserted by
+        # ID, so a save that is retried or sent twice never duplicates a section.
+        pdfID = changes.pdfID
+        operations = []
+        if changes.deletedIDs:
+            operations.append(DeleteMany({"username": username, "pdf_id": pdfID, "sectionID": {"$in": changes.deletedIDs}}))
+        for section in changes.sections:
+            operations.append(UpdateOne(
+                {"username": username, "pdf_id": pdfID, "sectionID": section["sectionID"]},
+                {"$set": {"position": section["position"],
+                          "sectionTitle": section["sectionTitle"],
+                          "sectionNotes": section["sectionNotes"]}},
+                upsert=True
+            ))
+        if changes.order is not None:
+            # Sections were added or removed, renumber the ones that didn't change
+            changedIDs = {section["sectionID"] for section in changes.sections}
+            operations += [UpdateOne({"username": username, "pdf_id": pdfID, "sectionID": sectionID},
+                                     {"$set": {"position": position}})
+                           for position, sectionID in enumerate(changes.order) if sectionID not in changedIDs]
+        return operations
+
+    def writeChapter(self, username, notedata, baseVersion):
+        # Saves a chapter's notes between the header operations
+        operations = self.chapterOperations(username, notedata)
+        version = self.writeSections(username, notedata.pdfID, notedata.chapterTitle, baseVersion, operations)
+        if version is not None:
+            print("Notes updated or added successfully.")
+        return version
+
+    def writeChanges(self, username, changes, baseVersion):
+        operations = self.changesOperations(username, changes)
+        version = self.writeSections(username, changes.pdfID, changes.chapterTitle, baseVersion, operations)
+        if version is not None:
+            print("Notes updated successfully.")
+        return version
+
+    def saveBatch(self, saves):
+        # Sends the saves, each between its own header operations, in one ordered bulk
+        # write, so each is still only written if its chapter is at the version it was made
+        # from. The write stops at a save that conflicts: it is saved on its own, merging
+        # as updateUserNotes/updateSections do, and the saves after it go in the next bulk
+        # write. So is a notesChanges without a baseVersion, which needs a read first.
+        self.database.requireIndexes()
+        results = []
+        while len(results) < len(saves):
+            operations, groups, newChapters = [], [], []
+            for username, notedata in saves[len(results):]:
+                if isinstance(notedata, notesChanges):
+                    if notedata.baseVersion is None:
+                        break
+                    baseVersion, body = notedata.baseVersion, self.changesOperations(username, notedata)
+                else:
+                    baseVersion, body = notedata.version, self.chapterOperations(username, notedata)
+                version, first, last = self.headerOperations(username, notedata.pdfID, notedata.chapterTitle, baseVersion)
+                if baseVersion is None:
+                    newChapters.append(listChapter(username, notedata.pdfID, notedata.chapterTitle))
+                groups.append((len(operations), len(operations) + len(body) + 1, version))
+                operations += [first] + body + [last]
+
+            written = len(groups)
+            if operations:
+                if newChapters:
+                    self.chapters.bulk_write(newChapters, ordered=False)
+                try:
+                    self.sections.bulk_write(operations)
+                except BulkWriteError as e:
+                    failed = conflictIndex(e)
+                    written = next((n for n, group in enumerate(groups) if failed in group[:2]), None)
+                    if written is None:
+                        raise
+                results += [group[2] for group in groups[:written]]
+            if len(results) < len(saves):
+                username, notedata = saves[len(results)]
+                results.append(saveOne(self, username, notedata))
+        return results
+
+    def bulkUpdateNotes(self, chapters):
+        # Saves many whole chapters with one unordered bulk write per collection
+        self.database.requireIndexes()
+        chapterOps, sectionOps = [], []
+        for username, notedata in chapters:
+            pdfID = notedata.pdfID
+            chapterOps.append(UpdateOne({"username": username, "pdf_id": pdfID},
+                                        {"$set": {"chapter_title": notedata.chapterTitle}},
+                                        upsert=True))
+            sectionOps.append(ReplaceOne({"username": username, "pdf_id": pdfID, "sectionID": CHAPTER_HEADER_ID},
+                                         {"username": username, "pdf_id": pdfID, "sectionID": CHAPTER_HEADER_ID,
+                                          "position": -1, "chapter_title": notedata.chapterTitle,
+                                          "version": notedata.version or 0},
+                                         upsert=True))
+            sectionOps += [ReplaceOne({"username": username, "pdf_id": pdfID, "sectionID": section["sectionID"]},
+                                      sectionDocument(username, pdfID, position, section), upsert=True)
+                           for position, section in enumerate(notedata.sections)]
+            sectionIDs = [section["sectionID"] for section in notedata.sections] + [CHAPTER_HEADER_ID]
+            sectionOps.append(DeleteMany({"username": username, "pdf_id": pdfID, "sectionID": {"$nin": sectionIDs}}))
+        if chapterOps:
+            self.chapters.bulk_write(chapterOps, ordered=False)
+            self.sections.bulk_write(sectionOps, ordered=False)
+        return len(chapters)
+
+    def exportNotes(self, batchSize=1000):
+        # Streams the chapters and the sections with two cursors in the same order, so
+        # only one chapter is held at a time
+        chapters = self.chapters.find({}, {"_id": 0, "username": 1, "pdf_id": 1, "chapter_title": 1},
+                                      batch_size=batchSize).sort([("username", 1), ("pdf_id", 1)])
+        sections = self.sections.find({}, dict(SECTION_FIELDS, username=1, pdf_id=1),
+                                      batch_size=batchSize).sort([("username", 1), ("pdf_id", 1), ("position", 1)])
+        # Headers come first in each chapter's sections, so joinSections has read a
+        # chapter's header by the time it yields the chapter
+        headers = {}
+
+        def readSections():
+            for section in sections:
+                if section["sectionID"] == CHAPTER_HEADER_ID:
+                    headers[(section["username"], section["pdf_id"])] = section
+                else:
+                    yield (section["username"], section["pdf_id"], section["sectionID"], section["sectionTitle"], section["sectionNotes"])
+
+        for username, notes in joinSections(((chapter["username"], chapter["pdf_id"], chapter["chapter_title"], 0)
+                                             for chapter in chapters), readSections()):
+            header = headers.pop((username, notes.pdfID), None)
+            if header is not None:
+                readHeader(notes, header)
+            yield username, notes
+
+    def deleteSection(self, username, pdfID, sectionID):
+        result = self.sections.delete_one({"username": username, "pdf_id": pdfID, "sectionID": sectionID})
+
+        if result.deleted_count > 0:
+            self.sections.update_one({"username": username, "pdf_id": pdfID, "sectionID": CHAPTER_HEADER_ID},
+                                     {"$inc": {"version": 1}, "$setOnInsert": {"position": -1}}, upsert=True)
+            print("Section deleted")
+        else:
+            print("Section not found or deletion unsuccessful")
+
+
+def readHeader(usernotes, header):
+    # Sets a SectionStore chapter's version, and its title if the header has one
+    usernotes.version = header.get("version", 0)
+    if header.get("chapter_title") is not None:
+        usernotes.chapterTitle = header["chapter_title"]
+
+
+def listChapter(username, pdfID, chapterTitle):
+    # Adds a chapter to the chapters collection if it isn't listed yet
+    return UpdateOne({"username": username, "pdf_id": pdfID},
+                     {"$setOnInsert": {"chapter_title": chapterTitle}}, upsert=True)
+
+
+def conflictIndex(error):
+    # The operation of a bulk write the unique index refused, None if it failed otherwise
+    errors = error.details.get("writeErrors", [])
+    if errors and errors[0].get("code") == DUPLICATE_KEY:
+        return errors[0].get("index")
+    return None
+
+
+def sectionDocument(username, pdfID, position, section):
+    # Builds the SectionStore document for one section of a notesDS
+    return {
+        "username": username,
+        "pdf_id": pdfID,
+        "sectionID": section["sectionID"],
+        "position": position,
+        "sectionTitle": section["sectionTitle"],
+        "sectionNotes": section["sectionNotes"]
+    }
+
+
+def joinSections(chapters, sections):
+    # Pairs (username, pdfID, chapterTitle, version) chapters with their (username, pdfID,
+    # sectionID, sectionTitle, sectionNotes) sections and yields (username, notesDS). Both
+    # have to be sorted by username and pdfID, so only one chapter is held at a time.
+    sections = iter(sections)
+    section = next(sections, None)
+    for username, pdfID, chapterTitle, version in chapters:
+        notes = notesDS(pdfID, chapterTitle)
+        notes.version = version
+        # Sections left over from a deleted chapter have nothing to join with
+        while section is not None and (section[0], section[1]) < (username, pdfID):
+            section = next(sections, None)
+        while section is not None and (section[0], section[1]) == (username, pdfID):
+            notes.addSection(section[3], section[4], section[2])
+            section = next(sections, None)
+        yield username, notes
+
+
+# Shared SectionStore, created the first time the normalized layout is used
+_sectionStore = None
+# Shared SQLiteStore, created the first time the SQLite backend is used
+_sqliteStore = None
+# Shared ServiceStore, created the first time the notes service is used
+_serviceStore = None
+
+def getNotesStore():
+    # Returns what notes are loaded from and saved to, depending on STORAGE_BACKEND
+    # and NOTES_LAYOUT
+    global _sectionStore, _sqliteStore, _serviceStore
+    if STORAGE_BACKEND == "sqlite":
+        if _sqliteStore is None:
+            from sqlitestore import SQLiteStore # Only loaded when it is used
+            _sqliteStore = SQLiteStore(SQLITE_PATH)
+        return _sqliteStore
+    if STORAGE_BACKEND == "service":
+        if _serviceStore is None:
+            from servicestore import ServiceStore
+            _serviceStore = ServiceStore(SERVICE_URL)
+        return _serviceStore
+
+    database = getDatabase()
+    if NOTES_LAYOUT != "normalized":
+        return database
+    if _sectionStore is None or _sectionStore.database is not database:
+        _sectionStore = SectionStore(database)
+    return _sectionStore
+
+
+def newSectionID():
+    # Returns a new random, stable ID for a section
+    return uuid.uuid4().hex
+
+def legacySectionID(username, pdfID, position):
+    # ID for a section saved before sections had IDs. It is derived from where the section
+    # sits, so loading (or migrating) the same old notes twice always gives the same ID.
+    return uuid.uuid5(uuid.NAMESPACE_URL, f"ara:{username}/{pdfID}/{position}").hex
 
 
 # Represents a user in our system
@@ -143,33 +940,8 @@ class User:
         self.password = password 
     
     def getNotes(self, username, pdfID):
-        db = Database("mongodb://localhost:27017/", "active_reading_assistant", "schema.json")
-        usersCollection = db.getCollection("users")
-
-        # Find the user by username, assumes unique username, i.e. no checking for duplicates
-        user = usersCollection.find_one({"username": username})
-        if not user:
-            print(f"User {username} not found in the database.")
-            return None
-
-        for note in user.get('notes', []):  # Default to empty list if no notes
-            if note.get('pdf_id') == pdfID:
-                try:
-                    chapter_title = note['chapter']['chapter_title']
-                    usernotes = notesDS(pdfID, chapter_title)
-
-                    sections = note['chapter'].get('sections', [])
-                    for section in sections:
-                        section_title = section['sectionTitle']
-                        section_notes = section['sectionNotes']
-                        usernotes.addSection(section_title, section_notes)
-                    return usernotes
-                except KeyError as e:
-                    print(f"Error processing notes for user {username} and PDF {pdfID}: {e}")
-                    return None
-
-        print(f"No notes available for user {username} and PDF ID {pdfID}")
-        return None
+        # Loads this user's notes for a PDF from the configured notes layout
+        return getNotesStore().getNotes(username, pdfID)
 
 # Represents notes for a given PDF and chapter
 class notesDS:
@@ -180,10 +952,110 @@ class notesDS:
         self.chapterTitle = chapterTitle
         # List to hold sections that the user creates
         self.sections = []
+        # Whether some sections were saved before sections had IDs (see legacySectionID)
+        self.legacyIDs = False
+        # Version of the stored chapter these notes were loaded from, None if it wasn't stored
+        self.version = None
 
-    def addSection(self, sectionTitle, sectionNotes):
-        # Adds a section with a title and prompts for notes
+    def addSection(self, sectionTitle, sectionNotes, sectionID=None):
+        # Adds a section with a title and prompts for notes, new sections get a fresh ID
         self.sections.append({
+            "sectionID": sectionID or newSectionID(),
             "sectionTitle": sectionTitle,
             "sectionNotes": sectionNotes
-        })
\ No newline at end of file
+        })
+
+    def toDict(self):
+        # Plain dictionary version, e.g. for writing to JSON
+        return {"pdfID": self.pdfID, "chapterTitle": self.chapterTitle, "sections": self.sections,
+                "version": self.version}
+
+    @staticmethod
+    def fromDict(data):
+        # Rebuilds a notesDS from toDict() output
+        notes = notesDS(data["pdfID"], data["chapterTitle"])
+        for section in data["sections"]:
+            # A section without an ID (e.g. in a file written by hand) gets a new one
+            notes.addSection(section["sectionTitle"], section["sectionNotes"], section.get("sectionID"))
+        notes.version = data.get("version") # Older journals and exports have no version
+        return notes
+
+
+# Represents what changed in a chapter's notes since its last save, so only that has to
+# be sent to the database. A newer notesChanges for the same chapter always contains
+# everything an older one did, so a queued one can simply be replaced.
+class notesChanges:
+    def __init__(self, pdfID, chapterTitle=None):
+        # PDF identifier
+        self.pdfID = pdfID
+        # New title of the chapter, None if it didn't change
+        self.chapterTitle = chapterTitle
+        # Sections that were added or edited
+        self.sections = []
+        # IDs of sections that were deleted
+        self.deletedIDs = []
+        # IDs of every section in order, only set when sections were added or deleted
+        self.order = None
+        # Version of the stored chapter the changes were made to, None if it wasn't stored
+        self.baseVersion = None
+
+    def addSection(self, sectionTitle, sectionNotes, sectionID, position, isNew):
+        # Adds a changed section, isNew when it may not have reached the database yet
+        self.sections.append({
+            "sectionID": sectionID,
+            "sectionTitle": sectionTitle,
+            "sectionNotes": sectionNotes,
+            "position": position,
+            "isNew": isNew
+        })
+
+    def isEmpty(self):
+        # True when there is nothing to save
+        return self.chapterTitle is None and not self.sections and not self.deletedIDs and self.order is None
+
+    def toDict(self):
+        # Plain dictionary version, e.g. for writing to JSON
+        return {"pdfID": self.pdfID, "chapterTitle": self.chapterTitle, "sections": self.sections,
+                "deletedIDs": self.deletedIDs, "order": self.order, "baseVersion": self.baseVersion}
+
+    @staticmethod
+    def fromDict(data):
+        # Rebuilds a notesChanges from toDict() output
+        changes = notesChanges(data["pdfID"], data["chapterTitle"])
+        for section in data["sections"]:
+            changes.addSection(section["sectionTitle"], section["sectionNotes"], section["sectionID"],
+                               section["position"], section["isNew"])
+        changes.deletedIDs = list(data["deletedIDs"])
+        changes.order = data["order"]
+        changes.baseVersion = data.get("baseVersion")
+        return changes
+
+
+def unionNotes(older, newer):
+    # Full chapter (as toDict() output) with newer's title and sections, plus older's
+    # sections newer doesn't have, at older's version. If newer was made without loading
+    # the stored chapter older is, it never saw older's title, so that is kept.
+    newerIDs = {section["sectionID"] for section in newer["sections"]}
+    sections = [section for section in older["sections"] if section["sectionID"] not in newerIDs]
+    title = newer["chapterTitle"]
+    if newer.get("version") is None and older.get("version") is not None and older["chapterTitle"]:
+        title = older["chapterTitle"]
+    return {"pdfID": newer["pdfID"], "chapterTitle": title,
+            "sections": copy.deepcopy(sections + newer["sections"]), "version": older.get("version")}
+
+
+def applyChanges(full, changes):
+    # Full chapter after applying a changes record to it
+    sections = OrderedDict((section["sectionID"], dict(section)) for section in full["sections"])
+    for sectionID in changes["deletedIDs"]:
+        sections.pop(sectionID, None)
+    for section in changes["sections"]:
+        sections[section["sectionID"]] = {"sectionID": section["sectionID"],
+                                          "sectionTitle": section["sectionTitle"],
+                                          "sectionNotes": section["sectionNotes"]}
+    if changes["order"] is not None:
+        ordered = [sections.pop(sectionID) for sectionID in changes["order"] if sectionID in sections]
+        sections = OrderedDict((section["sectionID"], section) for section in ordered + list(sections.values()))
+    title = changes["chapterTitle"] if changes["chapterTitle"] is not None else full["chapterTitle"]
+    return {"pdfID": full["pdfID"], "chapterTitle": title, "sections": list(sections.values()),
+            "version": full.get("version")}
@@ -0,0 +1,192 @@
+# File: history.py
+# Project: CS 422 Project 1
+# Authors: ARA Team
+# Creation date: 10-18-2026
+# Description: This file contains NotesHistory, the revision history of each section of
+#              notes. It is updated from the save path like the notes search index and kept
+#              in a local SQLite file. A revision is stored as the difference from the one
+#              before it, with a full snapshot every HISTORY_SNAPSHOT_INTERVAL revisions, so
+#              any revision is rebuilt from at most that many rows, and saves that don't
+#              change a section store nothing.
+
+# Modifications:
+# Date        Author       Change
+# ----------- ------------ -----------------------------------------------------
+# 10-18-2026  ARA Team     Initial creation of the file
+# ==============================================================================
+
+import os
+import json
+import time
+import zlib
+import sqlite3
+import difflib
+import threading
+
+HISTORY_PATH = os.path.join(os.path.expanduser("~"), ".ara", "history.db")
+HISTORY_SNAPSHOT_INTERVAL = 16  # Revisions per full snapshot, the most rows read to rebuild one
+
+# revisions: one row per revision of a section. A snapshot has the whole title and notes
+# (compressed), a delta the title only if it changed and the notes as a delta (see makeDelta).
+# heads: the latest revision of each section in full and its latest snapshot, so a save is
+# compared with it without rebuilding anything.
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS revisions (
+    username TEXT NOT NULL,
+    pdf_id TEXT NOT NULL,
+    section_id TEXT NOT NULL,
+    revision INTEGER NOT NULL,
+    saved_at REAL NOT NULL,
+    snapshot INTEGER NOT NULL,
+    title TEXT,
+    data BLOB NOT NULL,
+    PRIMARY KEY (username, pdf_id, section_id, revision)
+);
+CREATE TABLE IF NOT EXISTS heads (
+    username TEXT NOT NULL,
+    pdf_id TEXT NOT NULL,
+    section_id TEXT NOT NULL,
+    revision INTEGER NOT NULL,
+    snapshot INTEGER NOT NULL,
+    title TEXT NOT NULL,
+    notes TEXT NOT NULL,
+    PRIMARY KEY (username, pdf_id, section_id)
+);
+"""
+
+SELECT_HEAD = ("SELECT revision, snapshot, title, notes FROM heads "
+               "WHERE username = ? AND pdf_id = ? AND section_id = ?")
+UPSERT_HEAD = ("INSERT INTO heads (username, pdf_id, section_id, revision, snapshot, title, notes) "
+               "VALUES (?, ?, ?, ?, ?, ?, ?) ON CONFLICT (username, pdf_id, section_id) DO UPDATE SET "
+               "revision = excluded.revision, snapshot = excluded.snapshot, title = excluded.title, notes = excluded.notes")
+INSERT_REVISION = ("INSERT INTO revisions (username, pdf_id, section_id, revision, saved_at, snapshot, title, data) "
+                   "VALUES (?, ?, ?, ?, ?, ?, ?, ?)")
+SELECT_REVISIONS = ("SELECT revision, saved_at, snapshot, title, length(data) FROM revisions "
+                    "WHERE username = ? AND pdf_id = ? AND section_id = ? ORDER BY revision DESC")
+# The revision and every row back to the snapshot before it
+SELECT_CHAIN = ("SELECT revision, snapshot, title, data FROM revisions WHERE username = ?1 AND pdf_id = ?2 "
+                "AND section_id = ?3 AND revision <= ?4 AND revision >= (SELECT max(revision) FROM revisions "
+                "WHERE username = ?1 AND pdf_id = ?2 AND section_id = ?3 AND revision <= ?4 AND snapshot = 1) "
+                "ORDER BY revision")
+
+
+def makeDelta(old, new):
+    # The edits turning old into new, as a list of: n > 0 keep the next n characters of old,
+    # n < 0 skip the next -n characters of old, a string insert it. Text the two share at
+    # the start and end is skipped before diffing, so typing in a long section is cheap.
+    prefix = 0
+    limit = min(len(old), len(new))
+    while prefix < limit and old[prefix] == new[prefix]:
+        prefix += 1
+    suffix = 0
+    while suffix < limit - prefix and old[-1 - suffix] == new[-1 - suffix]:
+        suffix += 1
+
+    delta = [prefix] if prefix else []
+    oldMiddle, newMiddle = old[prefix:len(old) - suffix], new[prefix:len(new) - suffix]
+    matcher = difflib.SequenceMatcher(None, oldMiddle, newMiddle, autojunk=False)
+    for tag, i1, i2, j1, j2 in matcher.get_opcodes():
+        if tag == "equal":
+            delta.append(i2 - i1)
+            continue
+        if i2 > i1:
+            delta.append(i1 - i2)
+        if j2 > j1:
+            delta.append(newMiddle[j1:j2])
+    if suffix:
+        delta.append(suffix)
+    return delta
+
+
+def applyDelta(old, delta):
+    # Rebuilds new from old and makeDelta(old, new)
+    parts = []
+    position = 0
+    for edit in delta:
+        if isinstance(edit, str):
+            parts.append(edit)
+        elif edit > 0:
+            parts.append(old[position:position + edit])
+            position += edit
+        else:
+            position -= edit
+    return "".join(parts)
+
+
+# Revision history of every section saved on this computer. Saves come from the writer
+# thread and the history window reads from the Tk thread, so the connection is shared
+# under a lock.
+class NotesHistory:
+    def __init__(self, path=HISTORY_PATH, snapshotInterval=HISTORY_SNAPSHOT_INTERVAL):
+        self.path = path
+        self.snapshotInterval = snapshotInterval
+        self.lock = threading.Lock()
+
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self.conn = sqlite3.connect(path, check_same_thread=False)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("PRAGMA synchronous=NORMAL")
+        self.conn.executescript(SCHEMA)
+
+    def record(self, username, notedata, savedAt=None):
+        # Adds a revision for each section of a save (a notesDS or notesChanges) that differs
+        # from its latest revision. Returns how many were added.
+        if savedAt is None:
+            savedAt = time.time()
+        pdfID = notedata.pdfID
+        added = 0
+        with self.lock, self.conn:
+            for section in notedata.sections:
+                if self.addRevision(username, pdfID, section, savedAt):
+                    added += 1
+        return added
+
+    def addRevision(self, username, pdfID, section, savedAt):
+        # Adds a revision of one section if it changed, in the caller's transaction
+        sectionID, title, notes = section["sectionID"], section["sectionTitle"], section["sectionNotes"]
+        head = self.conn.execute(SELECT_HEAD, (username, pdfID, sectionID)).fetchone()
+        if head is not None and head[2] == title and head[3] == notes:
+            return False # Saved again without changes
+        revision = head[0] + 1 if head is not None else 1
+        if head is None or revision - head[1] >= self.snapshotInterval:
+            snapshot = revision
+            row = (1, title, zlib.compress(notes.encode("utf-8")))
+        else:
+            snapshot = head[1]
+            delta = json.dumps(makeDelta(head[3], notes), ensure_ascii=False, separators=(",", ":"))
+            row = (0, title if title != head[2] else None, delta.encode("utf-8"))
+        self.conn.execute(INSERT_REVISION, (username, pdfID, sectionID, revision, savedAt) + row)
+        self.conn.execute(UPSERT_HEAD, (username, pdfID, sectionID, revision, snapshot, title, notes))
+        return True
+
+    def revisions(self, username, pdfID, sectionID):
+        # The revisions of a section, newest first, as dictionaries with the revision
+        # number, when it was saved, whether it is a snapshot, its title if it changed and
+        # the bytes it takes
+        with self.lock:
+            rows = self.conn.execute(SELECT_REVISIONS, (username, pdfID, sectionID)).fetchall()
+        return [{"revision": revision, "savedAt": savedAt, "snapshot": bool(snapshot), "title": title, "size": size}
+                for revision, savedAt, snapshot, title, size in rows]
+
+    def revision(self, username, pdfID, sectionID, revision):
+        # Rebuilds one revision of a section as (title, notes), from the snapshot before it
+        # and the deltas up to it. Returns None if there is no such revision.
+        with self.lock:
+            rows = self.conn.execute(SELECT_CHAIN, (username, pdfID, sectionID, revision)).fetchall()
+        if not rows or rows[-1][0] != revision:
+            return None
+        title, notes = None, ""
+        for _, snapshot, rowTitle, data in rows:
+            if snapshot:
+                notes = zlib.decompress(data).decode("utf-8")
+            else:
+                notes = applyDelta(notes, json.loads(data.decode("utf-8")))
+            if rowTitle is not None:
+                title = rowTitle
+        return title, notes
+
+    def close(self):
+        with self.lock:
+            self.conn.close()
@@ -0,0 +1,423 @@
+# File: journal.py
+# Project: CS 422 Project 1
+# Authors: ARA Team
+# Creation date: 10-18-2026
+# Description: This file contains the offline notes journal. While the database can't be
+#              reached, saves are appended to a local write-ahead log; once it is back they
+#              are replayed to it oldest first and the journal is emptied. JournalStore
+#              puts the journal in front of a notes store (Database or SectionStore).
+
+# Modifications:
+# Date        Author       Change
+# ----------- ------------ -----------------------------------------------------
+# 10-18-2026  ARA Team     Initial creation of the file
+# 10-18-2026  ARA Team     Connection state comes from the store's circuit breaker, no blocking checks
+# 10-18-2026  ARA Team     Keeps the notes search index up to date from the save path
+# 10-18-2026  ARA Team     unionNotes()/applyChanges() moved to datastructs, the store merges conflicting saves
+# 10-18-2026  ARA Team     Every save is also added to the revision history
+# 10-18-2026  ARA Team     NotesCache, offline reads start from the last copy loaded or saved online
+# 10-18-2026  ARA Team     Replays the journal with the store's saveBatch(), compacts once the file has doubled
+# ==============================================================================
+
+import os
+import json
+import copy
+import hashlib
+import threading
+from collections import OrderedDict
+from pymongo.errors import ConnectionFailure
+
+from datastructs import notesDS, notesChanges, unionNotes, applyChanges
+
+JOURNAL_PATH = os.path.join(os.path.expanduser("~"), ".ara", "notes_journal.jsonl")
+JOURNAL_SYNC_INTERVAL = 1.0     # Seconds appended records may wait for a batched fsync
+JOURNAL_COMPACT_THRESHOLD = 200 # Records in the file before it is compacted
+NOTES_CACHE_DIR = os.path.join(os.path.expanduser("~"), ".ara", "notes_cache")
+
+
+# Append-only log of note saves, one JSON record per line:
+#   {"username": ..., "kind": "full" | "changes", "notes": notesDS/notesChanges.toDict()}
+# Records are flushed to the OS on every append, so they survive the program crashing,
+# and fsynced in batches at most JOURNAL_SYNC_INTERVAL seconds later.
+class NotesJournal:
+    def __init__(self, path=JOURNAL_PATH, syncInterval=JOURNAL_SYNC_INTERVAL,
+                 compactThreshold=JOURNAL_COMPACT_THRESHOLD):
+        self.path = path
+        self.syncInterval = syncInterval
+        self.compactThreshold = compactThreshold
+        self.file = None                # Opened for appending on first use
+        self.count = None               # Records in the file, counted on first use
+        self.compacted = 0              # Records the last rewrite left, see append()
+        self.syncTimer = None           # Pending batched fsync
+        self.lock = threading.RLock()   # Appends come from the writer thread, reads from the UI
+
+    def append(self, username, notedata):
+        # Adds a save (a notesDS or notesChanges) to the end of the journal
+        kind = "changes" if isinstance(notedata, notesChanges) else "full"
+        line = json.dumps({"username": username, "kind": kind, "notes": notedata.toDict()},
+                          separators=(",", ":")) + "\n"
+        with self.lock:
+            count = self.size()
+            if self.file is None:
+                os.makedirs(os.path.dirname(self.path), exist_ok=True)
+                self.file = open(self.path, "a", encoding="utf-8")
+            self.file.write(line)
+            self.file.flush()
+            self.count = count + 1
+
+            if self.syncTimer is None:
+                self.syncTimer = threading.Timer(self.syncInterval, self.sync)
+                self.syncTimer.start()
+            # Records that can't be folded any further stay after a compaction, so it waits
+            # until the file has doubled since, or appending would rewrite it every time
+            if self.count >= max(self.compactThreshold, 2 * self.compacted):
+                self.compact()
+
+    def sync(self):
+        # Forces appended records to disk
+        with self.lock:
+            if self.syncTimer is not None:
+                self.syncTimer.cancel()
+                self.syncTimer = None
+            if self.file is not None:
+                os.fsync(self.file.fileno())
+
+    def read(self):
+        # Returns every record, oldest first. A line cut short by a crash is skipped.
+        records = []
+        with self.lock:
+            if not os.path.exists(self.path):
+                return records
+            with open(self.path, "r", encoding="utf-8") as f:
+                for line in f:
+                    try:
+                        records.append(json.loads(line))
+                    except ValueError:
+                        print("Skipping damaged journal record.")
+        return records
+
+    def size(self):
+        # Number of records in the journal
+        with self.lock:
+            if self.count is None:
+                self.count = len(self.read())
+            return self.count
+
+    def compact(self):
+        # Folds the records into at most two per (user, PDF), see foldRecords
+        with self.lock:
+            self.rewrite(foldRecords(self.read()))
+
+    def rewrite(self, records):
+        # Atomically replaces the journal's contents with records
+        with self.lock:
+            if self.file is not None:
+                self.file.close()
+                self.file = None
+            if self.syncTimer is not None:
+                self.syncTimer.cancel()
+                self.syncTimer = None
+            if not records:
+                if os.path.exists(self.path):
+                    os.remove(self.path)
+                self.count = self.compacted = 0
+                return
+
+            tempPath = self.path + ".tmp"
+            with open(tempPath, "w", encoding="utf-8") as f:
+                for record in records:
+                    f.write(json.dumps(record, separators=(",", ":")) + "\n")
+                f.flush()
+                os.fsync(f.fileno())
+            os.replace(tempPath, self.path)
+            self.count = self.compacted = len(records)
+
+    def replay(self, store, replayed=None):
+        # Sends the journal to store oldest first in one batch (see NotesStore.saveBatch),
+        # then empties it. On failure the records from the first one that wasn't written
+        # are kept. Every record is safe to send twice. replayed(record, result) is called
+        # for each record the store took.
+        with self.lock:
+            if self.size() == 0:
+                return
+            records = foldRecords(self.read())
+            print(f"Replaying {len(records)} offline saves.")
+            sent = 0
+            try:
+                results = store.saveBatch([recordSave(record) for record in records])
+                for record, result in zip(records, results):
+                    if isinstance(result, Exception):
+                        raise result
+                    sent += 1
+                    if replayed is not None:
+                        replayed(record, result)
+            finally:
+                self.rewrite(records[sent:])
+
+    def getNotes(self, username, pdfID, cached=None):
+        # Returns the notes of a PDF with the saves made offline applied on top of cached,
+        # the chapter as it was last loaded or saved online (notesDS.toDict(), None if it
+        # isn't known). None if neither has the chapter.
+        notes = cached
+        with self.lock:
+            for record in foldRecords(self.read()):
+                if record["username"] != username or record["notes"]["pdfID"] != pdfID:
+                    continue
+                if record["kind"] == "full":
+                    notes = unionNotes(notes, record["notes"]) if notes is not None else record["notes"]
+                elif notes is not None:
+                    notes = applyChanges(notes, record["notes"])
+        return notesDS.fromDict(notes) if notes is not None else None
+
+
+def recordSave(record):
+    # A journal record as the (username, notesDS or notesChanges) save it was made from.
+    # If a chapter was saved elsewhere since it was loaded, the store keeps the sections
+    # that save added and adds the offline ones (see NotesStore.updateUserNotes).
+    username, notes = record["username"], record["notes"]
+    if record["kind"] == "changes":
+        return username, notesChanges.fromDict(notes)
+    return username, notesDS.fromDict(notes)
+
+
+def foldRecords(records):
+    # Collapses the records of each (user, PDF) into at most two: the changes made to notes
+    # the database already has, then a full chapter that everything after it is folded into.
+    # Replaying the result has the same effect as replaying every record in order.
+    folded = OrderedDict()  # (username, pdfID) -> [changes or None, full or None]
+    for record in records:
+        key = (record["username"], record["notes"]["pdfID"])
+        entry = folded.setdefault(key, [None, None])
+        notes = record["notes"]
+        if record["kind"] == "full":
+            entry[1] = copy.deepcopy(notes) if entry[1] is None else unionNotes(entry[1], notes)
+        elif entry[1] is not None:
+            entry[1] = applyChanges(entry[1], notes)
+        else:
+            entry[0] = copy.deepcopy(notes) if entry[0] is None else mergeChanges(entry[0], notes)
+
+    result = []
+    for (username, _), (changes, full) in folded.items():
+        if changes is not None:
+            result.append({"username": username, "kind": "changes", "notes": changes})
+        if full is not None:
+            result.append({"username": username, "kind": "full", "notes": full})
+    return result
+
+
+def mergeChanges(older, newer):
+    # One changes record with the effect of older followed by newer
+    sections = OrderedDict((section["sectionID"], dict(section)) for section in older["sections"])
+    for sectionID in newer["deletedIDs"]:
+        sections.pop(sectionID, None)
+    for section in newer["sections"]:
+        previous = sections.get(section["sectionID"])
+        merged = dict(section)
+        merged["isNew"] = section["isNew"] or (previous is not None and previous["isNew"])
+        sections[section["sectionID"]] = merged
+
+    order = newer["order"] if newer["order"] is not None else older["order"]
+    if order is not None:
+        # Positions from the older record may be out of date
+        positions = {sectionID: position for position, sectionID in enumerate(order)}
+        for section in sections.values():
+            section["position"] = positions.get(section["sectionID"], section["position"])
+
+    deletedIDs = list(OrderedDict.fromkeys(older["deletedIDs"] + newer["deletedIDs"]))
+    title = newer["chapterTitle"] if newer["chapterTitle"] is not None else older["chapterTitle"]
+    return {"pdfID": newer["pdfID"], "chapterTitle": title, "sections": list(sections.values()),
+            "deletedIDs": deletedIDs, "order": order, "baseVersion": older.get("baseVersion")}
+
+
+# Local copy of each chapter as it was last loaded from or saved to the database, so the
+# notes can still be read while it can't be reached. One JSON file per chapter holds its
+# notesDS.toDict(), or null if the database didn't have the chapter.
+class NotesCache:
+    def __init__(self, directory=NOTES_CACHE_DIR):
+        self.directory = directory
+        self.lock = threading.Lock()
+
+    def path(self, username, pdfID):
+        # Named by a hash so any username and PDF ID make a safe file name
+        key = f"{username}\x1f{pdfID}".encode("utf-8")
+        return os.path.join(self.directory, hashlib.sha256(key).hexdigest()[:32] + ".json")
+
+    def load(self, username, pdfID):
+        # Returns (whether the chapter is cached, its notes as a dictionary or None)
+        try:
+            with self.lock, open(self.path(username, pdfID), "r", encoding="utf-8") as f:
+                return True, json.load(f)
+        except FileNotFoundError:
+            return False, None
+        except ValueError:
+            print("Ignoring damaged cached notes for", pdfID)
+            return False, None
+
+    def store(self, username, pdfID, notes):
+        # Keeps notes (a dictionary, or None for a chapter the database doesn't have)
+        path = self.path(username, pdfID)
+        with self.lock:
+            os.makedirs(self.directory, exist_ok=True)
+            tempPath = path + ".tmp"
+            with open(tempPath, "w", encoding="utf-8") as f:
+                json.dump(notes, f, separators=(",", ":"))
+            os.replace(tempPath, path)
+
+    def saved(self, username, notedata, version):
+        # Applies a save the database took, which moved the chapter to version
+        if isinstance(notedata, notesChanges):
+            cached = self.load(username, notedata.pdfID)[1]
+            if cached is None:
+                return # Only the database has the rest of the chapter, the next load caches it
+            notes = applyChanges(cached, notedata.toDict())
+        else:
+            notes = copy.deepcopy(notedata.toDict())
+            cached = self.load(username, notedata.pdfID)[1]
+            if cached is not None and version != (notedata.version or 0) + 1:
+                # The store merged it with the chapter saved elsewhere, see NotesStore.updateUserNotes
+                notes = unionNotes(cached, notes)
+        if isinstance(version, int):
+            notes["version"] = version
+        self.store(username, notedata.pdfID, notes)
+
+
+# Notes store that writes to the database when it can and to the journal when it can't.
+# Saves go to the journal while it has unreplayed records, so they always reach the
+# database in the order they were made. Every save also updates the notes search index
+# and the revision history. Chapters read or saved online are kept in the cache, and are
+# read from it (with the offline saves applied) while the database is down.
+class JournalStore:
+    def __init__(self, journal, store=None, notesIndex=None, history=None, cache=None):
+        self.journal = journal
+        self.store = store              # A NotesStore, None if there isn't one
+        self.notesIndex = notesIndex    # NotesIndex for note search, None to not keep one
+        self.history = history          # NotesHistory of each section, None to not keep one
+        self.cache = cache              # NotesCache for offline reads, None to not keep one
+        self.lock = threading.RLock()
+
+    @property
+    def connected(self):
+        return self.store is not None and self.store.connected
+
+    def getNotes(self, username, pdfID):
+        # Loads notes from the database (after replaying the journal), or offline from the
+        # cache and the journal. Offline, a chapter neither has may still be in the database,
+        # so rather than loading it as empty (and saving over it) this raises ConnectionFailure.
+        with self.lock:
+            if self.online():
+                try:
+                    self.journal.replay(self.store, self.replayed)
+                    notes = self.store.getNotes(username, pdfID)
+                except ConnectionFailure as e:
+                    self.wentOffline(e)
+                else:
+                    # The chapter may have been edited elsewhere, index what the database has
+                    if notes is not None and self.notesIndex is not None:
+                        self.notesIndex.indexChapter(username, notes)
+                    if self.cache is not None:
+                        self.cache.store(username, pdfID, notes.toDict() if notes is not None else None)
+                    return notes
+            cached, notes = self.cache.load(username, pdfID) if self.cache is not None else (False, None)
+            notes = self.journal.getNotes(username, pdfID, notes)
+            if notes is None and not cached and self.store is not None:
+                raise ConnectionFailure(f"Notes for {pdfID} weren't loaded online before, they can't be read offline")
+            return notes
+
+    def searchNotes(self, username, query, limit=20):
+        # Searches the user's notes, see NotesIndex.search
+        if self.notesIndex is None:
+            return []
+        return self.notesIndex.search(username, query, limit)
+
+    def sectionRevisions(self, username, pdfID, sectionID):
+        # Lists a section's saved revisions, newest first, see NotesHistory.revisions
+        if self.history is None:
+            return []
+        return self.history.revisions(username, pdfID, sectionID)
+
+    def sectionRevision(self, username, pdfID, sectionID, revision):
+        # One revision of a section as (title, notes), see NotesHistory.revision
+        if self.history is None:
+            return None
+        return self.history.revision(username, pdfID, sectionID, revision)
+
+    def buildSearchIndex(self, username):
+        # Indexes all of the user's notes if that hasn't been done on this computer yet.
+        # Later saves keep the index up to date, so this only runs once per user.
+        if self.notesIndex is None or self.notesIndex.isComplete(username):
+            return
+        with self.lock:
+            if not self.online():
+                return
+            try:
+                self.journal.replay(self.store, self.replayed)
+                chapters = self.store.getAllNotes(username)
+            except ConnectionFailure as e:
+                self.wentOffline(e)
+                return
+            self.notesIndex.rebuild(username, chapters)
+
+    def replay(self):
+        # Sends the journal to the database if it can be reached
+        with self.lock:
+            if self.online():
+                try:
+                    self.journal.replay(self.store, self.replayed)
+                except ConnectionFailure as e:
+                    self.wentOffline(e)
+
+    def replayInBackground(self):
+        # Sends the journal on a background thread, e.g. once the database is back
+        threading.Thread(target=self.replay, name="journal-replay", daemon=True).start()
+
+    def updateUserNotes(self, username, notedata):
+        return self.save(username, notedata)
+
+    def updateSections(self, username, changes):
+        return self.save(username, changes)
+
+    def save(self, username, notedata):
+        # Writes a notesDS or notesChanges to the database, or to the journal if that fails
+        with self.lock:
+            if self.online():
+                try:
+                    self.journal.replay(self.store, self.replayed) # Older offline saves must land first
+                    if isinstance(notedata, notesChanges):
+                        result = self.store.updateSections(username, notedata)
+                    else:
+                        result = self.store.updateUserNotes(username, notedata)
+                except ConnectionFailure as e:
+                    self.wentOffline(e)
+                else:
+                    self.recordSave(username, notedata)
+                    if self.cache is not None:
+                        self.cache.saved(username, notedata, result)
+                    return result
+            self.journal.append(username, notedata)
+            self.recordSave(username, notedata)
+            print("Database unavailable, notes saved to the offline journal.")
+            return None
+
+    def replayed(self, record, result):
+        # Keeps the cache up to date with an offline save the database just took
+        if self.cache is not None:
+            notes = record["notes"]
+            notedata = notesChanges.fromDict(notes) if record["kind"] == "changes" else notesDS.fromDict(notes)
+            self.cache.saved(record["username"], notedata, result)
+
+    def recordSave(self, username, notedata):
+        # Applies a save to the search index and the revision history, only the sections it
+        # contains are reindexed or compared with their latest revision
+        if self.notesIndex is not None:
+            self.notesIndex.update(username, notedata)
+        if self.history is not None:
+            self.history.record(username, notedata)
+
+    def online(self):
+        # Whether to try the database. This never waits for the server: while it is down
+        # the store's circuit breaker probes it in the background.
+        return self.connected
+
+    def wentOffline(self, error):
+        print("Lost connection to the database:", error)
+        self.store.markOffline()
@@ -0,0 +1,92 @@
+# File: migrate.py
+# Project: CS 422 Project 1
+# Authors: ARA Team
+# Creation date: 10-18-2026
+# Description: Copies notes from the embedded layout (arrays inside each users document)
+#              into the normalized SectionStore layout (chapters and sections collections).
+#              Users are streamed with a cursor and written in batches, so memory use does
+#              not depend on the size of the collection. Running it again is safe: every
+#              write is an upsert keyed by (username, pdf_id, sectionID).
+#              Usage: python Code/MongoDB/migrate.py [--batch-size N] [--uri URI]
+#              Afterwards set NOTES_LAYOUT = "normalized" in datastructs.py.
+
+# Modifications:
+# Date        Author       Change
+# ----------- ------------ -----------------------------------------------------
+# 10-18-2026  ARA Team     Initial creation of the file
+# ==============================================================================
+
+import argparse  # Used to read the command line options
+import time  # Used to report throughput
+from pymongo import UpdateOne, ReplaceOne
+
+from datastructs import Database, MONGO_URI, DB_NAME, legacySectionID, sectionDocument
+
+
+def flush(collection, operations):
+    # Sends the queued writes for one collection as a single unordered bulk write
+    if operations:
+        collection.bulk_write(operations, ordered=False)
+        operations.clear()
+
+
+def migrate(db, batchSize):
+    # Streams every users document into the chapters and sections collections
+    chapters = db.getCollection("chapters")
+    sections = db.getCollection("sections")
+    chapterOps, sectionOps = [], []
+    userCount = chapterCount = sectionCount = 0
+
+    for user in db.getCollection("users").find({}, {"_id": 0, "username": 1, "notes": 1}, batch_size=batchSize):
+        username = user.get("username")
+        userCount += 1
+        for note in user.get("notes") or []:
+            pdfID = note.get("pdf_id")
+            chapter = note.get("chapter") or {}
+            chapterOps.append(UpdateOne({"username": username, "pdf_id": pdfID},
+                                        {"$set": {"chapter_title": chapter.get("chapter_title", "")}},
+                                        upsert=True))
+            chapterCount += 1
+
+            for position, section in enumerate(chapter.get("sections") or []):
+                section = {
+                    "sectionID": section.get("sectionID") or legacySectionID(username, pdfID, position),
+                    "sectionTitle": section.get("sectionTitle", ""),
+                    "sectionNotes": section.get("sectionNotes", "")
+                }
+                sectionOps.append(ReplaceOne({"username": username, "pdf_id": pdfID, "sectionID": section["sectionID"]},
+                                             sectionDocument(username, pdfID, position, section), upsert=True))
+                sectionCount += 1
+                if len(sectionOps) >= batchSize:
+                    flush(sections, sectionOps)
+
+            if len(chapterOps) >= batchSize:
+                flush(chapters, chapterOps)
+
+    flush(chapters, chapterOps)
+    flush(sections, sectionOps)
+    return userCount, chapterCount, sectionCount
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Migrate embedded notes to one document per section.")
+    parser.add_argument("--uri", default=MONGO_URI, help="MongoDB connection string")
+    parser.add_argument("--db", default=DB_NAME, help="database name")
+    parser.add_argument("--batch-size", type=int, default=1000, help="writes per bulk_write call")
+    args = parser.parse_args()
+
+    db = Database(args.uri, args.db, "schema.json")
+    if not db.connected:
+        print("Migration needs a running MongoDB server.")
+        return
+    db.ensureIndexes()
+
+    start = time.perf_counter()
+    users, chapters, sections = migrate(db, args.batch_size)
+    elapsed = time.perf_counter() - start
+    print(f"Migrated {users} users, {chapters} chapters and {sections} sections in {elapsed:.1f}s.")
+    db.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,250 @@
+# File: notesindex.py
+# Project: CS 422 Project 1
+# Authors: ARA Team
+# Creation date: 10-18-2026
+# Description: This file contains NotesIndex, a local inverted index of each user's notes
+#              used for note search. It is updated from the save path with just the
+#              sections that changed, so a search never has to fetch or rescan the notes.
+#              Each user's index is kept in its own JSON file.
+
+# Modifications:
+# Date        Author       Change
+# ----------- ------------ -----------------------------------------------------
+# 10-18-2026  ARA Team     Initial creation of the file
+# 10-18-2026  ARA Team     The sorted vocabulary is updated in place instead of sorted again after every save
+# ==============================================================================
+
+import os
+import re
+import json
+import bisect
+import hashlib
+import threading
+
+from datastructs import notesChanges
+
+NOTES_INDEX_DIR = os.path.join(os.path.expanduser("~"), ".ara", "notes_index")
+NOTES_INDEX_VERSION = 1     # Bump when the file format or tokenizer changes, old files are then rebuilt
+NOTES_INDEX_SAVE_DELAY = 2.0 # Seconds changes may wait before the index file is rewritten
+TITLE_WEIGHT = 3            # A word in a section title counts as much as this many in its notes
+SNIPPET_LENGTH = 80         # Characters of notes shown around the first match
+
+WORD_PATTERN = re.compile(r"[^\W_]+") # Letters and digits
+
+
+def tokenize(text):
+    # Splits text into lower case words
+    return [word.lower() for word in WORD_PATTERN.findall(text)]
+
+
+# Inverted index of every user's notes. For each user it keeps:
+#   chapters: pdfID -> chapter title
+#   sections: "pdfID<US>sectionID" -> {pdfID, sectionID, sectionTitle, sectionNotes}
+#   postings: word -> {section key: weighted count}
+# and whether it was built from all of the user's notes (complete).
+class NotesIndex:
+    def __init__(self, directory=NOTES_INDEX_DIR, saveDelay=NOTES_INDEX_SAVE_DELAY):
+        self.directory = directory
+        self.saveDelay = saveDelay
+        self.users = {}                 # username -> index, loaded on first use
+        self.vocabulary = {}            # username -> sorted words, for prefix matches, kept up to date once built
+        self.dirty = set()              # Users whose file is out of date
+        self.saveTimer = None           # Pending write of the dirty users
+        self.lock = threading.RLock()   # Saves come from the writer thread, searches from the UI
+
+    def isComplete(self, username):
+        # Whether the index has all of the user's notes, not just the ones saved here
+        with self.lock:
+            return self.user(username)["complete"]
+
+    def rebuild(self, username, chapters):
+        # Indexes all of a user's notes (a list of notesDS) from scratch
+        with self.lock:
+            self.users[username] = self.emptyIndex()
+            self.vocabulary.pop(username, None)
+            for notes in chapters:
+                self.indexChapter(username, notes)
+            self.users[username]["complete"] = True
+            self.changed(username)
+
+    def update(self, username, notedata):
+        # Applies a save (a notesDS or notesChanges) to the index
+        with self.lock:
+            if not isinstance(notedata, notesChanges):
+                self.indexChapter(username, notedata)
+                return
+            index = self.user(username)
+            if notedata.chapterTitle is not None:
+                index["chapters"][notedata.pdfID] = notedata.chapterTitle
+            for sectionID in notedata.deletedIDs:
+                self.removeSection(username, sectionKey(notedata.pdfID, sectionID))
+            for section in notedata.sections:
+                self.addSection(username, notedata.pdfID, section)
+            self.changed(username)
+
+    def indexChapter(self, username, notes):
+        # Replaces everything indexed for a chapter with a notesDS
+        with self.lock:
+            index = self.user(username)
+            index["chapters"][notes.pdfID] = notes.chapterTitle
+            for key in [key for key, section in index["sections"].items() if section["pdfID"] == notes.pdfID]:
+                self.removeSection(username, key)
+            for section in notes.sections:
+                self.addSection(username, notes.pdfID, section)
+            self.changed(username)
+
+    def search(self, username, query, limit=20):
+        # Returns up to limit sections containing every word of query, best first, as
+        # dictionaries with pdfID, sectionID, chapterTitle, sectionTitle and snippet.
+        # The last word also matches longer words it starts, so results show while typing.
+        terms = tokenize(query)
+        if not terms:
+            return []
+        with self.lock:
+            index = self.user(username)
+            postings = index["postings"]
+            scores = None
+            for position, term in enumerate(terms):
+                if position == len(terms) - 1:
+                    matches = {}
+                    for word in self.wordsStartingWith(username, term):
+                        for key, count in postings[word].items():
+                            matches[key] = matches.get(key, 0) + count
+                else:
+                    matches = postings.get(term, {})
+                if scores is None:
+                    scores = dict(matches)
+                else:
+                    scores = {key: score + matches[key] for key, score in scores.items() if key in matches}
+                if not scores:
+                    return []
+
+            results = []
+            for key in sorted(scores, key=scores.get, reverse=True)[:limit]:
+                section = index["sections"][key]
+                results.append({
+                    "pdfID": section["pdfID"],
+                    "sectionID": section["sectionID"],
+                    "chapterTitle": index["chapters"].get(section["pdfID"], ""),
+                    "sectionTitle": section["sectionTitle"],
+                    "snippet": snippet(section["sectionNotes"], terms)
+                })
+            return results
+
+    def flush(self):
+        # Writes the index of every user that changed
+        with self.lock:
+            if self.saveTimer is not None:
+                self.saveTimer.cancel()
+                self.saveTimer = None
+            for username in self.dirty:
+                path = self.path(username)
+                os.makedirs(self.directory, exist_ok=True)
+                tempPath = path + ".tmp"
+                with open(tempPath, "w", encoding="utf-8") as f:
+                    json.dump(self.users[username], f, separators=(",", ":"))
+                os.replace(tempPath, path)
+            self.dirty.clear()
+
+    def user(self, username):
+        # Returns a user's index, loading it from disk the first time
+        if username not in self.users:
+            index = None
+            path = self.path(username)
+            if os.path.exists(path):
+                try:
+                    with open(path, "r", encoding="utf-8") as f:
+                        index = json.load(f)
+                except ValueError:
+                    print("Rebuilding damaged notes index:", path)
+            if index is None or index.get("version") != NOTES_INDEX_VERSION:
+                index = self.emptyIndex()
+            self.users[username] = index
+        return self.users[username]
+
+    def emptyIndex(self):
+        return {"version": NOTES_INDEX_VERSION, "complete": False, "chapters": {}, "sections": {}, "postings": {}}
+
+    def path(self, username):
+        # Index file of a user, named by a hash so any username is a safe file name
+        return os.path.join(self.directory, hashlib.sha256(username.encode("utf-8")).hexdigest()[:32] + ".json")
+
+    def addSection(self, username, pdfID, section):
+        # Indexes one section of a user's notes, replacing what was indexed for it before
+        index = self.user(username)
+        words = self.vocabulary.get(username)
+        key = sectionKey(pdfID, section["sectionID"])
+        self.removeSection(username, key)
+        index["sections"][key] = {"pdfID": pdfID, "sectionID": section["sectionID"],
+                                  "sectionTitle": section["sectionTitle"], "sectionNotes": section["sectionNotes"]}
+        for word, count in sectionCounts(section["sectionTitle"], section["sectionNotes"]).items():
+            keys = index["postings"].get(word)
+            if keys is None:
+                keys = index["postings"][word] = {}
+                if words is not None:
+                    bisect.insort(words, word)
+            keys[key] = count
+
+    def removeSection(self, username, key):
+        # Removes one section from a user's index, the postings to drop come from its stored text
+        index = self.user(username)
+        words = self.vocabulary.get(username)
+        section = index["sections"].pop(key, None)
+        if section is None:
+            return
+        for word in sectionCounts(section["sectionTitle"], section["sectionNotes"]):
+            keys = index["postings"].get(word)
+            if keys is not None:
+                keys.pop(key, None)
+                if not keys:
+                    del index["postings"][word]
+                    if words is not None:
+                        position = bisect.bisect_left(words, word)
+                        if position < len(words) and words[position] == word:
+                            del words[position]
+
+    def wordsStartingWith(self, username, prefix):
+        # Indexed words starting with prefix, found by bisecting the sorted vocabulary. It is
+        # sorted once, after that addSection and removeSection keep it sorted.
+        words = self.vocabulary.get(username)
+        if words is None:
+            words = self.vocabulary[username] = sorted(self.user(username)["postings"])
+        start = bisect.bisect_left(words, prefix)
+        end = start
+        while end < len(words) and words[end].startswith(prefix):
+            end += 1
+        return words[start:end]
+
+    def changed(self, username):
+        # Marks a user's index changed and schedules writing it
+        self.dirty.add(username)
+        if self.saveTimer is None:
+            self.saveTimer = threading.Timer(self.saveDelay, self.flush)
+            self.saveTimer.start()
+
+
+def sectionKey(pdfID, sectionID):
+    return f"{pdfID}\x1f{sectionID}"
+
+
+def sectionCounts(title, notes):
+    # Weighted count of each word in a section
+    counts = {}
+    for word in tokenize(title):
+        counts[word] = counts.get(word, 0) + TITLE_WEIGHT
+    for word in tokenize(notes):
+        counts[word] = counts.get(word, 0) + 1
+    return counts
+
+
+def snippet(notes, terms):
+    # Part of the notes around the first search word found in them
+    lowered = notes.lower()
+    start = 0
+    for term in terms:
+        found = lowered.find(term)
+        if found >= 0:
+            start = max(0, found - SNIPPET_LENGTH // 4)
+            break
+    text = " ".join(notes[start:start + SNIPPET_LENGTH].split())
+    return ("..." if start > 0 else "") + text + ("..." if start + SNIPPET_LENGTH < len(notes) else "")
@@ -0,0 +1,358 @@
+# File: notesservice.py
+# Project: CS 422 Project 1
+# Authors: ARA Team
+# Creation date: 10-18-2026
+# Description: This file contains the notes service, an optional asyncio HTTP server that
+#              sits between the desktop clients and the notes store, so a whole class shares
+#              one pool of database connections instead of each client opening its own.
+#              Requests for the same chapter arriving together share one read, and saves are
+#              coalesced per (user, PDF) and written in batches. Clients use it by setting
+#              STORAGE_BACKEND = "service" (see servicestore.py). It only needs the standard
+#              library, and --memory runs it on an in-memory store for testing.
+#              Usage: python Code/MongoDB/notesservice.py [--host HOST] [--port PORT] [--memory]
+
+# Modifications:
+# Date        Author       Change
+# ----------- ------------ -----------------------------------------------------
+# 10-18-2026  ARA Team     Initial creation of the file
+# 10-18-2026  ARA Team     Saves return the chapter's new version, whole chapters are written with compare-and-set
+# 10-18-2026  ARA Team     The chapters of a batch are written in parallel on the thread pool
+# 10-18-2026  ARA Team     A batch is written with the store's saveBatch(), one bulk write on the normalized layout
+# ==============================================================================
+
+import copy
+import json
+import asyncio
+import argparse
+import threading
+import urllib.parse
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from pymongo.errors import ConnectionFailure
+
+import datastructs
+from datastructs import NotesStore, SaveConflict, notesDS, notesChanges, getNotesStore, applyChanges, saveOne, MAX_POOL_SIZE
+from journal import mergeChanges
+
+SERVICE_HOST = "127.0.0.1"
+SERVICE_PORT = 8422
+WRITE_BATCH_DELAY = 0.01        # Seconds a save waits for others to share its batch write
+MAX_REQUEST_BYTES = 16 * 1024 * 1024
+STATUS_TEXT = {200: "OK", 400: "Bad Request", 404: "Not Found", 405: "Method Not Allowed",
+               409: "Conflict", 413: "Payload Too Large", 500: "Internal Server Error", 503: "Service Unavailable"}
+
+
+class BadRequest(Exception):
+    pass
+
+
+# Serves the notes of a NotesStore. The store is blocking, so its calls run on a thread
+# pool no bigger than the database connection pool, while the event loop handles every
+# client connection.
+class NotesService:
+    def __init__(self, store, workers=MAX_POOL_SIZE, batchDelay=WRITE_BATCH_DELAY):
+        self.store = store
+        self.batchDelay = batchDelay
+        self.executor = ThreadPoolExecutor(workers, thread_name_prefix="notes-service")
+        self.reads = {}             # (username, pdfID) -> task of the getNotes every request for it waits on
+        self.writes = OrderedDict() # (username, pdfID) -> pending save, see write()
+        self.writing = {}           # The saves of the batch being written
+        self.writeTask = None       # Task writing batches while there are pending saves
+        self.stats = {"requests": 0, "reads": 0, "sharedReads": 0, "saves": 0,
+                      "coalescedSaves": 0, "batches": 0}
+
+    async def call(self, function, *args):
+        # Runs a blocking store call on the thread pool
+        return await asyncio.get_running_loop().run_in_executor(self.executor, function, *args)
+
+    async def getNotes(self, username, pdfID):
+        # Loads a chapter. Requests for a chapter already being loaded wait for that load.
+        key = (username, pdfID)
+        await self.waitForWrites(lambda pending: pending == key) # Reads see every earlier save
+        task = self.reads.get(key)
+        if task is None:
+            self.stats["reads"] += 1
+            task = self.reads[key] = asyncio.ensure_future(self.call(self.store.getNotes, username, pdfID))
+            task.add_done_callback(lambda done: self.reads.pop(key, None) if self.reads.get(key) is done else None)
+        else:
+            self.stats["sharedReads"] += 1
+        return await asyncio.shield(task)
+
+    async def getAllNotes(self, username):
+        await self.waitForWrites(lambda pending: pending[0] == username)
+        return await self.call(self.store.getAllNotes, username)
+
+    async def deleteSection(self, username, pdfID, sectionID):
+        key = (username, pdfID)
+        await self.waitForWrites(lambda pending: pending == key)
+        self.reads.pop(key, None)
+        await self.call(self.store.deleteSection, username, pdfID, sectionID)
+
+    async def write(self, username, kind, notes):
+        # Queues a save, notes being a notesDS ("full") or notesChanges ("changes") as a
+        # dictionary, and returns the chapter's version once it is written. Changes to a
+        # chapter that already has a save waiting are folded into it, so only the combined
+        # result is written. A client only has one save of a chapter in flight at a time, so
+        # saves meeting here come from different clients: a whole chapter waits for the
+        # pending save instead of replacing it, and the store merges the two.
+        key = (username, notes["pdfID"])
+        self.stats["saves"] += 1
+        self.reads.pop(key, None) # A read started before this save must not be shared with later requests
+        while kind == "full" and key in self.writes:
+            try:
+                await asyncio.shield(self.writes[key]["done"])
+            except Exception:
+                pass # The save's own request reports the error
+        pending = self.writes.get(key)
+        if pending is None:
+            pending = self.writes[key] = {"kind": kind, "notes": copy.deepcopy(notes),
+                                          "done": asyncio.get_running_loop().create_future()}
+        else:
+            self.stats["coalescedSaves"] += 1
+            if pending["kind"] == "full":
+                pending["notes"] = applyChanges(pending["notes"], notes)
+            else:
+                pending["notes"] = mergeChanges(pending["notes"], notes)
+        if self.writeTask is None:
+            self.writeTask = asyncio.ensure_future(self.writeBatches())
+        return await asyncio.shield(pending["done"])
+
+    async def waitForWrites(self, matches):
+        # Waits for the pending and in-flight saves of the chapters matches() picks
+        for batch in (self.writing, self.writes):
+            for key, pending in list(batch.items()):
+                if matches(key):
+                    try:
+                        await asyncio.shield(pending["done"])
+                    except Exception:
+                        pass # The save's own request reports the error
+
+    async def writeBatches(self):
+        # Writes the pending saves in batches until there are none left. A chapter saved
+        # again while its batch is being written goes in the next batch, after it.
+        try:
+            while self.writes:
+                await asyncio.sleep(self.batchDelay) # Let saves arriving together share the batch
+                self.writing, self.writes = self.writes, OrderedDict()
+                self.stats["batches"] += 1
+                # The whole batch goes to the store at once: SectionStore sends it in one
+                # bulk write, each chapter still checked against its version, and only a
+                # chapter that conflicts is merged and written again on its own. A store
+                # that would write them one at a time gets each on its own pool thread.
+                keys = list(self.writing)
+                saves = [pendingSave(key, self.writing[key]) for key in keys]
+                if type(self.store).saveBatch is NotesStore.saveBatch:
+                    results = await asyncio.gather(*(self.call(saveOne, self.store, *save) for save in saves),
+                                                   return_exceptions=True)
+                else:
+                    try:
+                        results = await self.call(self.store.saveBatch, saves)
+                    except Exception as e:
+                        results = [e] * len(keys)
+                for key, result in zip(keys, results):
+                    if isinstance(result, Exception):
+                        self.writing[key]["done"].set_exception(result)
+                    else:
+                        self.writing[key]["done"].set_result(result)
+                self.writing = {}
+        finally:
+            self.writeTask = None
+
+    async def handle(self, reader, writer):
+        # Serves the requests of one client connection, kept open between requests
+        try:
+            while True:
+                try:
+                    request = await readRequest(reader)
+                except BadRequest as e:
+                    await sendResponse(writer, 400, {"error": str(e)}, False)
+                    return
+                if request is None:
+                    return
+                method, parts, query, body, keepAlive = request
+                self.stats["requests"] += 1
+                status, payload = await self.dispatch(method, parts, query, body)
+                await sendResponse(writer, status, payload, keepAlive)
+                if not keepAlive:
+                    return
+        except (ConnectionError, asyncio.IncompleteReadError):
+            pass # The client went away
+        finally:
+            writer.close()
+
+    async def dispatch(self, method, parts, query, body):
+        # Routes a request, returns (status, JSON payload)
+        #   GET    /health                              whether the store can be reached
+        #   GET    /stats                               request, read and save counts
+        #   GET    /notes/USER                          every chapter of a user
+        #   GET    /notes/USER/PDF                      one chapter, 404 if there isn't one
+        #   PUT    /notes/USER/PDF                      save a whole chapter (notesDS.toDict())
+        #   PATCH  /notes/USER/PDF                      save changes (notesChanges.toDict())
+        #   DELETE /notes/USER/PDF/sections/ID          delete a section
+        # Saves answer with the chapter's new version.
+        try:
+            if parts == ["health"] and method == "GET":
+                return 200, {"ok": await self.call(self.store.checkConnection)}
+            if parts == ["stats"] and method == "GET":
+                return 200, self.stats
+            if len(parts) == 2 and parts[0] == "notes" and method == "GET":
+                return 200, [notes.toDict() for notes in await self.getAllNotes(parts[1])]
+            if len(parts) == 3 and parts[0] == "notes":
+                username, pdfID = parts[1], parts[2]
+                if method == "GET":
+                    notes = await self.getNotes(username, pdfID)
+                    if notes is None:
+                        return 404, {"error": "no notes"}
+                    return 200, notes.toDict()
+                if method in ("PUT", "PATCH"):
+                    data = json.loads(body)
+                    if data.get("pdfID") != pdfID:
+                        raise BadRequest("pdfID doesn't match the URL")
+                    if method == "PUT":
+                        version = await self.write(username, "full", notesDS.fromDict(data).toDict())
+                    else:
+                        version = await self.write(username, "changes", notesChanges.fromDict(data).toDict())
+                    return 200, {"ok": True, "version": version}
+            if len(parts) == 5 and parts[0] == "notes" and parts[3] == "sections" and method == "DELETE":
+                await self.deleteSection(parts[1], parts[2], parts[4])
+                return 200, {"ok": True}
+            return 404 if method in ("GET", "PUT", "PATCH", "DELETE") else 405, {"error": "unknown request"}
+        except (BadRequest, ValueError, KeyError, TypeError, AttributeError) as e:
+            return 400, {"error": repr(e)}
+        except ConnectionFailure as e:
+            return 503, {"error": str(e)}
+        except SaveConflict as e:
+            return 409, {"error": str(e)}
+        except Exception as e:
+            print("Error serving request:", repr(e))
+            return 500, {"error": repr(e)}
+
+    async def serve(self, host=SERVICE_HOST, port=SERVICE_PORT):
+        # Accepts clients until cancelled
+        server = await asyncio.start_server(self.handle, host, port)
+        print(f"Serving notes on http://{host}:{port}/")
+        async with server:
+            await server.serve_forever()
+
+    def close(self):
+        self.executor.shutdown(wait=True)
+
+
+def pendingSave(key, pending):
+    # A pending save as the (username, notesDS or notesChanges) the store writes
+    if pending["kind"] == "full":
+        return key[0], notesDS.fromDict(pending["notes"])
+    return key[0], notesChanges.fromDict(pending["notes"])
+
+
+async def readRequest(reader):
+    # Reads one HTTP/1.1 request, returns (method, path parts, query, body, keep alive)
+    # or None once the client closes the connection
+    line = await reader.readline()
+    if not line:
+        return None
+    try:
+        method, target, version = line.decode("latin-1").split()
+    except ValueError:
+        raise BadRequest("malformed request line")
+    headers = {}
+    while True:
+        line = await reader.readline()
+        if line in (b"\r\n", b"\n", b""):
+            break
+        name, _, value = line.decode("latin-1").partition(":")
+        headers[name.strip().lower()] = value.strip()
+    length = int(headers.get("content-length") or 0)
+    if length > MAX_REQUEST_BYTES:
+        raise BadRequest("request too large")
+    body = await reader.readexactly(length) if length else b""
+    url = urllib.parse.urlsplit(target)
+    parts = [urllib.parse.unquote(part) for part in url.path.strip("/").split("/") if part]
+    keepAlive = headers.get("connection", "").lower() != "close" and version == "HTTP/1.1"
+    return method.upper(), parts, urllib.parse.parse_qs(url.query), body, keepAlive
+
+
+async def sendResponse(writer, status, payload, keepAlive):
+    data = json.dumps(payload).encode("utf-8")
+    head = (f"HTTP/1.1 {status} {STATUS_TEXT.get(status, '')}\r\n"
+            f"Content-Type: application/json\r\nContent-Length: {len(data)}\r\n"
+            f"Connection: {'keep-alive' if keepAlive else 'close'}\r\n\r\n")
+    writer.write(head.encode("latin-1") + data)
+    await writer.drain()
+
+
+# Notes store kept in memory, a stand-in for MongoDB when testing the service or clients
+class MemoryStore(NotesStore):
+    connected = True
+
+    def __init__(self):
+        self.chapters = OrderedDict()   # (username, pdfID) -> notesDS.toDict()
+        self.lock = threading.Lock()    # Called from the service's thread pool
+
+    def getNotes(self, username, pdfID):
+        with self.lock:
+            chapter = self.chapters.get((username, pdfID))
+            return notesDS.fromDict(chapter) if chapter is not None else None
+
+    def getAllNotes(self, username):
+        with self.lock:
+            return [notesDS.fromDict(chapter) for (user, _), chapter in self.chapters.items() if user == username]
+
+    def writeChapter(self, username, notedata, baseVersion):
+        with self.lock:
+            key = (username, notedata.pdfID)
+            chapter = self.chapters.get(key)
+            if (chapter["version"] if chapter is not None else None) != baseVersion:
+                return None
+            self.chapters[key] = dict(copy.deepcopy(notedata.toDict()), version=(baseVersion or 0) + 1)
+            return self.chapters[key]["version"]
+
+    def writeChanges(self, username, changes, baseVersion):
+        with self.lock:
+            key = (username, changes.pdfID)
+            chapter = self.chapters.get(key)
+            if chapter is None or chapter["version"] != baseVersion:
+                return None
+            self.chapters[key] = dict(applyChanges(chapter, changes.toDict()), version=baseVersion + 1)
+            return baseVersion + 1
+
+    def deleteSection(self, username, pdfID, sectionID):
+        with self.lock:
+            chapter = self.chapters.get((username, pdfID))
+            if chapter is not None:
+                chapter["sections"] = [section for section in chapter["sections"] if section["sectionID"] != sectionID]
+                chapter["version"] += 1
+
+    def exportNotes(self, batchSize=1000):
+        for (username, _), chapter in list(self.chapters.items()):
+            yield username, notesDS.fromDict(chapter)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Serve notes to the desktop clients over HTTP.")
+    parser.add_argument("--host", default=SERVICE_HOST, help="address to listen on")
+    parser.add_argument("--port", type=int, default=SERVICE_PORT, help="port to listen on")
+    parser.add_argument("--memory", action="store_true", help="keep notes in memory instead of the configured store")
+    parser.add_argument("--workers", type=int, default=MAX_POOL_SIZE, help="store calls run at the same time")
+    parser.add_argument("--batch-delay", type=float, default=WRITE_BATCH_DELAY, help="seconds saves wait to be batched")
+    args = parser.parse_args()
+
+    if args.memory:
+        store = MemoryStore()
+    elif datastructs.STORAGE_BACKEND == "service":
+        print("The service needs a database, set STORAGE_BACKEND to mongo or sqlite (or use --memory).")
+        return
+    else:
+        store = getNotesStore()
+    service = NotesService(store, args.workers, args.batch_delay)
+    try:
+        asyncio.run(service.serve(args.host, args.port))
+    except KeyboardInterrupt:
+        pass
+    finally:
+        service.close()
+        print("Service stats:", service.stats)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,138 @@
+# File: notewriter.py
+# Project: CS 422 Project 1
+# Authors: ARA Team
+# Creation date: 10-18-2026
+# Description: This file contains NotesWriter, a background thread that writes notes to
+#              the database so saving never blocks the TKinter event loop. Saves of the
+#              same (user, PDF) waiting in the queue are coalesced into the newest one.
+
+# Modifications:
+# Date        Author       Change
+# ----------- ------------ -----------------------------------------------------
+# 10-18-2026  ARA Team     Initial creation of the file
+# 10-18-2026  ARA Team     Incremental saves (notesChanges) go through updateSections()
+# 10-18-2026  ARA Team     A save queued behind one of the same chapter moves to the version that one wrote
+# 10-18-2026  ARA Team     submit() reports a full queue instead of blocking, waiting() for progress on quit
+# ==============================================================================
+
+import threading
+import queue
+from collections import OrderedDict
+
+from datastructs import notesChanges
+
+MAX_PENDING_SAVES = 16      # Distinct (user, PDF) saves allowed to wait, more are refused (see SaveQueueFull)
+DELIVERY_INTERVAL_MS = 50   # How often finished saves are reported back to the UI
+
+
+# Reported to a save's callback when maxPending other saves are already waiting. Nothing
+# was written, so the notes are sent again with the next save.
+class SaveQueueFull(Exception):
+    pass
+
+
+# Writes notes on a background thread.
+# Finished saves are reported through callbacks that run on the Tk thread (see attach),
+# since TKinter widgets must not be touched from the writer thread.
+class NotesWriter:
+    def __init__(self, maxPending=MAX_PENDING_SAVES):
+        self.maxPending = maxPending
+        self.pending = OrderedDict()            # (username, pdfID) -> [store, notedata, callbacks]
+        self.condition = threading.Condition()  # Guards pending, wakes the writer and flush()
+        self.writing = False                    # Whether the writer is in the middle of a save
+        self.results = queue.Queue()            # (callbacks, result, error) waiting to be delivered
+        self.thread = threading.Thread(target=self._run, name="notes-writer", daemon=True)
+        self.thread.start()
+
+    def submit(self, store, username, notedata, callback=None):
+        # Queues a save of notedata, a notesDS (whole chapter, store.updateUserNotes) or a
+        # notesChanges (store.updateSections). If a save for the same user and PDF is still
+        # waiting it is replaced, so only the newest notes are written.
+        # callback(result, error) is called on the Tk thread once the save is done. If the
+        # queue is full the save is dropped and the callback gets SaveQueueFull, submit()
+        # runs on the Tk thread so it never waits for a slot. Returns whether the save
+        # replaced a waiting one.
+        key = (username, notedata.pdfID)
+        with self.condition:
+            if key in self.pending:
+                entry = self.pending[key]
+                entry[0], entry[1] = store, notedata
+                coalesced = True
+            else:
+                if len(self.pending) >= self.maxPending:
+                    if callback is not None:
+                        error = SaveQueueFull("too many saves are waiting to be written, try again shortly")
+                        self.results.put(([callback], None, error))
+                    return False
+                entry = self.pending[key] = [store, notedata, []]
+                coalesced = False
+            if callback is not None:
+                entry[2].append(callback)
+            self.condition.notify_all()
+        return coalesced
+
+    def waiting(self):
+        # Number of saves queued or being written
+        with self.condition:
+            return len(self.pending) + (1 if self.writing else 0)
+
+    def flush(self, timeout=None):
+        # Waits until every queued save has been written, returns False on timeout
+        with self.condition:
+            return self.condition.wait_for(lambda: not self.pending and not self.writing, timeout)
+
+    def attach(self, widget):
+        # Starts delivering finished saves to their callbacks from the widget's event loop
+        self.deliver()
+        widget.after(DELIVERY_INTERVAL_MS, self.attach, widget)
+
+    def deliver(self):
+        # Runs the callbacks of every finished save (call from the Tk thread)
+        while True:
+            try:
+                callbacks, result, error = self.results.get_nowait()
+            except queue.Empty:
+                return
+            for callback in callbacks:
+                callback(result, error)
+
+    def _run(self):
+        while True:
+            with self.condition:
+                while not self.pending:
+                    self.condition.wait()
+                key, (store, notedata, callbacks) = self.pending.popitem(last=False)
+                self.writing = True
+
+            result, error = None, None
+            try:
+                if isinstance(notedata, notesChanges):
+                    result = store.updateSections(key[0], notedata)
+                else:
+                    result = store.updateUserNotes(key[0], notedata)
+            except Exception as e:  # Report any database failure back to the UI
+                error = e
+            self.results.put((callbacks, result, error))
+
+            with self.condition:
+                self.writing = False
+                if isinstance(result, int) and key in self.pending:
+                    rebase(self.pending[key][1], versionOf(notedata), result)
+                self.condition.notify_all()
+
+
+def versionOf(notedata):
+    # Version of the stored chapter a notesDS or notesChanges was made from
+    return notedata.baseVersion if isinstance(notedata, notesChanges) else notedata.version
+
+
+def rebase(notedata, oldVersion, newVersion):
+    # A save queued while an earlier one of the same chapter was written was made from the
+    # same version, and contains that save's changes too. Moving it to the version the
+    # earlier save wrote keeps it from looking like a conflict with its own earlier save.
+    if versionOf(notedata) != oldVersion:
+        return
+    if isinstance(notedata, notesChanges):
+        notedata.baseVersion = newVersion
+    else:
+        notedata.version = newVersion
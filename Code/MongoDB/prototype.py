@@ -15,9 +15,26 @@
  # 04-21-2024  John Hooft   Added User class getNotes() function, and server logic.
  # 04-22-2024  John Hooft   Moved classes / objects to datastructs.py file.
  # 04-22-2024  John Hooft   Update printNotes() to work with updated getNotes()
+ # 10-18-2026  ARA Team     Use the shared database connection instead of one per command
+ # 10-18-2026  ARA Team     Go through the configured notes store (embedded or normalized layout)
+ # 10-18-2026  ARA Team     Batch import and export of JSON Lines, the prompts moved to the interactive command
+ #                          Usage: python prototype.py import|export FILE [--batch-size N]
+ #                                 python prototype.py [interactive]
+ # 10-18-2026  ARA Team     'del' deletes sections by ID, the sections with the entered title are looked up first
+ # 10-18-2026  ARA Team     Export is refused for stores that can't stream every chapter, --batch-size must be >= 1
+ # 10-18-2026  ARA Team     Imported sections without a sectionID get a new one instead of the line being skipped
  # ==============================================================================
 
-from datastructs import notesDS, User, Database
+import sys  # Used for stdin/stdout and the exit status
+import json  # Notes are imported and exported as JSON Lines
+import time  # Used to report throughput
+import argparse  # Used to read the command line options
+import contextlib  # Used so stdin/stdout aren't closed after use
+
+from datastructs import notesDS, User, NotesStore, getNotesStore
+import datastructs  # Used to name the configured STORAGE_BACKEND
+
+BATCH_SIZE = 1000 # Chapters per bulk write when importing, documents per cursor batch when exporting
 
 # Prompts user to enter notes
 def promptNotes(user):
@@ -34,8 +51,14 @@ def promptNotes(user):
 
         if command.lower() == 'del':
             sectionTitle = input("Enter section title you want to delete: ")
-            db = Database("mongodb://localhost:27017/", "active_reading_assistant", "schema.json")
-            db.deleteSection(user.userName, pdfID, sectionTitle)
+            db = getNotesStore()
+            notedata = db.getNotes(user.userName, pdfID)
+            sectionIDs = [section['sectionID'] for section in (notedata.sections if notedata else [])
+                          if section['sectionTitle'] == sectionTitle]
+            if not sectionIDs:
+                print("Section not found or deletion unsuccessful")
+            for sectionID in sectionIDs:
+                db.deleteSection(user.userName, pdfID, sectionID)
 
         elif command.lower() == 'section':
             sectionTitle = input("Enter section title: ")
@@ -51,14 +74,11 @@ def promptNotes(user):
     return notesOBJ
 
 def printNotes(userclass, pdfID):
-    db = Database("mongodb://localhost:27017/", "active_reading_assistant", "schema.json")
-    usersCollection = db.getCollection("users")
     username = userclass.userName
 
-    user = usersCollection.find_one({"username": username})
+    notedata = userclass.getNotes(username, pdfID)
 
-    if user:
-        notedata = userclass.getNotes(username, pdfID)
+    if notedata:
         print(f"Notes for user {username} on PDF ID {pdfID}:")
 
         print(f"Chapter Title: {notedata.chapterTitle}")
@@ -68,19 +88,19 @@ def printNotes(userclass, pdfID):
             print(f"  Section Notes: {section['sectionNotes']}")
             print()  # For better readability
     else:
-        print(f"User {username} not found.")
+        print(f"No notes found for user {username}.")
 
 
  # Saves notes to DB after user types 'done'
 def saveNotes(username, notesOBJ):
 
-    # Connecting to DB on 27017
+    # Shared connection to the DB, see MONGO_URI in datastructs.py
     # URL will change when hosted with IX-dev
-    db = Database("mongodb://localhost:27017/", "active_reading_assistant", "schema.json")
+    db = getNotesStore()
     db.updateUserNotes(username, notesOBJ)
 
 
-def main():
+def interactive():
     # Prompt the user for their username
     username = input("Enter your username: ")
 
@@ -103,5 +123,89 @@ def main():
     del(notes)
     del(user)
 
+def importNotes(store, lines, batchSize, log):
+    # Saves every chapter in lines, one JSON object per line with a username and the
+    # notesDS.toDict() fields, batchSize chapters per bulk write. A section without a
+    # sectionID gets a new one, as in the notes panel. Lines are read as they come, so memory
+    # use only depends on the batch size. Returns (chapters, sections, skipped).
+    batch = []
+    chapters = sections = skipped = 0
+    for lineNumber, line in enumerate(lines, 1):
+        if not line.strip():
+            continue
+        try:
+            record = json.loads(line)
+            notes = notesDS.fromDict(record)
+            username = record["username"]
+        except (ValueError, KeyError, TypeError) as e:
+            print(f"Skipping line {lineNumber}: {e!r}", file=log)
+            skipped += 1
+            continue
+        batch.append((username, notes))
+        sections += len(notes.sections)
+        if len(batch) >= batchSize:
+            chapters += store.bulkUpdateNotes(batch)
+            batch = []
+    if batch:
+        chapters += store.bulkUpdateNotes(batch)
+    return chapters, sections, skipped
+
+def exportNotes(store, out, batchSize):
+    # Writes every chapter of every user to out, one JSON object per line. Returns (chapters, sections).
+    chapters = sections = 0
+    for username, notes in store.exportNotes(batchSize):
+        record = {"username": username}
+        record.update(notes.toDict())
+        out.write(json.dumps(record, ensure_ascii=False) + "\n")
+        chapters += 1
+        sections += len(notes.sections)
+    return chapters, sections
+
+def openFile(path, mode):
+    # Opens a JSON Lines file, "-" is stdin or stdout
+    if path == "-":
+        return contextlib.nullcontext(sys.stdin if mode == "r" else sys.stdout)
+    return open(path, mode, encoding="utf-8")
+
+def main():
+    parser = argparse.ArgumentParser(description="Import or export notes as JSON Lines, one chapter per line.")
+    commands = parser.add_subparsers(dest="command")
+    for command, help in (("import", "save the chapters in FILE"), ("export", "write every chapter to FILE")):
+        subparser = commands.add_parser(command, help=help)
+        subparser.add_argument("file", help="JSON Lines file, - for stdin/stdout")
+        subparser.add_argument("--batch-size", type=int, default=BATCH_SIZE, help="chapters per bulk write or cursor batch")
+    commands.add_parser("interactive", help="enter notes at the prompt (the default)")
+    args = parser.parse_args()
+
+    if args.command in (None, "interactive"):
+        interactive()
+        return 0
+    if args.batch_size < 1:
+        parser.error("--batch-size must be at least 1")
+
+    store = getNotesStore()
+    # Checked before the file is opened, so an export that can't run doesn't empty it
+    if args.command == "export" and type(store).exportNotes is NotesStore.exportNotes:
+        parser.error(f"export isn't supported with STORAGE_BACKEND = \"{datastructs.STORAGE_BACKEND}\", "
+                     "export from the database the notes service uses instead")
+    if not store.connected:
+        print("The notes store can't be reached.", file=sys.stderr)
+        return 1
+
+    # Progress goes to stderr, so an export to stdout only has the notes
+    start = time.perf_counter()
+    if args.command == "import":
+        with openFile(args.file, "r") as f:
+            chapters, sections, skipped = importNotes(store, f, args.batch_size, sys.stderr)
+    else:
+        with openFile(args.file, "w") as f:
+            chapters, sections = exportNotes(store, f, args.batch_size)
+        skipped = 0
+    elapsed = max(time.perf_counter() - start, 1e-9)
+    print(f"{args.command.capitalize()}ed {chapters} chapters ({sections} sections) in {elapsed:.2f}s: "
+          f"{chapters / elapsed:,.0f} chapters/s, {sections / elapsed:,.0f} sections/s"
+          + (f", {skipped} lines skipped" if skipped else ""), file=sys.stderr)
+    return 0
+
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    sys.exit(main())
\ No newline at end of file
@@ -0,0 +1,145 @@
+# File: servicestore.py
+# Project: CS 422 Project 1
+# Authors: ARA Team
+# Creation date: 10-18-2026
+# Description: This file contains ServiceStore, a notes store that goes through the notes
+#              service (notesservice.py) over HTTP instead of connecting to MongoDB itself.
+#              It is selected with STORAGE_BACKEND = "service" and SERVICE_URL.
+
+# Modifications:
+# Date        Author       Change
+# ----------- ------------ -----------------------------------------------------
+# 10-18-2026  ARA Team     Initial creation of the file
+# 10-18-2026  ARA Team     Saves carry chapter versions and return the new one, deleteSection() by ID
+# ==============================================================================
+
+import json
+import threading
+import http.client
+import urllib.parse
+from pymongo.errors import ConnectionFailure
+
+from datastructs import NotesStore, CircuitBreaker, SaveConflict, notesDS
+
+SERVICE_TIMEOUT = 10.0  # Seconds to wait for the service to answer
+PING_TIMEOUT = 2.0      # Seconds to wait for a health check, like MongoDB's server selection
+
+
+# Raised when the service can't be reached. It is a ConnectionFailure, so JournalStore
+# keeps saves in the offline journal just like when MongoDB is down.
+class ServiceUnavailable(ConnectionFailure):
+    pass
+
+
+# Raised when the service answers with an error
+class ServiceError(Exception):
+    pass
+
+
+# Notes store on the notes service. Each thread keeps its own connection open between
+# requests, and the circuit breaker tracks whether the service answers, as for Database.
+class ServiceStore(NotesStore):
+    def __init__(self, url, timeout=SERVICE_TIMEOUT):
+        parts = urllib.parse.urlsplit(url)
+        self.host = parts.hostname
+        self.port = parts.port or 80
+        self.prefix = parts.path.rstrip("/")
+        self.timeout = timeout
+        self.local = threading.local()  # This thread's connection
+        self.breaker = CircuitBreaker(self.ping)
+        self.checkConnection()
+
+    @property
+    def connected(self):
+        return self.breaker.online
+
+    def checkConnection(self, wait=True):
+        if not wait:
+            self.breaker.checkInBackground()
+            return self.connected
+        return self.breaker.check()
+
+    def markOffline(self):
+        self.breaker.record(False)
+
+    def ping(self):
+        # Asks the service whether it can reach its store
+        try:
+            return bool(self.request("GET", "/health", timeout=PING_TIMEOUT)[1]["ok"])
+        except (ServiceUnavailable, ServiceError) as e:
+            if self.connected:
+                print("Could not reach the notes service:", e)
+            return False
+
+    def request(self, method, path, body=None, timeout=None):
+        # Sends a request and returns (status, decoded JSON). A kept open connection the
+        # service has since closed is retried once on a new one.
+        data = json.dumps(body).encode("utf-8") if body is not None else None
+        headers = {"Content-Type": "application/json"} if data is not None else {}
+        for attempt in range(2):
+            conn = getattr(self.local, "conn", None)
+            reused = conn is not None
+            if conn is None:
+                conn = self.local.conn = http.client.HTTPConnection(self.host, self.port, timeout=self.timeout)
+            conn.timeout = timeout or self.timeout
+            try:
+                conn.request(method, self.prefix + path, body=data, headers=headers)
+                response = conn.getresponse()
+                payload = json.loads(response.read() or b"null")
+            except (OSError, http.client.HTTPException, ValueError) as e:
+                conn.close()
+                self.local.conn = None
+                if reused and attempt == 0 and not isinstance(e, TimeoutError):
+                    continue
+                raise ServiceUnavailable(f"{method} {path}: {e}") from e
+            if response.getheader("Connection", "").lower() == "close":
+                conn.close()
+                self.local.conn = None
+            if response.status == 503:
+                raise ServiceUnavailable(payload.get("error", "service unavailable") if isinstance(payload, dict) else payload)
+            if response.status == 409:
+                raise SaveConflict(payload.get("error", "save conflict") if isinstance(payload, dict) else payload)
+            if response.status >= 400 and response.status != 404:
+                raise ServiceError(f"{method} {path}: {response.status} {payload}")
+            return response.status, payload
+
+    def notesPath(self, username, pdfID=None):
+        path = "/notes/" + urllib.parse.quote(username, safe="")
+        if pdfID is not None:
+            path += "/" + urllib.parse.quote(pdfID, safe="")
+        return path
+
+    def getNotes(self, username, pdfID):
+        # Loads a user's notes for one PDF as a notesDS, or None if there are none
+        status, payload = self.request("GET", self.notesPath(username, pdfID))
+        if status == 404:
+            print(f"No notes available for user {username} and PDF ID {pdfID}")
+            return None
+        return notesDS.fromDict(payload)
+
+    def getAllNotes(self, username):
+        return [notesDS.fromDict(chapter) for chapter in self.request("GET", self.notesPath(username))[1]]
+
+    # The service checks versions and merges conflicting saves with its own store, so
+    # these send the save as it is and return the chapter's new version
+
+    def updateUserNotes(self, username, notedata):
+        # Returns once the service has written the chapter (possibly with later saves of it)
+        version = self.request("PUT", self.notesPath(username, notedata.pdfID), notedata.toDict())[1]["version"]
+        print("Notes updated or added successfully.")
+        return version
+
+    def updateSections(self, username, changes):
+        version = self.request("PATCH", self.notesPath(username, changes.pdfID), changes.toDict())[1]["version"]
+        print("Notes updated successfully.")
+        return version
+
+    def deleteSection(self, username, pdfID, sectionID):
+        self.request("DELETE", self.notesPath(username, pdfID) + "/sections/" + urllib.parse.quote(sectionID, safe=""))
+        print("Section deleted")
+
+    def close(self):
+        conn = getattr(self.local, "conn", None)
+        if conn is not None:
+            conn.close()
+            self.local.conn = None
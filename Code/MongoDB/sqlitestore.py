@@ -0,0 +1,224 @@
+# File: sqlitestore.py
+# Project: CS 422 Project 1
+# Authors: ARA Team
+# Creation date: 10-18-2026
+# Description: This file contains SQLiteStore, a notes store kept in a local SQLite file.
+#              It is a peer of the MongoDB stores in datastructs.py, selected with
+#              STORAGE_BACKEND = "sqlite", and needs no database server.
+
+# Modifications:
+# Date        Author       Change
+# ----------- ------------ -----------------------------------------------------
+# 10-18-2026  ARA Team     Initial creation of the file
+# 10-18-2026  ARA Team     getAllNotes() for the notes search index
+# 10-18-2026  ARA Team     bulkUpdateNotes() and exportNotes() for batch import and export
+# 10-18-2026  ARA Team     Chapter versions with compare-and-set writes, deleteSection() by ID
+# ==============================================================================
+
+import os
+import sqlite3
+import threading
+
+from datastructs import NotesStore, notesDS, joinSections
+
+SQLITE_BUSY_TIMEOUT = 5.0   # Seconds to wait for another connection's write to finish
+
+# Same tables as the normalized MongoDB layout: one row per (user, PDF) and one per section
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS chapters (
+    username TEXT NOT NULL,
+    pdf_id TEXT NOT NULL,
+    chapter_title TEXT NOT NULL,
+    version INTEGER NOT NULL DEFAULT 0,
+    PRIMARY KEY (username, pdf_id)
+);
+CREATE TABLE IF NOT EXISTS sections (
+    username TEXT NOT NULL,
+    pdf_id TEXT NOT NULL,
+    section_id TEXT NOT NULL,
+    position INTEGER NOT NULL,
+    section_title TEXT NOT NULL,
+    section_notes TEXT NOT NULL,
+    PRIMARY KEY (username, pdf_id, section_id)
+);
+CREATE INDEX IF NOT EXISTS sections_by_position ON sections (username, pdf_id, position);
+"""
+
+# Statements are constant strings with ? parameters, so sqlite3 prepares each one once
+# per connection and reuses it from its statement cache
+SELECT_CHAPTER = "SELECT chapter_title, version FROM chapters WHERE username = ? AND pdf_id = ?"
+SELECT_SECTIONS = ("SELECT section_id, section_title, section_notes FROM sections "
+                   "WHERE username = ? AND pdf_id = ? ORDER BY position")
+SELECT_ALL_CHAPTERS = "SELECT pdf_id, chapter_title, version FROM chapters WHERE username = ?"
+SELECT_ALL_SECTIONS = ("SELECT pdf_id, section_id, section_title, section_notes FROM sections "
+                       "WHERE username = ? ORDER BY pdf_id, position")
+EXPORT_CHAPTERS = "SELECT username, pdf_id, chapter_title, version FROM chapters ORDER BY username, pdf_id"
+EXPORT_SECTIONS = ("SELECT username, pdf_id, section_id, section_title, section_notes FROM sections "
+                   "ORDER BY username, pdf_id, position")
+UPSERT_CHAPTER = ("INSERT INTO chapters (username, pdf_id, chapter_title, version) VALUES (?, ?, ?, ?) "
+                  "ON CONFLICT (username, pdf_id) DO UPDATE SET chapter_title = excluded.chapter_title, "
+                  "version = excluded.version")
+INSERT_CHAPTER = ("INSERT INTO chapters (username, pdf_id, chapter_title, version) VALUES (?, ?, ?, 1) "
+                  "ON CONFLICT (username, pdf_id) DO NOTHING")
+# Compare-and-set: only matches a chapter still at the version the save was made from
+UPDATE_CHAPTER = ("UPDATE chapters SET chapter_title = coalesce(?, chapter_title), version = version + 1 "
+                  "WHERE username = ? AND pdf_id = ? AND version = ?")
+BUMP_VERSION = "UPDATE chapters SET version = version + 1 WHERE username = ? AND pdf_id = ?"
+UPSERT_SECTION = ("INSERT INTO sections (username, pdf_id, section_id, position, section_title, section_notes) "
+                  "VALUES (?, ?, ?, ?, ?, ?) ON CONFLICT (username, pdf_id, section_id) DO UPDATE SET "
+                  "position = excluded.position, section_title = excluded.section_title, "
+                  "section_notes = excluded.section_notes")
+UPDATE_POSITION = "UPDATE sections SET position = ? WHERE username = ? AND pdf_id = ? AND section_id = ?"
+DELETE_SECTION = "DELETE FROM sections WHERE username = ? AND pdf_id = ? AND section_id = ?"
+DELETE_CHAPTER_SECTIONS = "DELETE FROM sections WHERE username = ? AND pdf_id = ?"
+
+
+# Notes store in a SQLite file. The file is in WAL mode, so the notes writer thread can
+# save while the UI thread reads. Each thread gets its own connection.
+class SQLiteStore(NotesStore):
+    connected = True # A local file is always there
+
+    def __init__(self, path):
+        self.path = path
+        self.local = threading.local()  # This thread's connection
+        self.connections = []           # Every connection opened, for close()
+        self.lock = threading.Lock()    # Guards connections
+
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        conn = self.connection()
+        conn.execute("PRAGMA journal_mode=WAL") # Stored in the file, only needs setting once
+        conn.executescript(SCHEMA)
+        # Files made before chapters had versions
+        if "version" not in [column[1] for column in conn.execute("PRAGMA table_info(chapters)")]:
+            conn.execute("ALTER TABLE chapters ADD COLUMN version INTEGER NOT NULL DEFAULT 0")
+
+    def connection(self):
+        # Returns this thread's connection, opening it on first use
+        conn = getattr(self.local, "conn", None)
+        if conn is None:
+            # Only this thread uses it, check_same_thread is off so close() can run anywhere
+            conn = sqlite3.connect(self.path, timeout=SQLITE_BUSY_TIMEOUT, check_same_thread=False)
+            # WAL only needs the log synced at checkpoints, not on every commit
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self.local.conn = conn
+            with self.lock:
+                self.connections.append(conn)
+        return conn
+
+    def close(self):
+        # Closes every connection, a later call opens a new one
+        with self.lock:
+            for conn in self.connections:
+                conn.close()
+            self.connections = []
+        self.local = threading.local()
+
+    def getNotes(self, username, pdfID):
+        # Loads a user's notes for one PDF as a notesDS, or None if there are none
+        conn = self.connection()
+        chapter = conn.execute(SELECT_CHAPTER, (username, pdfID)).fetchone()
+        if chapter is None:
+            print(f"No notes available for user {username} and PDF ID {pdfID}")
+            return None
+
+        usernotes = notesDS(pdfID, chapter[0])
+        usernotes.version = chapter[1]
+        for sectionID, sectionTitle, sectionNotes in conn.execute(SELECT_SECTIONS, (username, pdfID)):
+            usernotes.addSection(sectionTitle, sectionNotes, sectionID)
+        return usernotes
+
+    def getAllNotes(self, username):
+        # Loads every chapter of a user's notes
+        conn = self.connection()
+        chapters = {}
+        for pdfID, title, version in conn.execute(SELECT_ALL_CHAPTERS, (username,)):
+            chapters[pdfID] = notesDS(pdfID, title)
+            chapters[pdfID].version = version
+        for pdfID, sectionID, sectionTitle, sectionNotes in conn.execute(SELECT_ALL_SECTIONS, (username,)):
+            if pdfID in chapters:
+                chapters[pdfID].addSection(sectionTitle, sectionNotes, sectionID)
+        return list(chapters.values())
+
+    def updateChapter(self, conn, username, pdfID, chapterTitle, baseVersion):
+        # Moves the chapter from baseVersion to the next version, or adds it if baseVersion
+        # is None. Returns the new version, or None if it didn't match.
+        if baseVersion is None:
+            return 1 if conn.execute(INSERT_CHAPTER, (username, pdfID, chapterTitle)).rowcount else None
+        if conn.execute(UPDATE_CHAPTER, (chapterTitle, username, pdfID, baseVersion)).rowcount:
+            return baseVersion + 1
+        return None
+
+    def writeChapter(self, username, notedata, baseVersion):
+        # Replaces a chapter's notes in one transaction
+        pdfID = notedata.pdfID
+        conn = self.connection()
+        with conn: # Commits, or rolls back on error
+            version = self.updateChapter(conn, username, pdfID, notedata.chapterTitle, baseVersion)
+            if version is None:
+                return None
+            conn.execute(DELETE_CHAPTER_SECTIONS, (username, pdfID))
+            conn.executemany(UPSERT_SECTION, [
+                (username, pdfID, section["sectionID"], position, section["sectionTitle"], section["sectionNotes"])
+                for position, section in enumerate(notedata.sections)
+            ])
+        print("Notes updated or added successfully.")
+        return version
+
+    def bulkUpdateNotes(self, chapters):
+        # Saves many whole chapters in one transaction
+        conn = self.connection()
+        with conn:
+            for username, notedata in chapters:
+                pdfID = notedata.pdfID
+                conn.execute(UPSERT_CHAPTER, (username, pdfID, notedata.chapterTitle, notedata.version or 0))
+                conn.execute(DELETE_CHAPTER_SECTIONS, (username, pdfID))
+                conn.executemany(UPSERT_SECTION, [
+                    (username, pdfID, section["sectionID"], position, section["sectionTitle"], section["sectionNotes"])
+                    for position, section in enumerate(notedata.sections)
+                ])
+        return len(chapters)
+
+    def exportNotes(self, batchSize=1000):
+        # Streams the chapters and the sections with two cursors in the same order, so
+        # only one chapter is held at a time. SQLite steps through rows as they are read,
+        # so batchSize isn't needed.
+        conn = self.connection()
+        return joinSections(conn.execute(EXPORT_CHAPTERS), conn.execute(EXPORT_SECTIONS))
+
+    def writeChanges(self, username, changes, baseVersion):
+        # Saves only what changed in a chapter (a notesChanges) in one transaction.
+        # Sections are upserted by ID, so a save sent twice never duplicates a section.
+        pdfID = changes.pdfID
+        conn = self.connection()
+        with conn:
+            version = self.updateChapter(conn, username, pdfID, changes.chapterTitle, baseVersion)
+            if version is None:
+                return None
+            conn.executemany(DELETE_SECTION, [(username, pdfID, sectionID) for sectionID in changes.deletedIDs])
+            conn.executemany(UPSERT_SECTION, [
+                (username, pdfID, section["sectionID"], section["position"],
+                 section["sectionTitle"], section["sectionNotes"])
+                for section in changes.sections
+            ])
+            if changes.order is not None:
+                # Sections were added or removed, renumber the ones that didn't change
+                changedIDs = {section["sectionID"] for section in changes.sections}
+                conn.executemany(UPDATE_POSITION, [(position, username, pdfID, sectionID)
+                                                   for position, sectionID in enumerate(changes.order)
+                                                   if sectionID not in changedIDs])
+        print("Notes updated successfully.")
+        return version
+
+    def deleteSection(self, username, pdfID, sectionID):
+        conn = self.connection()
+        with conn:
+            deleted = conn.execute(DELETE_SECTION, (username, pdfID, sectionID)).rowcount
+            if deleted:
+                conn.execute(BUMP_VERSION, (username, pdfID))
+
+        if deleted > 0:
+            print("Section deleted")
+        else:
+            print("Section not found or deletion unsuccessful")
@@ -0,0 +1,108 @@
+# File: test_datastructs.py
+# Project: CS 422 Project 1
+# Authors: ARA Team
+# Creation date: 10-18-2026
+# Description: This file contains tests for the notes stores in datastructs.py. They run
+#              against mongomock instead of a MongoDB server and are skipped without it.
+#              Usage: python -m pytest Code/MongoDB
+
+# Modifications:
+# Date        Author       Change
+# ----------- ------------ -----------------------------------------------------
+# 10-18-2026  ARA Team     Initial creation of the file, SectionStore saves after starting offline
+# 10-18-2026  ARA Team     SectionStore.saveBatch(), one bulk write and merging a stale save
+# ==============================================================================
+
+import unittest
+from unittest import mock
+
+import datastructs
+from datastructs import ConnectionManager, SectionStore, notesDS, notesChanges
+
+try:
+    import mongomock
+except ImportError:
+    mongomock = None
+
+
+@unittest.skipIf(mongomock is None, "needs mongomock")
+class SectionStoreTestCase(unittest.TestCase):
+    def setUp(self):
+        self.online = False # Whether the fake server answers pings
+        patches = [mock.patch.object(datastructs, "MongoClient", mongomock.MongoClient),
+                   mock.patch.object(datastructs.Database, "ping", lambda database: self.online)]
+        for patch in patches:
+            patch.start()
+            self.addCleanup(patch.stop)
+        self.manager = ConnectionManager("mongodb://localhost:27017/", "ara_test")
+        self.addCleanup(self.manager.close)
+
+    def chapter(self, *sectionIDs, version=None, pdfID="pdf"):
+        notes = notesDS(pdfID, "Chapter")
+        for sectionID in sectionIDs:
+            notes.addSection(sectionID.upper(), "notes of " + sectionID, sectionID)
+        notes.version = version
+        return notes
+
+
+class SectionStoreOfflineStartTest(SectionStoreTestCase):
+    def test_stale_save_merges_after_starting_offline(self):
+        store = SectionStore(self.manager.getDatabase()) # Made while the server is down
+        self.assertFalse(store.connected)
+
+        self.online = True
+        store.database.breaker.record(True) # The background probe found the server again
+        self.assertEqual(store.updateUserNotes("user", self.chapter("s1")), 1)
+        self.assertEqual(store.updateUserNotes("user", self.chapter("s1", "s2", version=1)), 2)
+
+        # Made from version 1, so it hasn't seen s2
+        with mock.patch("builtins.print"):
+            version = store.updateUserNotes("user", self.chapter("s1", "s3", version=1))
+        self.assertEqual(version, 3)
+        stored = store.getNotes("user", "pdf")
+        self.assertEqual(stored.version, 3)
+        self.assertEqual(sorted(section["sectionID"] for section in stored.sections), ["s1", "s2", "s3"])
+
+
+class SectionStoreBatchTest(SectionStoreTestCase):
+    def setUp(self):
+        super().setUp()
+        self.online = True
+        self.store = SectionStore(self.manager.getDatabase())
+
+    def sectionIDs(self, pdfID):
+        return [section["sectionID"] for section in self.store.getNotes("user", pdfID).sections]
+
+    def test_saves_go_in_one_bulk_write(self):
+        self.assertEqual(self.store.updateUserNotes("user", self.chapter("a1", pdfID="a")), 1)
+        changes = notesChanges("a")
+        changes.addSection("A2", "notes of a2", "a2", 1, True)
+        changes.order = ["a1", "a2"]
+        changes.baseVersion = 1
+
+        with mock.patch.object(self.store.sections, "bulk_write", wraps=self.store.sections.bulk_write) as bulkWrite, \
+                mock.patch("builtins.print"):
+            results = self.store.saveBatch([("user", changes), ("user", self.chapter("b1", pdfID="b"))])
+        self.assertEqual(results, [2, 1])
+        self.assertEqual(bulkWrite.call_count, 1)
+        self.assertEqual(self.sectionIDs("a"), ["a1", "a2"])
+        self.assertEqual(self.sectionIDs("b"), ["b1"])
+
+    def test_stale_save_is_merged_and_the_rest_written(self):
+        for pdfID in "abc":
+            self.store.updateUserNotes("user", self.chapter(pdfID + "1", pdfID=pdfID))
+        self.store.updateUserNotes("user", self.chapter("b1", "b2", version=1, pdfID="b"))
+
+        # b is made from version 1, so it hasn't seen b2
+        with mock.patch("builtins.print"):
+            results = self.store.saveBatch([("user", self.chapter("a1", "a2", version=1, pdfID="a")),
+                                            ("user", self.chapter("b1", "b3", version=1, pdfID="b")),
+                                            ("user", self.chapter("c1", "c2", version=1, pdfID="c"))])
+        self.assertEqual(results, [2, 3, 2])
+        self.assertEqual(self.sectionIDs("a"), ["a1", "a2"])
+        self.assertEqual(sorted(self.sectionIDs("b")), ["b1", "b2", "b3"])
+        self.assertEqual(self.sectionIDs("c"), ["c1", "c2"])
+
+
+if __name__ == "__main__":
+    unittest.main()
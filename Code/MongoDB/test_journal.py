@@ -0,0 +1,75 @@
+# File: test_journal.py
+# Project: CS 422 Project 1
+# Authors: ARA Team
+# Creation date: 10-18-2026
+# Description: This file contains tests for the offline notes journal in journal.py. The
+#              journal is written to a temporary directory and replayed to a fake store.
+#              Usage: python -m pytest Code/MongoDB
+
+# Modifications:
+# Date        Author       Change
+# ----------- ------------ -----------------------------------------------------
+# 10-18-2026  ARA Team     Initial creation of the file, batched replay and compaction
+# ==============================================================================
+
+import os
+import tempfile
+import unittest
+from unittest import mock
+
+from datastructs import NotesStore, SaveConflict, notesDS
+from journal import NotesJournal
+
+
+# Store that only records the batches it is sent
+class RecordingStore(NotesStore):
+    def __init__(self, failing=()):
+        self.batches = []
+        self.failing = failing  # pdfIDs whose saves fail
+
+    def saveBatch(self, saves):
+        self.batches.append([(username, notedata.pdfID) for username, notedata in saves])
+        return [SaveConflict(notedata.pdfID) if notedata.pdfID in self.failing else 1 for _, notedata in saves]
+
+
+class NotesJournalTest(unittest.TestCase):
+    def setUp(self):
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        self.journal = NotesJournal(os.path.join(directory.name, "journal.jsonl"), syncInterval=60, compactThreshold=4)
+        self.addCleanup(self.journal.sync)
+
+    def save(self, pdfID, username="user"):
+        notes = notesDS(pdfID, "Chapter")
+        notes.addSection("Section", "notes of " + pdfID, pdfID + "1")
+        self.journal.append(username, notes)
+
+    def test_replay_sends_one_batch(self):
+        for pdfID in ("a", "b", "a"):
+            self.save(pdfID)
+        store = RecordingStore()
+        replayed = []
+        with mock.patch("builtins.print"):
+            self.journal.replay(store, lambda record, result: replayed.append(record["notes"]["pdfID"]))
+        self.assertEqual(store.batches, [[("user", "a"), ("user", "b")]])
+        self.assertEqual(replayed, ["a", "b"])
+        self.assertEqual(self.journal.size(), 0)
+
+    def test_failed_save_keeps_it_and_the_rest(self):
+        for pdfID in ("a", "b", "c"):
+            self.save(pdfID)
+        with mock.patch("builtins.print"), self.assertRaises(SaveConflict):
+            self.journal.replay(RecordingStore(failing=("b",)))
+        self.assertEqual([record["notes"]["pdfID"] for record in self.journal.read()], ["b", "c"])
+
+    def test_compacts_once_the_file_doubles(self):
+        with mock.patch.object(self.journal, "compact", wraps=self.journal.compact) as compact:
+            # Different chapters don't fold, so each compaction leaves every record
+            for n in range(9):
+                self.save(f"pdf{n}")
+        self.assertEqual(compact.call_count, 2) # At 4 records, then at 8
+        self.assertEqual(self.journal.size(), 9)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,61 @@
+# File: test_prototype.py
+# Project: CS 422 Project 1
+# Authors: ARA Team
+# Creation date: 10-18-2026
+# Description: This file contains tests for the JSON Lines import and export of prototype.py.
+#              They save to a fake store, so no database is needed.
+#              Usage: python -m pytest Code/MongoDB
+
+# Modifications:
+# Date        Author       Change
+# ----------- ------------ -----------------------------------------------------
+# 10-18-2026  ARA Team     Initial creation of the file, sections imported without an ID
+# ==============================================================================
+
+import io
+import json
+import unittest
+
+from datastructs import NotesStore
+from prototype import importNotes
+
+
+# Store that only keeps the chapters it is sent
+class RecordingStore(NotesStore):
+    def __init__(self):
+        self.chapters = []
+
+    def bulkUpdateNotes(self, chapters):
+        self.chapters += chapters
+        return len(chapters)
+
+
+class ImportNotesTest(unittest.TestCase):
+    def test_section_without_id_gets_one(self):
+        lines = [json.dumps({"username": "user", "pdfID": "pdf", "chapterTitle": "Chapter", "sections": [
+            {"sectionID": "s1", "sectionTitle": "One", "sectionNotes": "first"},
+            {"sectionTitle": "Two", "sectionNotes": "second"},
+            {"sectionID": None, "sectionTitle": "Three", "sectionNotes": "third"}]})]
+        store = RecordingStore()
+        log = io.StringIO()
+        self.assertEqual(importNotes(store, lines, 10, log), (1, 3, 0))
+        self.assertEqual(log.getvalue(), "")
+
+        username, notes = store.chapters[0]
+        self.assertEqual(username, "user")
+        self.assertEqual([section["sectionTitle"] for section in notes.sections], ["One", "Two", "Three"])
+        sectionIDs = [section["sectionID"] for section in notes.sections]
+        self.assertEqual(sectionIDs[0], "s1")
+        self.assertTrue(all(sectionIDs[1:]))
+        self.assertEqual(len(set(sectionIDs)), 3)
+
+    def test_bad_line_is_skipped(self):
+        store = RecordingStore()
+        log = io.StringIO()
+        lines = ["{not json", json.dumps({"username": "user", "pdfID": "pdf", "chapterTitle": "Chapter", "sections": []})]
+        self.assertEqual(importNotes(store, lines, 10, log), (1, 0, 1))
+        self.assertIn("line 1", log.getvalue())
+
+
+if __name__ == "__main__":
+    unittest.main()
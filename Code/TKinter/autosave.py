@@ -0,0 +1,83 @@
+# File: autosave.py
+# Project: CS 422 Project 1
+# Authors: ARA Team
+# Creation date: 10-18-2026
+# Description: This file contains the debounced autosave used by the notes panel. A save
+#              runs once the user has stopped typing for a moment, or at a fixed maximum
+#              interval while they keep typing, so a crash loses at most a few seconds.
+
+# Modifications:
+# Date        Author       Change
+# ----------- ------------ -----------------------------------------------------
+# 10-18-2026  ARA Team     Initial creation of the file
+# ==============================================================================
+
+import time  # Used to measure the typing burst and save latency
+
+AUTOSAVE_IDLE_MS = 2000             # Save after this long without an edit
+AUTOSAVE_MAX_INTERVAL_MS = 30000    # While the user keeps typing, save at least this often
+
+
+# Debounces edits into saves using the Tk event loop.
+# save(callback) must start a non-blocking save and return None when there was nothing
+# to save, otherwise whether the save was coalesced into one already queued. It calls
+# callback(result, error) on the Tk thread when the save is done.
+class Autosaver:
+    def __init__(self, widget, save, idle_ms=AUTOSAVE_IDLE_MS, max_interval_ms=AUTOSAVE_MAX_INTERVAL_MS):
+        self.widget = widget                # Any widget, used for after()
+        self.save = save
+        self.idle_ms = idle_ms
+        self.max_interval_ms = max_interval_ms
+        self.job = None                     # Pending after() call for the idle save
+        self.first_edit = None              # time.monotonic() of the first unsaved edit
+
+        # Counters
+        self.issued = 0                     # Saves handed to the writer
+        self.coalesced = 0                  # Saves merged into one that was still queued
+        self.failed = 0                     # Saves the writer reported as failed
+        self.last_latency = None            # Seconds from issuing the last save to it finishing
+
+    def touch(self):
+        # Records an edit: restarts the idle timer, or saves now if the user has been
+        # typing without a pause for max_interval_ms
+        now = time.monotonic()
+        if self.first_edit is None:
+            self.first_edit = now
+        if (now - self.first_edit) * 1000 >= self.max_interval_ms:
+            self.save_now()
+            return
+        if self.job is not None:
+            self.widget.after_cancel(self.job)
+        self.job = self.widget.after(self.idle_ms, self.save_now)
+
+    def save_now(self):
+        # Issues a save right away
+        self.cancel()
+        started = time.monotonic()
+        coalesced = self.save(lambda result, error: self.on_saved(started, error))
+        if coalesced is None:
+            return # Nothing had changed
+        self.issued += 1
+        if coalesced:
+            self.coalesced += 1
+
+    def on_saved(self, started, error):
+        self.last_latency = time.monotonic() - started
+        if error is not None:
+            self.failed += 1
+
+    def cancel(self):
+        # Drops a pending save, e.g. before the window closes
+        if self.job is not None:
+            self.widget.after_cancel(self.job)
+            self.job = None
+        self.first_edit = None
+
+    def stats(self):
+        # Returns the counters as a dictionary
+        return {
+            'issued': self.issued,
+            'coalesced': self.coalesced,
+            'failed': self.failed,
+            'last_latency': self.last_latency
+        }
@@ -0,0 +1,88 @@
+# File: bench_render.py
+# Project: CS 422 Project 1
+# Authors: ARA Team
+# Creation date: 10-18-2026
+# Description: Micro-benchmark comparing the old temp-PNG page rendering path with the
+#              in-memory PPM path from render.py, run over every PDF in Resources/.
+#              Usage: python Code/TKinter/bench_render.py [pages per PDF]
+
+# Modifications:
+# Date        Author       Change
+# ----------- ------------ -----------------------------------------------------
+# 10-18-2026  ARA Team     Initial creation of the file
+# ==============================================================================
+
+import tkinter as tk  # PhotoImage decoding is part of what we are measuring
+import fitz  # PyMuPDF, used to open and render the PDFs
+import tempfile  # Only used to reproduce the old rendering path
+import time  # Used for timing
+import glob  # Used to find the PDFs in Resources/
+import os  # Used to handle file and directory operations
+import sys  # Used to read the command line arguments
+
+from render import render_page_ppm, ppm_to_photo
+
+resources_dir = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', '..', 'Resources')
+
+
+def old_path(document, page_number, make_photo):
+    # The original display_page: PNG-encode to a temp file, decode it again, delete it
+    pix = document.load_page(page_number).get_pixmap()
+    temp_file_path = tempfile.mktemp(suffix=".png")
+    pix.save(temp_file_path)
+    if make_photo:
+        photo = tk.PhotoImage(file=temp_file_path)
+    else:
+        with open(temp_file_path, 'rb') as f:
+            photo = f.read()
+    os.remove(temp_file_path)
+    return photo
+
+
+def new_path(document, page_number, make_photo):
+    # The in-memory path used by display_page now
+    ppm_data = render_page_ppm(document, page_number)
+    return ppm_to_photo(ppm_data) if make_photo else ppm_data
+
+
+def time_path(render, document, pages, make_photo):
+    # Returns the mean time per page in milliseconds
+    start = time.perf_counter()
+    for page_number in pages:
+        render(document, page_number, make_photo)
+    return (time.perf_counter() - start) * 1000 / len(pages)
+
+
+def main():
+    max_pages = int(sys.argv[1]) if len(sys.argv) > 1 else 10
+
+    # PhotoImage needs a Tk interpreter; without a display we only time the encode side
+    try:
+        root = tk.Tk()
+        root.withdraw()
+        make_photo = True
+    except tk.TclError:
+        root = None
+        make_photo = False
+        print("No display available, timing pixmap encoding only (no PhotoImage decode).")
+
+    print(f"{'PDF':40} {'pages':>5} {'old ms/page':>12} {'new ms/page':>12} {'speedup':>8}")
+    for pdf_path in sorted(glob.glob(os.path.join(resources_dir, '*.pdf'))):
+        document = fitz.open(pdf_path)
+        pages = range(min(max_pages, document.page_count))
+
+        # Warm up both paths so font loading etc. is not counted
+        old_path(document, 0, make_photo)
+        new_path(document, 0, make_photo)
+
+        old_ms = time_path(old_path, document, pages, make_photo)
+        new_ms = time_path(new_path, document, pages, make_photo)
+        print(f"{os.path.basename(pdf_path):40} {len(pages):>5} {old_ms:>12.2f} {new_ms:>12.2f} {old_ms / new_ms:>7.2f}x")
+        document.close()
+
+    if root is not None:
+        root.destroy()
+
+
+if __name__ == "__main__":
+    main()
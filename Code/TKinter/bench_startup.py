@@ -0,0 +1,78 @@
+# File: bench_startup.py
+# Project: CS 422 Project 1
+# Authors: ARA Team
+# Creation date: 10-18-2026
+# Description: Startup benchmark. Each run starts a fresh interpreter and measures how long
+#              importing main.py takes, how long until the login screen's first frame is
+#              drawn, and how long the background warm up (load_modules) takes. Its module
+#              imports used to be part of importing main.py, before the login screen.
+#              Usage: python Code/TKinter/bench_startup.py [runs]
+
+# Modifications:
+# Date        Author       Change
+# ----------- ------------ -----------------------------------------------------
+# 10-18-2026  ARA Team     Initial creation of the file
+# ==============================================================================
+
+import subprocess  # Every run needs a fresh interpreter, nothing imported yet
+import statistics  # Used for the median
+import json  # Results come back from the child process as JSON
+import os  # Used to handle file and directory operations
+import sys  # Used to read the command line arguments and find the interpreter
+
+RUNS = 5
+
+# Runs in the child process, prints one JSON line of timings in ms
+CHILD = r"""
+import json, sys, time
+start = time.perf_counter()
+import main
+imported = time.perf_counter()
+first_frame = None
+try:
+    root = main.tk.Tk()
+    root.withdraw()
+    main.login_screen = None
+    main.open_login_screen(root)
+    root.update() # Draws the login screen
+    first_frame = (time.perf_counter() - start) * 1000
+    root.destroy()
+except main.tk.TclError: # No display
+    pass
+warm = time.perf_counter()
+modules = main.load_modules(connect=False)
+loaded = time.perf_counter()
+modules.getNotesStore()
+print(json.dumps({"import": (imported - start) * 1000, "first_frame": first_frame,
+                  "modules": (loaded - warm) * 1000, "connect": (time.perf_counter() - loaded) * 1000}))
+"""
+
+
+def run_once(main_dir):
+    # Starts the child process and returns its timings
+    result = subprocess.run([sys.executable, "-c", CHILD], cwd=main_dir, capture_output=True, text=True, check=True)
+    return json.loads(result.stdout.strip().splitlines()[-1])
+
+
+def main():
+    runs = int(sys.argv[1]) if len(sys.argv) > 1 else RUNS
+    main_dir = os.path.dirname(os.path.abspath(__file__))
+    results = [run_once(main_dir) for _ in range(runs)]
+
+    imports = statistics.median(result["import"] for result in results)
+    modules = statistics.median(result["modules"] for result in results)
+    connects = statistics.median(result["connect"] for result in results)
+    frames = [result["first_frame"] for result in results if result["first_frame"] is not None]
+    print(f"median of {runs} runs")
+    print(f"import main.py:           {imports:8.1f} ms")
+    if frames:
+        print(f"login screen first frame: {statistics.median(frames):8.1f} ms")
+    else:
+        print("login screen first frame:      n/a (no display)")
+    print(f"background module loads:  {modules:8.1f} ms")
+    print(f"background DB connect:    {connects:8.1f} ms")
+    print(f"old import before the login screen (import + module loads): {imports + modules:8.1f} ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,180 @@
+# File: library.py
+# Project: CS 422 Project 1
+# Authors: ARA Team
+# Creation date: 10-18-2026
+# Description: This file contains the PDF library, the catalog of PDFs the user can open.
+#              A directory is scanned for PDFs and each one gets an ID from its content
+#              hash, plus its page count, table of contents and title. These are kept in a
+#              catalog file, and a rescan only opens files whose size or modification time
+#              changed, so reopening a large library doesn't read any PDFs.
+#              Usage: python Code/TKinter/library.py [directory]
+
+# Modifications:
+# Date        Author       Change
+# ----------- ------------ -----------------------------------------------------
+# 10-18-2026  ARA Team     Initial creation of the file
+# 10-18-2026  ARA Team     Scanning no longer takes the rendering lock, the scanned document is only used by the scan
+# 10-18-2026  ARA Team     scan_in_background(), a catalog of the wrong shape is treated as damaged
+# 10-18-2026  ARA Team     A file that can't be stat'ed is skipped instead of stopping the scan
+# 10-18-2026  ARA Team     get_path(), the entry of one file
+# ==============================================================================
+
+import os  # Used to find the PDFs and write the catalog
+import sys  # Used to read the command line arguments
+import json  # Catalog file format
+import time  # Used to report scan times
+import threading  # Scans run on their own thread while the UI reads the catalog
+import fitz  # PyMuPDF, used to read the page count, table of contents and title
+
+from textindex import file_hash
+
+LIBRARY_DIR = os.path.normpath(os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "..", "Resources"))
+CATALOG_PATH = os.path.join(os.path.expanduser("~"), ".ara", "catalog.json")
+CATALOG_VERSION = 1 # Bump when the entries change, old catalogs are then rescanned
+ENTRY_FIELDS = ("pdf_id", "mtime", "size", "title", "page_count", "toc", "legacy_id") # What read_entry returns
+
+# Notes used to be stored under these names instead of the content hash. Their notes are
+# still found under the old name and saved under the new ID, see NotesApp.fetch_notes.
+LEGACY_PDF_IDS = {
+    "Sommerville_Chapter_6_Survey_Highlighted.pdf": "Chapter 6",
+    "Chapter3.pdf": "Chapter 3",
+    "Sommerville-Chapter-2.pdf": "Chapter 2",
+}
+
+
+# Catalog of the PDFs in a directory. For each file it keeps:
+#   path -> {pdf_id, mtime, size, title, page_count, toc, legacy_id}
+# where toc is PyMuPDF's [level, title, page] list and legacy_id the old name, if any.
+class PdfLibrary:
+    def __init__(self, directory=LIBRARY_DIR, catalog_path=CATALOG_PATH):
+        self.directory = directory
+        self.catalog_path = catalog_path
+        self.files = self.load_catalog()
+        self.lock = threading.Lock() # Guards files
+        self.scanned = threading.Event() # Set once scan_in_background() has finished
+
+    def load_catalog(self):
+        # Entries saved by the last scan, or none if there isn't a usable catalog
+        try:
+            with open(self.catalog_path, "r", encoding="utf-8") as f:
+                data = json.load(f)
+            if data.get("version") != CATALOG_VERSION or data.get("directory") != self.directory:
+                return {} # Written by another version or for another directory
+            files = data["files"]
+            for entry in files.values():
+                if not isinstance(entry, dict) or any(field not in entry for field in ENTRY_FIELDS):
+                    raise ValueError(f"incomplete entry {entry!r}")
+            return files
+        except FileNotFoundError:
+            pass
+        except (ValueError, KeyError, AttributeError): # Not JSON, or JSON of the wrong shape
+            print("Rescanning damaged PDF catalog:", self.catalog_path)
+        return {}
+
+    def scan(self):
+        # Brings the catalog up to date with the directory. Files whose size and modification
+        # time match their entry are skipped, only new or changed files are hashed and opened.
+        # Returns how many files were (re)read.
+        found = {}
+        read = 0
+        if os.path.isdir(self.directory):
+            for dir_path, _, names in os.walk(self.directory):
+                for name in names:
+                    if not name.lower().endswith(".pdf"):
+                        continue
+                    path = os.path.join(dir_path, name)
+                    try:
+                        # A file can vanish or be a broken link between listing and stat
+                        stat = os.stat(path)
+                        entry = self.files.get(path)
+                        if entry is None or entry["mtime"] != stat.st_mtime or entry["size"] != stat.st_size:
+                            entry = read_entry(path, stat)
+                            read += 1
+                    except (OSError, RuntimeError) as e: # fitz raises RuntimeError subclasses
+                        print("Skipping unreadable PDF:", path, e)
+                        continue
+                    found[path] = entry
+
+        with self.lock:
+            changed = read > 0 or found.keys() != self.files.keys()
+            self.files = found
+        if changed:
+            self.save_catalog()
+        return read
+
+    def scan_in_background(self):
+        # Runs scan() on its own thread and sets scanned once it is done, even if it failed
+        def run():
+            try:
+                self.scan()
+            finally:
+                self.scanned.set()
+        threading.Thread(target=run, name="library-scan", daemon=True).start()
+
+    def save_catalog(self):
+        # Writes the catalog, replacing the old one in a single step
+        with self.lock:
+            data = {"version": CATALOG_VERSION, "directory": self.directory, "files": self.files}
+        directory = os.path.dirname(self.catalog_path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        temp_path = self.catalog_path + ".tmp"
+        with open(temp_path, "w", encoding="utf-8") as f:
+            json.dump(data, f, separators=(",", ":"))
+        os.replace(temp_path, self.catalog_path)
+
+    def documents(self):
+        # One entry per document, ordered by title. Copies of the same file share an ID
+        # and are listed once.
+        with self.lock:
+            entries = {}
+            for path, entry in sorted(self.files.items()):
+                entries.setdefault(entry["pdf_id"], dict(entry, path=path))
+        return sorted(entries.values(), key=lambda entry: entry["title"].lower())
+
+    def get(self, pdf_id):
+        # The document with this ID or legacy name, or None if it isn't in the library
+        for entry in self.documents():
+            if pdf_id in (entry["pdf_id"], entry["legacy_id"]):
+                return entry
+        return None
+
+    def get_path(self, path):
+        # The entry of the file at path, or None if it isn't in the library
+        with self.lock:
+            entry = self.files.get(path)
+            return dict(entry, path=path) if entry is not None else None
+
+
+def read_entry(path, stat):
+    # Hashes and opens one PDF to make its catalog entry
+    document = fitz.open(path)
+    try:
+        page_count = document.page_count
+        toc = document.get_toc()
+        title = (document.metadata or {}).get("title", "").strip()
+    finally:
+        document.close()
+    name = os.path.basename(path)
+    legacy_id = LEGACY_PDF_IDS.get(name)
+    if not title:
+        title = legacy_id or os.path.splitext(name)[0].replace("_", " ").replace("-", " ")
+    return {"pdf_id": file_hash(path), "mtime": stat.st_mtime, "size": stat.st_size, "title": title,
+            "page_count": page_count, "toc": toc, "legacy_id": legacy_id}
+
+
+def main():
+    # Scans a directory twice and reports how long each scan took
+    directory = os.path.abspath(sys.argv[1]) if len(sys.argv) > 1 else LIBRARY_DIR
+    library = PdfLibrary(directory)
+    for label in ("first scan", "rescan"):
+        start = time.perf_counter()
+        read = library.scan()
+        elapsed = (time.perf_counter() - start) * 1000
+        print(f"{label}: {len(library.documents())} documents, {read} read, {elapsed:.1f} ms")
+    for entry in library.documents():
+        print(f"  {entry['pdf_id'][:12]}  {entry['title']}: {entry['page_count']} pages, {len(entry['toc'])} TOC entries")
+
+
+if __name__ == "__main__":
+    main()
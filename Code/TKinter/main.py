@@ -29,141 +29,224 @@
 # # 04-29-2024  Ben         SQ3R Prompts 
 # # 04-29-2024  John O      Example prewritten notes
 # # 04-29-2024  John O      More code comments
+# # 10-18-2026  ARA Team    In-memory page rendering, no temp PNG files
+# # 10-18-2026  ARA Team    Page image cache and neighbouring page prefetch
+# # 10-18-2026  ARA Team    Zoom levels, HiDPI mode and tile-based viewport rendering
+# # 10-18-2026  ARA Team    Progressive rendering, low resolution preview first
+# # 10-18-2026  ARA Team    Use the shared pooled database connection
+# # 10-18-2026  ARA Team    Sections keep a stable ID, notes go through the configured notes store
+# # 10-18-2026  ARA Team    Saves run on a background writer instead of the Tk event loop
+# # 10-18-2026  ARA Team    Dirty tracking, only changed sections are sent on save
+# # 10-18-2026  ARA Team    Debounced background autosave while typing
+# # 10-18-2026  ARA Team    Offline mode, saves go to a local journal until the database is back
+# # 10-18-2026  ARA Team    Online/offline indicator, switches without waiting for the server
+# # 10-18-2026  ARA Team    Full-text search box backed by a persistent index of the PDF's text
+# # 10-18-2026  ARA Team    Search Notes window, results open the chapter at the matching section
+# # 10-18-2026  ARA Team    Virtualized notes panel, NoteSection moved to notespanel.py
+# # 10-18-2026  ARA Team    Staged startup, login screen first while PyMuPDF/pymongo load in the background
+# # 10-18-2026  ARA Team    Notes are fetched while the PDF opens and renders, the panel fills in when they arrive
+# # 10-18-2026  ARA Team    PDFs come from the PDF library, identified by content hash instead of chapter name
+# # 10-18-2026  ARA Team    Page thumbnail strip and table of contents navigator
+# # 10-18-2026  ARA Team    Saves say which chapter version they were made from, see NotesStore
+# # 10-18-2026  ARA Team    Revision history of each section, with a window to browse and restore earlier versions
+# # 10-18-2026  ARA Team    Offline, notes are read from the copy cached when they were last loaded online
+# # 10-18-2026  ARA Team    The progressive preview is rendered by the prefetch worker, not on the Tk thread
+# # 10-18-2026  ARA Team    Quitting waits for the last saves with a progress window instead of blocking the event loop
+# # 10-18-2026  ARA Team    The PDF list is filled once the library scan has finished, the scan runs off the Tk thread
+# # 10-18-2026  ARA Team    Autosave timings come from autosave.py only
+# # 10-18-2026  ARA Team    load_modules() returns a namespace of what it loaded instead of setting globals
+# # 10-18-2026  ARA Team    Windows wait for the warm up's notes store with after(), a failed warm up is shown
+# # 10-18-2026  ARA Team    Progressive rendering stops waiting for tiles the prefetch worker couldn't render
+# # 10-18-2026  ARA Team    Thumbnails are cached under the PDF's content hash, also for the example chapter
 # # ==============================================================================
 
 import tkinter as tk  # Used for creating interactive learning module's user interface  
-from tkinter import Canvas, Frame, Label, Toplevel, Button, messagebox, scrolledtext, Entry, font, Scrollbar, ttk
-import fitz  # PyMuPDF, used to handle and display PDF files within the application
-import tempfile  # Used to create temporary files for PDF rendering
+from tkinter import Canvas, Frame, Label, Toplevel, Button, messagebox, scrolledtext, Entry, font, Scrollbar, ttk, Listbox
 import os  # Used to handle file and directory operations
 import sys  # Used to manipulate the Python runtime environment
+import threading  # Used to build the search index in the background
+import types  # load_modules() returns what it loaded as a SimpleNamespace
+import time  # Used to time searches and how long quitting waits for saves
 
 main_dir = os.path.dirname(os.path.abspath(__file__)) # Directory of current script
 code_dir = os.path.dirname(main_dir) # Parent directory
 mongodb_dir = os.path.join(code_dir, 'MongoDB') # MongoDB's path
 sys.path.insert(1, mongodb_dir) # Add MongoDB to system path
 
-from datastructs import Database, notesDS, User # Our custom datastructures for handling operations
-
-# Represents a section of notes in the ARA
-class NoteSection:
-    def __init__(self, master, username, pdfid, db, notes_app):
-        self.frame = Frame(master) # main frame for holding the notes
-        self.notes_app = notes_app  # Store the reference to the NotesApp instance (used for prompts)
-        self.username = username # username of the user
-        self.pdfid = pdfid # ID of the PDF 
-        self.db = db # Database connection
-
-        # Use an Entry widget instead of a Label for the section title
-        self.title_entry = Entry(self.frame, fg='grey', bg='lightgrey', width=20)
-        self.title_entry.insert(0, "Enter Section Title")
-        self.title_entry.bind("<FocusIn>", self.on_title_entry_click)
-        self.title_entry.bind("<FocusOut>", self.on_title_focusout)
-        self.title_entry.pack(side='top', fill='x')
-
-
-        # Toggle to collapse or expand notes section
-        self.toggle_button = Button(self.frame, text="-", command=self.toggle)
-        self.toggle_button.pack(side='top', fill='x')
-
-        # Delete section button
-        self.delete_button = Button(self.frame, text="Delete", command=self.on_delete_click)
-        self.delete_button.pack(side='top', fill='x')
+STARTUP_POLL_MS = 50 # How often main() checks whether the background warm up has finished
+modules = None # What load_modules() loaded, see there
+startup_error = None # What stopped the warm up, shown instead of waiting for it forever
+modules_lock = threading.Lock()
+
+def load_modules(connect=True):
+    # Imports PyMuPDF, pymongo and our modules built on them, creates the shared objects and
+    # (with connect) connects to the database. main() runs this on a background thread while
+    # the login screen is up; anything that needs these calls it first, which waits for the
+    # warm up if it is still going and returns right away once it is done. Returns the
+    # namespace of what it loaded, also kept in modules.
+    global modules
+    with modules_lock:
+        if modules is None:
+            import fitz  # PyMuPDF, used to handle and display PDF files within the application
+            from datastructs import getNotesStore, notesDS, notesChanges # Our custom datastructures for handling operations
+            from render import PageRenderer, ppm_to_photo, visible_tiles, TILE_SIZE # In-memory page rendering helpers
+            from pagecache import PageCache, PagePrefetcher # Rendered page cache and background prefetch
+            from notewriter import NotesWriter # Background thread that writes notes to the database
+            from autosave import Autosaver # Debounced autosave while the user types
+            from notespanel import SectionModel, NotesList # Notes panel that only has widgets for sections in view
+            from journal import NotesJournal, JournalStore, NotesCache # Keeps saves made offline on disk
+            from notesindex import NotesIndex # Search index of the user's notes
+            from history import NotesHistory # Earlier versions of each section
+            from textindex import load_index # Full-text search index of the PDF
+            from library import PdfLibrary # Catalog of the PDFs that can be opened
+            from thumbnails import ThumbnailStore, THUMBNAIL_WIDTH # Page thumbnails, cached on disk
+
+            loaded = types.SimpleNamespace(
+                fitz=fitz, getNotesStore=getNotesStore, notesDS=notesDS, notesChanges=notesChanges,
+                PageRenderer=PageRenderer, ppm_to_photo=ppm_to_photo, visible_tiles=visible_tiles, TILE_SIZE=TILE_SIZE,
+                PagePrefetcher=PagePrefetcher, Autosaver=Autosaver, SectionModel=SectionModel, NotesList=NotesList,
+                JournalStore=JournalStore, load_index=load_index, ThumbnailStore=ThumbnailStore,
+                THUMBNAIL_WIDTH=THUMBNAIL_WIDTH, notes_store=None
+            )
+            loaded.page_cache = PageCache(PAGE_CACHE_BYTES) # Shared by every NotesApp so switching PDFs keeps hits
+            loaded.notes_writer = NotesWriter() # Shared by every window, saves are reported back through after()
+            loaded.notes_journal = NotesJournal() # Saves made while the database can't be reached
+            loaded.notes_cache = NotesCache() # Chapters as last loaded online, read while the database can't be reached
+            loaded.notes_index = NotesIndex() # Updated with every save, so note search never rescans the notes
+            loaded.notes_history = NotesHistory() # Also updated with every save, stores only what changed
+            loaded.pdf_library = PdfLibrary() # Only PDFs added or changed since the last run are read
+            loaded.pdf_library.scan_in_background() # Not under modules_lock, see user_pdf_selection
+            modules = loaded
+    if connect:
+        # Connect now, so opening a PDF doesn't wait for the server
+        modules.notes_store = modules.getNotesStore()
+    return modules
+
+def warm_up():
+    # Runs load_modules() on the warm up thread. If it fails the error is kept for the
+    # windows waiting on it to show.
+    global startup_error
+    try:
+        load_modules()
+    except Exception as e:
+        print("Startup failed:", e)
+        startup_error = e
 
-        # Creates text area for writing notes
-        self.text_area = tk.Text(self.frame, height=5, width=50)
-        self.text_area.pack(side='top', fill='x', expand=True)
+def show_startup_error():
+    messagebox.showerror("Error", f"The Active Reading Assistant could not start: {startup_error}")
 
-        # Bind a key press event to the text area to detect when the user starts typing
-        self.text_area.bind("<KeyPress>", self.on_text_entry)
+QUIT_SAVE_TIMEOUT = 10 # Seconds to wait for queued saves to finish before the program exits
+QUIT_POLL_MS = 100 # How often quitting checks whether the queued saves are written
+CONNECTION_POLL_MS = 1000 # How often the online/offline indicator is refreshed
+NOTES_POLL_MS = 20 # How often a new window checks whether its notes have arrived
 
-        
+# Memory limit for rendered pages kept around for quick page turns
+PAGE_CACHE_BYTES = 64 * 1024 * 1024
 
-    # when user starts taking notes, display prompt 'recite'
-    def on_text_entry(self, event):
-        # Call the update_prompt method on the NotesApp instance
-        self.notes_app.update_prompt('Recite')
-
-    def toggle(self):
-        # Collapse or expand text area
-        if self.text_area.winfo_viewable():
-            self.text_area.pack_forget()
-            self.toggle_button.configure(text="+")
-        else:
-            self.text_area.pack(side='top', fill='x', expand=True)
-            self.toggle_button.configure(text="-")
-
-    def on_title_entry_click(self, event):\
-        # Clear the entry field when it gets modified
-        if self.title_entry.get() == 'Enter Section Title':
-            self.title_entry.delete(0, "end")
-            self.title_entry.insert(0, '')
-            self.title_entry.config(fg='black')
-
-    def on_title_focusout(self, event):
-        # Resets the title field if empty
-        if not self.title_entry.get().strip():
-            self.title_entry.insert(0, 'Enter Section Title')
-            self.title_entry.config(fg='grey')
-
-    @property
-    def title(self):
-        # Gets current title of the section, or default if there isn't one
-        return self.title_entry.get().strip() or "Untitled Section"
-    
-    def delete_section(self, root):
-        # Remove section from UI
-        if self.db: # Check to see if DB is connected, if so deleteSection.
-            self.db.deleteSection(self.username, self.pdfid, self.title_entry.get())
-        self.frame.destroy()
-        root.withdraw()
-    
-    def on_delete_click(self): 
-        # Confirms deletion of a notes section
-        popup = Toplevel() # Popup location
-        label = Label(popup, text="Are you sure you want to delete your notes?") # Popup message
-        label.pack(fill='x', padx=50, pady=5)
+ZOOM_LEVELS = [0.5, 0.75, 1.0, 1.25, 1.5, 2.0, 3.0, 4.0] # Zoom steps for the Zoom In/Out buttons
+PAGE_TOP = 50 # Canvas space left above the page for the SQ3R prompt
 
-        # Functionality for 'yes'
-        logout_button = Button(popup, text="Yes", command=lambda: self.delete_section(popup))
-        logout_button.pack(side="left", fill='x', expand=True, padx=10, pady=10)
+# Progressive mode shows a quick low resolution preview and lets the background worker
+# render the full quality tiles, instead of blocking the UI until they are ready
+PROGRESSIVE_RENDERING = True
+PREVIEW_SUBSAMPLE = 4 # The preview is rendered at 1/4 of the resolution and scaled up
+PROGRESSIVE_POLL_MS = 30 # How often to check for finished tiles while some are missing
 
-        # Functionaslity for 'no'
-        quit_button = Button(popup, text="No", command=lambda: popup.withdraw())
-        quit_button.pack(side="right", fill='x', expand=True, padx=10, pady=10)
-    
+THUMBNAIL_POLL_MS = 50 # How often to check for finished thumbnails while some are missing
+THUMBNAIL_LABEL_PX = 16 # Space under each thumbnail for its page number
+THUMBNAIL_PAD_PX = 8 # Space above each thumbnail
 
 class NotesApp:
-    def __init__(self, master, pdf_path, username, pdf_id, root, db):
+    def __init__(self, master, pdf_path, username, pdf_id, root, db, legacy_id=None, toc=None, file_id=None):
         self.master = master # main app window
         self.root = root     # root window, used for other windows
         self.pdf_path = pdf_path # Path to PDF file
-        self.pdf_document = fitz.open(pdf_path) # Opens the PDF using PyMuPDF library                   
-        self.current_page = 0       # inits current page to the first one 
         self.username = username    # Stores the username of the current user
-        self.sections = []          # List to store note sections
         self.pdf_id = pdf_id        # Store the ID of current PDF
-
+        self.legacy_id = legacy_id  # Name the notes of this PDF were stored under before it had an ID
+        self.file_id = file_id or pdf_id # Content hash of the PDF file, names its cached thumbnails
+        self.toc = toc              # Table of contents from the PDF library, read from the PDF if not given
         self.db = db # Variable to store Database object
-        if self.db is None: # Checks to see if Database has been connected too
-            messagebox.showwarning("Warning", "You are not connected to the database. Your work will not be saved.")
+        # The notes are fetched on a background thread while the PDF opens and its first page
+        # renders below, load_notes() fills them in once they arrive
+        self.notes_result = None    # (notesDS or None, error) once the fetch is done
+        self.notes_loaded = False   # Saving waits for the notes, or an empty panel would replace them
+        self.quitting = False       # Set while quit_program waits for the last saves
+        threading.Thread(target=self.fetch_notes, name="notes-fetch", daemon=True).start()
+        self.pdf_document = modules.fitz.open(pdf_path) # Opens the PDF using PyMuPDF library                   
+        self.current_page = 0       # inits current page to the first one 
+        self.renderer = modules.PageRenderer(self.pdf_document) # Renders tiles of the open PDF
+        self.zoom = 1.0             # Current zoom level, one of ZOOM_LEVELS
+        self.hidpi = False          # Render at the screen's real DPI instead of 72 dpi
+        self.tiles = {}             # (column, row) -> (PhotoImage, canvas item) currently shown
+        self.tile_job = None        # Pending after call to render visible tiles
+        self.progressive = PROGRESSIVE_RENDERING # Preview first, full quality tiles from the worker
+        self.preview = None         # (PhotoImage, canvas item, tile area) of the low resolution preview
+        self.upcoming_tiles = []    # Tiles of the neighbouring pages to prefetch
+        self.prefetcher = modules.PagePrefetcher(pdf_path, modules.page_cache) # Pre-renders neighbouring pages
+        self.sections = []          # SectionModels of the note sections, in order
+        self.in_store = False       # Whether the database has this chapter, so changes can be saved incrementally
+        self.chapter_version = None # Version of the stored chapter the notes are based on, None if it wasn't stored
+        self.deleted_ids = set()    # IDs of deleted sections the database may still have
+        self.title_version = 0      # Counts edits to the chapter title
+        self.title_saved_version = 0
+        self.order_version = 0      # Counts sections added or deleted
+        self.order_saved_version = 0
+        self.connection_job = None  # Pending after call to refresh the online/offline indicator
+        self.text_index = None      # Search index of the PDF, set by the indexing thread when ready
+        self.search_hits = []       # (page, hits) of the last search, in the order listed
+        self.note_hits = []         # Results of the last note search, in the order listed
+
+        if not self.db.connected: # Checks to see if Database has been connected too
+            messagebox.showwarning("Warning", "You are not connected to the database. Your work will be kept on this computer and saved once it is back.")
         
         self.create_notes_frame()   # Creates frame for the notes
         self.create_buttons()       # Add buttons
+        self.create_navigator()     # Page thumbnails and table of contents
         self.create_pdf_viewer()    # Sets up PDF viewer
         self.create_prompts()       # Creates prompts for user
+        # Saves in the background while the user types
+        self.autosaver = modules.Autosaver(self.notes_frame, lambda callback: self.save_notes(callback, quiet=True))
+        self.online = self.db.connected
+        self.poll_connection()      # Keeps the online/offline indicator up to date
+        # Loads the search index, building it the first time this PDF is opened
+        threading.Thread(target=self.load_text_index, name="text-index", daemon=True).start()
         # Create example sections for notes 
         self.example_notes = {"Software process models": "A software process model is a simplified representation of a software process", "Process activities": "Real software processes are interleaved sequences of technical, collaborative, and managerial activities with the overall goal of specifying, designing, implementing, and testing a software system", 
                               "Coping with change": "Change adds to the costs of software development because it usually means that work that has been completed has to be redone. This is called rework.",
                                 "Proccess improvement": "Two quite different approaches to process improvement and change are used: The process maturity approach and The agile approach"}
 
-        if self.pdf_id == "Example Chapter":
+        if self.pdf_id == EXAMPLE_PDF_ID:
             #If the user is accessing Example PDF we load the prewritten example notes
             self.add_example_notes()
-
-    def load_notes(self):
-        user = User(self.username, None)  # Assuming password is not used for now
-        notes_data = user.getNotes(self.username, self.pdf_id) # Fetches notes
+        self.chapter_title_entry.config(state='disabled') # Until load_notes() has filled it in
+
+    def fetch_notes(self):
+        # Runs on the notes-fetch thread. Gets the notes from the database, or the ones saved
+        # offline if it can't be reached.
+        try:
+            notes_data = self.db.getNotes(self.username, self.pdf_id)
+            if notes_data is None and self.legacy_id:
+                # Saved before PDFs had content hash IDs, the first save stores them under the new ID
+                notes_data = self.db.getNotes(self.username, self.legacy_id)
+            self.notes_result = (notes_data, None)
+        except Exception as e:
+            self.notes_result = (None, e)
+
+    def load_notes(self, section_id=None):
+        # Fills in the notes panel once fetch_notes() is done, then scrolls to section_id if given
+        if self.notes_result is None:
+            self.master.after(NOTES_POLL_MS, self.load_notes, section_id)
+            return
+        notes_data, error = self.notes_result
+        self.notes_loading_label.destroy()
+        if error is not None:
+            # Saving stays off, so the notes that couldn't be loaded aren't overwritten
+            print("Error loading notes:", error)
+            messagebox.showerror("Error", "Your notes for this chapter could not be loaded. Changes made in this window will not be saved.")
+            return
+        self.chapter_title_entry.config(state='normal')
+        self.add_section_button.config(state='normal')
         
         # Debugging
         # print("Loaded notes data: ", notes_data) 
@@ -179,9 +262,20 @@ class NotesApp:
             # print("Sections", notes_data.sections)
         
             for section in notes_data.sections:
-                self.add_section(section['sectionTitle'], section['sectionNotes'])
+                self.add_section(section['sectionTitle'], section['sectionNotes'], section['sectionID'])
+            self.notes_list.refresh() # Widgets are only made for the sections in view
+
+            # What was just loaded is what the database has. Notes saved before sections had
+            # IDs, or under the PDF's old name, are saved in full once, which stores the IDs.
+            self.title_saved_version = self.title_version
+            self.in_store = not notes_data.legacyIDs and notes_data.pdfID == self.pdf_id
+            if notes_data.pdfID == self.pdf_id:
+                self.chapter_version = notes_data.version
         else:
             print("No notes found for this PDF.") # Log when there's no notes
+        self.notes_loaded = True
+        if section_id:
+            self.focus_section(section_id) # Opened from a note search result
 
     def create_notes_frame(self):
         # Sets up notes frame with widgets for note taking
@@ -196,24 +290,34 @@ class NotesApp:
         heading_label.pack(side='left', padx=(5, 10), pady=25, anchor='n')
 
         # Entry for the chapter title
-        self.chapter_title_entry = Entry(self.notes_frame, font=self.entry_font, fg='grey', bg='lightgrey')
+        self.chapter_title_var = tk.StringVar(self.notes_frame) # Every change to the title is counted
+        self.chapter_title_var.trace_add("write", self.on_chapter_title_modified)
+        self.chapter_title_entry = Entry(self.notes_frame, font=self.entry_font, fg='grey', bg='lightgrey',
+                                         textvariable=self.chapter_title_var)
         self.chapter_title_entry.insert(0, "Enter Chapter Title")
         self.chapter_title_entry.bind("<FocusIn>", self.on_entry_click)
         self.chapter_title_entry.bind("<FocusOut>", self.on_focusout)
         self.chapter_title_entry.pack(side='top', fill='x', padx=5, pady=25)
+        # Shown until load_notes() fills in the panel. Editing waits for the notes as well,
+        # so nothing typed is lost when they arrive.
+        self.notes_loading_label = Label(self.notes_frame, text="Loading notes...", fg='grey')
+        self.notes_loading_label.pack(side='top')
 
         self.create_add_section_button()  # Call it here to make sure it's packed in the correct frame
 
         # Create a canvas to hold NoteSections
         self.notes_canvas = Canvas(self.notes_frame, bg="white")
 
-        scrollbar = Scrollbar(self.notes_frame, orient='vertical', command=self.notes_canvas.yview)
+        scrollbar = Scrollbar(self.notes_frame, orient='vertical')
         scrollbar.pack(side='right', fill='y')
-
-        # Configure the inner notes frame to use the scrollbar
-        #self.notes_canvas.config(yscrollcommand=scrollbar.set, scrollregion=self.notes_canvas.bbox("all"))
         self.notes_canvas.pack(side="left", fill="both", expand=True)
 
+        # Shows self.sections on the canvas, with the scrollbar
+        self.notes_list = modules.NotesList(self.notes_canvas, scrollbar, self, self.sections)
+
+    def on_chapter_title_modified(self, *args):
+        self.title_version += 1
+
     def on_entry_click(self, event):
         if self.chapter_title_entry.get() == 'Enter Chapter Title':
             self.chapter_title_entry.delete(0, "end")  # Delete all the text in the entry
@@ -227,24 +331,299 @@ class NotesApp:
             self.chapter_title_entry.config(fg='grey')
 
     def create_pdf_viewer(self):
-        # Creates PDF viewing environment
-        self.canvas = Canvas(self.master, width=800, height=1000) # Initializes canvas
+        # Creates PDF viewing environment, a scrollable canvas the page tiles are drawn on
+        self.pdf_frame = Frame(self.master)
+        self.pdf_frame.pack(side='left', fill='both', expand=True)
+
+        self.canvas = Canvas(self.pdf_frame, width=800, height=1000) # Initializes canvas
+        y_scrollbar = Scrollbar(self.pdf_frame, orient='vertical', command=self.canvas.yview)
+        x_scrollbar = Scrollbar(self.pdf_frame, orient='horizontal', command=self.canvas.xview)
+        # Every change of the visible area (scrolling, resizing) goes through these
+        self.canvas.config(yscrollcommand=lambda first, last: self.on_pdf_scroll(y_scrollbar, first, last),
+                           xscrollcommand=lambda first, last: self.on_pdf_scroll(x_scrollbar, first, last))
+        y_scrollbar.pack(side='right', fill='y')
+        x_scrollbar.pack(side='bottom', fill='x')
         self.canvas.pack(side='left', fill='both', expand=True)
-        self.display_page(self.current_page)
 
-    def display_page(self, page_number):
-        page = self.pdf_document.load_page(page_number) # Loads specified page
-        pix = page.get_pixmap()                         # Library function call
-        # Create a temporary file for the pixmap
-        temp_file_path = tempfile.mktemp(suffix=".png")
-        pix.save(temp_file_path)  # Save pixmap to a PNG file
+        # Mouse wheel scrolling (Button-4/5 on Linux)
+        self.canvas.bind("<MouseWheel>", lambda event: self.canvas.yview_scroll(-1 if event.delta > 0 else 1, 'units'))
+        self.canvas.bind("<Button-4>", lambda event: self.canvas.yview_scroll(-1, 'units'))
+        self.canvas.bind("<Button-5>", lambda event: self.canvas.yview_scroll(1, 'units'))
 
-        # Load this image into a PhotoImage
-        self.photo = tk.PhotoImage(file=temp_file_path)
-        self.canvas.create_image(0, 50, image=self.photo, anchor='nw')
+        self.display_page(self.current_page)
 
-        # Clean up the temporary file
-        os.remove(temp_file_path)
+    def render_scale(self):
+        # Pixels per PDF point: the zoom level, times the screen's real DPI in HiDPI mode
+        scale = self.zoom
+        if self.hidpi:
+            scale *= self.canvas.winfo_fpixels('1i') / 72
+        return round(scale, 3)
+
+    def display_page(self, page_number, keep_position=False):
+        # Sets the canvas up for a page; the tiles themselves are drawn by render_visible_tiles
+        x_position, y_position = self.canvas.xview()[0], self.canvas.yview()[0]
+        self.page_width, self.page_height = self.renderer.page_size(page_number)
+        scale = self.render_scale()
+
+        # Remove the previous page's tiles and forget any render still waiting for it
+        self.cancel_tile_job()
+        self.canvas.delete('page')
+        self.tiles = {}
+        self.preview = None
+
+        self.canvas.config(scrollregion=(0, 0, self.page_width * scale, PAGE_TOP + self.page_height * scale))
+        if keep_position:
+            self.canvas.xview_moveto(x_position)
+            self.canvas.yview_moveto(y_position)
+        else:
+            self.canvas.xview_moveto(0)
+            self.canvas.yview_moveto(0)
+
+        # Get the pages the reader is most likely to turn to next ready in the background
+        self.upcoming_tiles = self.neighbour_tiles(page_number)
+        self.render_visible_tiles()
+        self.show_current_thumbnail(page_number)
+
+    def viewport(self):
+        # Visible part of the page as (x0, y0, x1, y1) in device pixels from the page's top left
+        x0 = self.canvas.canvasx(0)
+        y0 = self.canvas.canvasy(0) - PAGE_TOP
+        width = max(self.canvas.winfo_width(), self.canvas.winfo_reqwidth())
+        height = max(self.canvas.winfo_height(), self.canvas.winfo_reqheight())
+        return x0, y0, x0 + width, y0 + height
+
+    def render_visible_tiles(self):
+        # Draws the tiles inside the viewport (from the cache when possible) and drops the rest,
+        # so scrolling and zooming cost the same whatever the page size or zoom level
+        self.tile_job = None
+        scale = self.render_scale()
+        visible = modules.visible_tiles(self.page_width, self.page_height, scale, *self.viewport())
+
+        missing = [] # Visible tiles left for the background worker in progressive mode
+        for tile in visible:
+            if tile in self.tiles:
+                continue
+            key = (self.pdf_path, self.current_page, scale) + tile
+            ppm_data = modules.page_cache.get(key)
+            if ppm_data is None:
+                if self.progressive:
+                    if not self.prefetcher.gave_up((self.current_page, scale) + tile):
+                        missing.append(tile) # Otherwise it stays blank instead of waiting forever
+                    continue
+                ppm_data = self.renderer.render_tile_ppm(self.current_page, scale, *tile)
+                modules.page_cache.put(key, ppm_data)
+            photo = modules.ppm_to_photo(ppm_data)
+            item = self.canvas.create_image(tile[0] * modules.TILE_SIZE, PAGE_TOP + tile[1] * modules.TILE_SIZE,
+                                            image=photo, anchor='nw', tags='page')
+            self.tiles[tile] = (photo, item)
+
+        for tile in [tile for tile in self.tiles if tile not in visible]:
+            self.canvas.delete(self.tiles.pop(tile)[1])
+
+        if missing:
+            # Show the preview and check back until the worker has rendered the real tiles
+            self.show_preview(missing)
+            self.tile_job = self.canvas.after(PROGRESSIVE_POLL_MS, self.render_visible_tiles)
+        elif self.preview is not None:
+            self.canvas.delete(self.preview[1])
+            self.preview = None
+
+        # Visible tiles first, then the neighbouring pages. This replaces whatever the worker
+        # still had queued, so renders for a page the reader has left are cancelled.
+        self.prefetcher.prefetch([(self.current_page, scale) + tile for tile in missing] + self.upcoming_tiles)
+
+    def show_preview(self, missing):
+        # Covers the missing tiles with a quick low resolution render of the same area. The
+        # prefetch worker renders it ahead of the tiles, and the next poll shows it.
+        area = (min(tile[0] for tile in missing), min(tile[1] for tile in missing),
+                max(tile[0] for tile in missing), max(tile[1] for tile in missing))
+        if self.preview is not None:
+            shown = self.preview[2]
+            if shown[0] <= area[0] and shown[1] <= area[1] and shown[2] >= area[2] and shown[3] >= area[3]:
+                return # The current preview already covers them
+
+        first_column, first_row, last_column, last_row = area
+        request = (self.current_page, self.render_scale(), first_column * modules.TILE_SIZE, first_row * modules.TILE_SIZE,
+                   (last_column + 1) * modules.TILE_SIZE, (last_row + 1) * modules.TILE_SIZE, PREVIEW_SUBSAMPLE)
+        ppm_data = self.prefetcher.rendered_preview(request)
+        if ppm_data is None:
+            self.prefetcher.request_preview(request)
+            return
+        if self.preview is not None:
+            self.canvas.delete(self.preview[1])
+        photo = modules.ppm_to_photo(ppm_data).zoom(PREVIEW_SUBSAMPLE)
+        item = self.canvas.create_image(first_column * modules.TILE_SIZE, PAGE_TOP + first_row * modules.TILE_SIZE,
+                                        image=photo, anchor='nw', tags='page')
+        self.canvas.tag_lower(item) # Keep it underneath the full quality tiles
+        self.preview = (photo, item, area)
+
+    def cancel_tile_job(self):
+        # Cancels a scheduled render_visible_tiles call
+        if self.tile_job is not None:
+            self.canvas.after_cancel(self.tile_job)
+            self.tile_job = None
+
+    def stop_background_work(self):
+        # Stops background rendering and autosaving when this window goes away
+        self.cancel_tile_job()
+        self.prefetcher.close()
+        self.thumbnails.close()
+        if self.thumbnail_job is not None:
+            self.master.after_cancel(self.thumbnail_job)
+            self.thumbnail_job = None
+        if self.connection_job is not None:
+            self.master.after_cancel(self.connection_job)
+            self.connection_job = None
+        if self.autosaver:
+            self.autosaver.cancel()
+            print("Autosave:", self.autosaver.stats())
+
+    def neighbour_tiles(self, page_number):
+        # Tiles the reader will see first on the next and previous pages
+        scale = self.render_scale()
+        x0, _, x1, y1 = self.viewport()
+        tiles = []
+        for neighbour in (page_number + 1, page_number - 1):
+            if 0 <= neighbour < self.pdf_document.page_count:
+                width, height = self.renderer.page_size(neighbour)
+                tiles += [(neighbour, scale) + tile
+                          for tile in modules.visible_tiles(width, height, scale, x0, 0, x1, y1 - PAGE_TOP)]
+        return tiles
+
+    def create_navigator(self):
+        # Tabs next to the PDF with a thumbnail of every page and the table of contents,
+        # clicking either one jumps straight to the page
+        self.navigator = ttk.Notebook(self.master)
+        self.navigator.pack(side='left', fill='y', pady=10)
+
+        # Pages tab. Every page gets a placeholder, thumbnails are only loaded for the pages
+        # scrolled into view, see request_thumbnails.
+        pages_frame = Frame(self.navigator)
+        self.thumbnail_canvas = Canvas(pages_frame, width=modules.THUMBNAIL_WIDTH + 10, bg='grey90', highlightthickness=0)
+        scrollbar = Scrollbar(pages_frame, orient='vertical', command=self.thumbnail_canvas.yview)
+        self.thumbnail_canvas.config(yscrollcommand=lambda first, last: self.on_thumbnail_scroll(scrollbar, first, last))
+        scrollbar.pack(side='right', fill='y')
+        self.thumbnail_canvas.pack(side='left', fill='both', expand=True)
+        self.thumbnail_canvas.bind("<MouseWheel>", lambda event: self.thumbnail_canvas.yview_scroll(-1 if event.delta > 0 else 1, 'units'))
+        self.thumbnail_canvas.bind("<Button-4>", lambda event: self.thumbnail_canvas.yview_scroll(-1, 'units'))
+        self.thumbnail_canvas.bind("<Button-5>", lambda event: self.thumbnail_canvas.yview_scroll(1, 'units'))
+        self.thumbnail_canvas.bind("<Button-1>", self.on_thumbnail_click)
+
+        # Every page gets a slot the size of the first one
+        width, height = self.renderer.page_size(0)
+        self.thumbnail_height = round(modules.THUMBNAIL_WIDTH * height / width)
+        self.thumbnail_slot = THUMBNAIL_PAD_PX + self.thumbnail_height + THUMBNAIL_LABEL_PX
+        page_count = self.pdf_document.page_count
+        for page_number in range(page_count):
+            top = page_number * self.thumbnail_slot + THUMBNAIL_PAD_PX
+            self.thumbnail_canvas.create_rectangle(5, top, 5 + modules.THUMBNAIL_WIDTH, top + self.thumbnail_height,
+                                                   fill='white', outline='grey70')
+            self.thumbnail_canvas.create_text(5 + modules.THUMBNAIL_WIDTH / 2, top + self.thumbnail_height + THUMBNAIL_LABEL_PX / 2,
+                                              text=str(page_number + 1))
+        self.thumbnail_canvas.config(scrollregion=(0, 0, modules.THUMBNAIL_WIDTH + 10, page_count * self.thumbnail_slot),
+                                     yscrollincrement=self.thumbnail_slot // 4)
+        self.current_thumbnail = self.thumbnail_canvas.create_rectangle(0, 0, 0, 0, outline='blue', width=3)
+        self.thumbnail_images = {}  # page number -> PhotoImage shown in the strip
+        self.thumbnail_job = None   # Pending after call to pick up finished thumbnails
+        self.thumbnails = modules.ThumbnailStore(self.pdf_path, self.file_id) # Loads or renders them in the background
+        self.navigator.add(pages_frame, text="Pages")
+
+        # Contents tab, the entries are nested by level like the PDF's bookmarks
+        contents_frame = Frame(self.navigator)
+        if self.toc is None:
+            self.toc = self.pdf_document.get_toc()
+        if self.toc:
+            self.toc_tree = ttk.Treeview(contents_frame, show='tree', selectmode='browse')
+            toc_scrollbar = Scrollbar(contents_frame, orient='vertical', command=self.toc_tree.yview)
+            self.toc_tree.config(yscrollcommand=toc_scrollbar.set)
+            toc_scrollbar.pack(side='right', fill='y')
+            self.toc_tree.pack(side='left', fill='both', expand=True)
+            self.toc_pages = {}     # Treeview item -> page number
+            parents = {0: ''}       # level -> last item at that level
+            for level, title, page in self.toc:
+                item = self.toc_tree.insert(parents.get(level - 1, ''), 'end', text=title)
+                parents[level] = item
+                self.toc_pages[item] = page - 1 # The TOC counts pages from 1, -1 if it has no page
+            self.toc_tree.bind("<<TreeviewSelect>>", self.on_toc_selected)
+        else:
+            Label(contents_frame, text="This PDF has no\ntable of contents.", fg='grey').pack(padx=5, pady=10)
+        self.navigator.add(contents_frame, text="Contents")
+
+    def on_thumbnail_scroll(self, scrollbar, first, last):
+        # Keeps the scrollbar in sync and asks for the thumbnails that came into view
+        scrollbar.set(first, last)
+        self.request_thumbnails()
+
+    def request_thumbnails(self):
+        # Asks the thumbnail worker for the pages in view that don't have a thumbnail yet
+        top = self.thumbnail_canvas.canvasy(0)
+        bottom = self.thumbnail_canvas.canvasy(max(self.thumbnail_canvas.winfo_height(), self.thumbnail_canvas.winfo_reqheight()))
+        last = min(self.pdf_document.page_count - 1, int(bottom // self.thumbnail_slot))
+        pages = [page_number for page_number in range(max(0, int(top // self.thumbnail_slot)), last + 1)
+                 if page_number not in self.thumbnail_images]
+        if pages:
+            self.thumbnails.request(pages)
+            if self.thumbnail_job is None:
+                self.thumbnail_job = self.master.after(THUMBNAIL_POLL_MS, self.show_thumbnails)
+
+    def show_thumbnails(self):
+        # Puts the thumbnails the worker finished in their slots, polling until none are missing
+        self.thumbnail_job = None
+        for page_number, data in self.thumbnails.take().items():
+            image = tk.PhotoImage(data=data, format="PNG")
+            top = page_number * self.thumbnail_slot + THUMBNAIL_PAD_PX
+            self.thumbnail_canvas.create_image(5, top, anchor='nw', image=image)
+            self.thumbnail_images[page_number] = image
+        self.thumbnail_canvas.tag_raise(self.current_thumbnail)
+        if self.thumbnails.busy():
+            self.thumbnail_job = self.master.after(THUMBNAIL_POLL_MS, self.show_thumbnails)
+
+    def show_current_thumbnail(self, page_number):
+        # Outlines the page's thumbnail and scrolls the strip to it if it is out of view
+        top = page_number * self.thumbnail_slot + THUMBNAIL_PAD_PX
+        self.thumbnail_canvas.coords(self.current_thumbnail, 4, top - 1, 6 + modules.THUMBNAIL_WIDTH, top + self.thumbnail_height + 1)
+        self.thumbnail_canvas.tag_raise(self.current_thumbnail)
+        view_top = self.thumbnail_canvas.canvasy(0)
+        view_bottom = view_top + self.thumbnail_canvas.winfo_height()
+        if top < view_top or top + self.thumbnail_height > view_bottom:
+            total = self.pdf_document.page_count * self.thumbnail_slot
+            self.thumbnail_canvas.yview_moveto((top - THUMBNAIL_PAD_PX) / total)
+
+    def on_thumbnail_click(self, event):
+        page_number = int(self.thumbnail_canvas.canvasy(event.y) // self.thumbnail_slot)
+        if 0 <= page_number < self.pdf_document.page_count:
+            self.go_to_page(page_number)
+
+    def on_toc_selected(self, event):
+        selection = self.toc_tree.selection()
+        if selection and 0 <= self.toc_pages[selection[0]] < self.pdf_document.page_count:
+            self.go_to_page(self.toc_pages[selection[0]])
+
+    def on_pdf_scroll(self, scrollbar, first, last):
+        # Keeps the scrollbar in sync and redraws tiles once the view stops changing
+        scrollbar.set(first, last)
+        if self.tile_job is None:
+            self.tile_job = self.canvas.after_idle(self.render_visible_tiles)
+
+    def set_zoom(self, zoom):
+        # Re-renders the current page at a new zoom level, keeping the scroll position
+        self.zoom = zoom
+        self.display_page(self.current_page, keep_position=True)
+
+    def zoom_in(self):
+        larger = [zoom for zoom in ZOOM_LEVELS if zoom > self.zoom]
+        if larger:
+            self.set_zoom(larger[0])
+
+    def zoom_out(self):
+        smaller = [zoom for zoom in ZOOM_LEVELS if zoom < self.zoom]
+        if smaller:
+            self.set_zoom(smaller[-1])
+
+    def toggle_hidpi(self):
+        # Switches between 72 dpi rendering and rendering at the screen's DPI
+        self.hidpi = not self.hidpi
+        self.display_page(self.current_page, keep_position=True)
 
     def get_current_pdf_id(self):
         # Since the PDF ID is pre-assigned and stored in the instance, just return it
@@ -258,7 +637,7 @@ class NotesApp:
         label.pack(fill='x', padx=40, pady=5)
 
         # Yes and no button functionality
-        yes_button = Button(popup, text="Yes", command=lambda: [user_pdf_selection(self.username, popup), popup.withdraw(), self.master.withdraw(), self.save_notes()]) #INCLUDE SAVE_NOTES LATER WHEN WORKING
+        yes_button = Button(popup, text="Yes", command=lambda: [user_pdf_selection(self.username, popup), popup.withdraw(), self.master.withdraw(), self.save_notes(), self.stop_background_work()]) #INCLUDE SAVE_NOTES LATER WHEN WORKING
         yes_button.pack(side="left", fill='x', expand=True, padx=10, pady=10)
         no_button = Button(popup, text="No", command=popup.withdraw)
         no_button.pack(side="right", fill='x', expand=True, padx=10, pady=10)
@@ -278,6 +657,16 @@ class NotesApp:
         prev_page_button = Button(self.buttons_frame, text="Previous Page", command=self.prev_page)
         prev_page_button.pack(padx=5, pady=5, fill="x")
 
+        # Zoom buttons
+        zoom_in_button = Button(self.buttons_frame, text="Zoom In", command=self.zoom_in)
+        zoom_in_button.pack(padx=5, pady=5, fill="x")
+        zoom_out_button = Button(self.buttons_frame, text="Zoom Out", command=self.zoom_out)
+        zoom_out_button.pack(padx=5, pady=5, fill="x")
+
+        # HiDPI rendering toggle
+        hidpi_button = Button(self.buttons_frame, text="Toggle HiDPI", command=self.toggle_hidpi)
+        hidpi_button.pack(padx=5, pady=5, fill="x")
+
         # Save button
         save_button = Button(self.buttons_frame, text="Save", command=self.save_notes)
         save_button.pack(padx=5, pady=5, fill="x")
@@ -286,6 +675,26 @@ class NotesApp:
         exit_button = Button(self.buttons_frame, text="Exit", command=self.on_exit_button_click)
         exit_button.pack(padx=5, pady=5, fill="x")
 
+        # Search box, Enter or the Search button lists the matching pages
+        self.search_entry = Entry(self.buttons_frame)
+        self.search_entry.pack(padx=5, pady=(15, 5), fill="x")
+        self.search_entry.bind("<Return>", lambda event: self.search_pdf())
+        search_button = Button(self.buttons_frame, text="Search", command=self.search_pdf)
+        search_button.pack(padx=5, pady=5, fill="x")
+        self.search_status = Label(self.buttons_frame, text="")
+        self.search_status.pack(padx=5, fill="x")
+        self.search_results = Listbox(self.buttons_frame, height=6, exportselection=False)
+        self.search_results.pack(padx=5, pady=5, fill="x")
+        self.search_results.bind("<<ListboxSelect>>", self.on_search_result_selected)
+
+        # Search across all of the user's notes
+        search_notes_button = Button(self.buttons_frame, text="Search Notes", command=self.open_notes_search)
+        search_notes_button.pack(padx=5, pady=5, fill="x")
+
+        # Online/offline indicator, see poll_connection
+        self.connection_label = Label(self.buttons_frame, text="")
+        self.connection_label.pack(side="bottom", padx=5, pady=5, fill="x")
+
         # Button to change PDFs
         pdf_switch_button = Button(self.buttons_frame, text="Change PDF", command=self.switch_pdf)
         pdf_switch_button.pack(padx=5, pady=5, fill="x")
@@ -298,6 +707,149 @@ class NotesApp:
         toggle_prompts_button = Button(self.buttons_frame, text="Toggle Prompts", command=self.toggle_prompts)
         toggle_prompts_button.pack(padx=5, pady=5, fill="x")
     
+    def load_text_index(self):
+        # Runs on the indexing thread, only sets an attribute so no Tk calls are made here
+        try:
+            self.text_index = modules.load_index(self.pdf_path)
+        except Exception as e: # Search just stays unavailable
+            print("Could not index the PDF:", e)
+
+    def search_pdf(self):
+        # Lists the pages containing the search text and jumps to the first one
+        query = self.search_entry.get().strip()
+        self.search_results.delete(0, "end")
+        self.search_hits = []
+        if not query:
+            self.search_status.config(text="")
+            return
+        if self.text_index is None:
+            self.search_status.config(text="Still indexing, try again shortly")
+            return
+
+        start = time.perf_counter()
+        self.search_hits = self.text_index.search(query)
+        elapsed = (time.perf_counter() - start) * 1000
+        for page, hits in self.search_hits:
+            self.search_results.insert("end", f"Page {page + 1} ({hits} hit{'s' if hits > 1 else ''})")
+        self.search_status.config(text=f"{len(self.search_hits)} pages ({elapsed:.1f} ms)")
+        if self.search_hits:
+            self.search_results.selection_set(0)
+            self.go_to_page(self.search_hits[0][0])
+
+    def on_search_result_selected(self, event):
+        # Jumps to the page picked in the search results
+        selection = self.search_results.curselection()
+        if selection:
+            self.go_to_page(self.search_hits[selection[0]][0])
+
+    def go_to_page(self, page_number):
+        if page_number != self.current_page:
+            self.current_page = page_number
+            self.display_page(page_number)
+
+    def open_notes_search(self):
+        # Opens a window that searches every chapter of the user's notes as they type
+        popup = Toplevel(self.master)
+        popup.title("Search Notes")
+        entry = Entry(popup, width=50)
+        entry.pack(fill='x', padx=10, pady=10)
+        results = Listbox(popup, width=80, height=15)
+        results.pack(fill='both', expand=True, padx=10, pady=(0, 10))
+        entry.bind("<KeyRelease>", lambda event: self.search_notes(entry.get(), results))
+        results.bind("<Double-Button-1>", lambda event: self.open_note_hit(results, popup))
+        results.bind("<Return>", lambda event: self.open_note_hit(results, popup))
+        entry.focus_set()
+        # The first search on this computer indexes all of the user's notes in the background
+        threading.Thread(target=self.db.buildSearchIndex, args=(self.username,), name="notes-index", daemon=True).start()
+
+    def search_notes(self, query, results):
+        # Lists the sections matching query, best first
+        self.note_hits = self.db.searchNotes(self.username, query)
+        results.delete(0, "end")
+        for hit in self.note_hits:
+            results.insert("end", f"{hit['chapterTitle'] or hit['pdfID']} / {hit['sectionTitle']}: {hit['snippet']}")
+
+    def open_note_hit(self, results, popup):
+        # Opens the chapter of the chosen result at its section
+        selection = results.curselection()
+        if not selection:
+            return
+        hit = self.note_hits[selection[0]]
+        popup.destroy()
+        if hit['pdfID'] == self.pdf_id:
+            self.focus_section(hit['sectionID'])
+        elif find_pdf(hit['pdfID']) is not None:
+            self.save_notes()
+            self.stop_background_work()
+            self.master.withdraw()
+            main_window(self.username, hit['pdfID'], self.root, hit['sectionID'])
+        else:
+            messagebox.showwarning("Warning", f"The PDF for these notes ({hit['pdfID']}) is not available.")
+
+    def focus_section(self, section_id):
+        # Puts the cursor in a section's notes and highlights its title
+        for section in self.sections:
+            if section.section_id == section_id:
+                view = self.notes_list.scroll_to(section)
+                if view is not None:
+                    view.title_entry.config(bg='lightyellow')
+                    view.text_area.focus_set()
+                return
+
+    def open_section_history(self, section):
+        # Opens a window listing the saved versions of a section, newest first, with a
+        # preview of the one picked and a button to bring it back
+        revisions = self.db.sectionRevisions(self.username, self.pdf_id, section.section_id)
+        if not revisions:
+            messagebox.showinfo("History", "This section has no saved versions yet.")
+            return
+        popup = Toplevel(self.master)
+        popup.title(f"History: {section.title}")
+        results = Listbox(popup, width=50, height=15, exportselection=False)
+        results.pack(side='left', fill='y', padx=10, pady=10)
+        preview = scrolledtext.ScrolledText(popup, width=60, height=15, wrap='word')
+        preview.pack(side='top', fill='both', expand=True, padx=(0, 10), pady=10)
+        preview.config(state='disabled')
+        restore_button = Button(popup, text="Restore this version", state='disabled')
+        restore_button.pack(side='bottom', fill='x', padx=(0, 10), pady=(0, 10))
+
+        for entry in revisions:
+            saved_at = time.strftime("%Y-%m-%d %H:%M:%S", time.localtime(entry['savedAt']))
+            results.insert("end", f"#{entry['revision']}  {saved_at}  ({entry['size']} bytes)")
+
+        def on_select(event):
+            # Rebuilds the picked version and shows it
+            selection = results.curselection()
+            if not selection:
+                return
+            revision = self.db.sectionRevision(self.username, self.pdf_id, section.section_id,
+                                               revisions[selection[0]]['revision'])
+            preview.config(state='normal')
+            preview.delete("1.0", "end")
+            if revision is not None:
+                preview.insert("1.0", f"{revision[0]}\n\n{revision[1]}")
+            preview.config(state='disabled')
+            restore_button.config(state='normal' if revision is not None else 'disabled',
+                                  command=lambda: self.restore_section(section, revision, popup))
+
+        results.bind("<<ListboxSelect>>", on_select)
+        results.selection_set(0)
+        on_select(None)
+
+    def restore_section(self, section, revision, popup):
+        # Puts an earlier version of a section back. What it had until now is saved first,
+        # so it stays in the history and the restore can be undone the same way.
+        popup.destroy()
+        if section not in self.sections:
+            return # Deleted while the window was open
+        self.save_notes(quiet=True)
+        section.title_text, section.notes = revision
+        section.mark_modified()
+        view = self.notes_list.views.get(section.section_id)
+        if view is not None:
+            view.show(section)
+        self.on_notes_edited()
+
     def toggle_prompts(self):
         # This method toggles the visibility of the prompts
         if self.sq3r_prompt_label.winfo_viewable():
@@ -332,11 +884,11 @@ class NotesApp:
         if hasattr(self, 'pdf_visible'):
             if self.pdf_visible:
                 # Hide the PDF viewer
-                self.canvas.pack_forget()
+                self.pdf_frame.pack_forget()
                 self.pdf_visible = False # hides
             else:
                 # Show the PDF viewer
-                self.canvas.pack(side='left', fill='both', expand=True)
+                self.pdf_frame.pack(side='left', fill='both', expand=True)
                 self.pdf_visible = True # shows
         else:
             # If the attribute doesn't exist yet, assume the PDF is initially visible
@@ -369,8 +921,8 @@ class NotesApp:
 
     def create_add_section_button(self):
         # Button for adding a new section
-        add_section_button = Button(self.notes_frame, text="Add Section", command=self.add_new_section)
-        add_section_button.pack(side='bottom',pady=5)
+        self.add_section_button = Button(self.notes_frame, text="Add Section", command=self.add_new_section, state='disabled')
+        self.add_section_button.pack(side='bottom',pady=5)
 
     def add_example_notes(self):
         # Function to add notes sections for the example notes PDF 
@@ -379,64 +931,129 @@ class NotesApp:
         self.chapter_title_entry.insert(0, "Software processes")
         for title, text in self.example_notes.items():
             #Loop through the dictionary of (section title: section notes) and fill the notes section classes
-            new_section = NoteSection(self.notes_canvas, self.username, self.pdf_id, self.db, self)  # No title passed here
-            new_section.frame.pack(fill='x', expand=False)
-            self.sections.append(new_section)
-            new_section.title_entry.delete(0, "end")
-            new_section.title_entry.insert(0, title)
-            new_section.title_entry.config(fg='black')
-            new_section.text_area.insert("end", text)
+            self.sections.append(modules.SectionModel(title, text))
+            self.order_version += 1
+        self.notes_list.refresh()
 
     def add_new_section(self):
         # Functionality for adding a new section
         # Allocating memory in the DB
-        new_section = NoteSection(self.notes_canvas, self.username, self.pdf_id, self.db, self)  # No title passed here
-        new_section.frame.pack(fill='x', expand=False)
+        new_section = modules.SectionModel()  # No title passed here
         self.sections.append(new_section)
+        self.order_version += 1
+        self.notes_list.scroll_to(new_section) # Show the new section at the bottom of the list
         self.update_prompt('Recite') #when user goes to take notes, prompt changes to Recite
             
         
             
 
-    def add_section(self, title, content):
-        # User interface update function for adding a new section
-        # Getting user's PDF and notes from the DB
-        new_section = NoteSection(self.notes_canvas, self.username, self.pdf_id, self.db, self)
-        new_section.title_entry.delete(0, "end")
-        new_section.title_entry.insert(0, title)
-        new_section.title_entry.config(fg='black')
-        new_section.text_area.insert("1.0", content)
-        new_section.frame.pack(fill='x', expand=False)
+    def add_section(self, title, content, section_id=None):
+        # Adds a section loaded from the DB, call self.notes_list.refresh() afterwards
+        new_section = modules.SectionModel(title, content, section_id)
+        new_section.mark_saved() # It came from the database
         self.sections.append(new_section)
 
-
-    def save_notes(self):
-        # Checks to see if DB is connected, warns user if not.
-        if self.db is None:
-            messagebox.showwarning("Warning", "You are not connected to the database. Your work will not be saved.")
-            return  # Stop further execution
+    def poll_connection(self):
+        # Shows whether the database can be reached. The store's circuit breaker keeps that
+        # state up to date in the background, so reading it never waits for the server.
+        online = self.db.connected
+        if online and not self.online:
+            # Back online: send what was saved offline and anything edited since
+            if self.save_notes(quiet=True) is None:
+                self.db.replayInBackground()
+        self.online = online
+        if online:
+            self.connection_label.config(text="Online", fg="green")
+        else:
+            self.connection_label.config(text="Offline, saving locally", fg="red")
+        self.connection_job = self.master.after(CONNECTION_POLL_MS, self.poll_connection)
+
+    def remove_section(self, section):
+        # Forgets a deleted section and saves the deletion if we are connected
+        self.sections.remove(section)
+        if section.saved_version is not None:
+            self.deleted_ids.add(section.section_id)
+        self.order_version += 1
+        self.notes_list.refresh()
+        self.save_notes()
+
+
+    def on_notes_edited(self):
+        # Lets the autosave know the notes changed
+        if self.autosaver:
+            self.autosaver.touch()
+
+    def save_notes(self, callback=None, quiet=False):
+        # Starts a background save of whatever changed. Returns None if nothing was sent,
+        # otherwise whether it was merged into a save that was still queued.
+        # callback(result, error) runs once the save is done, quiet skips the error popup.
+
+        # Offline the store writes to the local journal instead, see JournalStore
+        if not self.notes_loaded:
+            return None # The notes haven't arrived yet, there is nothing to save
         #pdfID should be available for the PDF being annotated
         pdfID = self.get_current_pdf_id()  # Implement this method or get pdfID from your app's state
         chapterTitle = self.chapter_title_entry.get()
 
-        notes_obj = notesDS(pdfID, chapterTitle)  # Create a new notesDS object
-        
-        ## Collect the notes from each section
-        for section in self.sections:
-            # Check if the section still exists before accessing it
-            if section.title_entry.winfo_exists() and section.text_area.winfo_exists():
-                # Get the title from the Entry widget in NoteSection
-                title = section.title
-                # Get text from Text widget
-                content = section.text_area.get("1.0", "end-1c")
-                # Add section to notesDS object
-                notes_obj.addSection(title, content)
-            else:
-                print("Section doesn't exist. Skipping...")
+        # What this save covers, applied once the database confirms it (see on_notes_saved)
+        saved = {
+            'title': self.title_version,
+            'order': self.order_version,
+            'sections': {section.section_id: section.version for section in self.sections},
+            'deleted': set(self.deleted_ids)
+        }
 
-        # Now update the notes in the database
-        self.db.updateUserNotes(self.username, notes_obj)  # Pass the notesDS object to update notes
+        if not self.in_store:
+            # First save of this chapter, send all of it
+            notes_obj = modules.notesDS(pdfID, chapterTitle)  # Create a new notesDS object
 
+            ## Collect the notes from each section
+            for section in self.sections:
+                # The model always has the latest title and text, its widgets copy every edit to it
+                notes_obj.addSection(section.title, section.notes, section.section_id)
+            notes_obj.version = self.chapter_version
+        else:
+            # Only send what changed since the last save the database confirmed
+            title_changed = self.title_version != self.title_saved_version
+            notes_obj = modules.notesChanges(pdfID, chapterTitle if title_changed else None)
+            for position, section in enumerate(self.sections):
+                if section.dirty:
+                    notes_obj.addSection(section.title, section.notes,
+                                         section.section_id, position, section.saved_version is None)
+            notes_obj.deletedIDs = list(self.deleted_ids)
+            if self.order_version != self.order_saved_version:
+                notes_obj.order = [section.section_id for section in self.sections]
+            notes_obj.baseVersion = self.chapter_version
+            if notes_obj.isEmpty():
+                print("No changes to save.")
+                return None
+
+        # Now hand the notes to the background writer, the UI carries on right away
+        return modules.notes_writer.submit(self.db, self.username, notes_obj,
+                                   lambda result, error: self.on_notes_saved(result, error, saved, callback, quiet))
+
+    def on_notes_saved(self, result, error, saved, callback=None, quiet=False):
+        # Called on the Tk thread once the background writer has finished a save
+        if callback is not None:
+            callback(result, error)
+        if error is not None:
+            # Nothing is marked saved, so the next save sends these changes again
+            print("Error saving notes:", error)
+            if not quiet:
+                messagebox.showwarning("Warning", f"Your notes could not be saved: {error}")
+            return
+
+        # Everything this save covered is in the database now. Edits made while it was
+        # being written have higher versions and stay dirty.
+        self.in_store = True
+        if isinstance(result, int): # None when it went to the offline journal
+            self.chapter_version = result
+        self.title_saved_version = max(self.title_saved_version, saved['title'])
+        self.order_saved_version = max(self.order_saved_version, saved['order'])
+        for section in self.sections:
+            if section.section_id in saved['sections']:
+                section.mark_saved(saved['sections'][section.section_id])
+        self.deleted_ids -= saved['deleted']
         print("Notes saved!")
         
     def on_exit_button_click(self):
@@ -457,6 +1074,7 @@ class NotesApp:
     def logout(self, popup):
         # Logs out user
         self.save_notes()   # Notes are auto saved
+        self.stop_background_work() # Stop rendering pages and autosaving for this window
         self.master.withdraw()
         popup.destroy()     # Destroys the confirmation window
         global login_screen # Global login screen variable to access the login screen after logging out
@@ -465,8 +1083,18 @@ class NotesApp:
         print("Logged out")
 
     def quit_program(self, popup):
-        if self.db: # Check to see if DB is connected too
-            self.save_notes() # If connected, save notes
+        if self.quitting:
+            return # Already waiting for the saves
+        self.quitting = True
+        self.save_notes() # Save to the database, or the offline journal
+        self.stop_background_work() # Stop the page rendering worker and autosave
+        # The process is about to exit, let the saves finish while the event loop keeps running
+        wait_for_saves(self.master, lambda: self.finish_quit(popup), time.monotonic() + QUIT_SAVE_TIMEOUT)
+
+    def finish_quit(self, popup):
+        # Closes the program once quit_program has waited for the saves
+        modules.notes_journal.sync()
+        modules.notes_index.flush()
         # Destroy the popup window
         popup.destroy()
         # Terminate the entire program
@@ -476,6 +1104,25 @@ class NotesApp:
         print("Program terminated")
 
 
+def wait_for_saves(window, then, deadline, dialog=None):
+    # Calls then() once every queued save is written, or at deadline (time.monotonic()).
+    # Checks back with after() in the meantime and shows how many saves are left.
+    waiting = modules.notes_writer.waiting()
+    if waiting == 0 or time.monotonic() >= deadline:
+        if dialog is not None:
+            dialog[0].destroy()
+        then()
+        return
+    if dialog is None:
+        top = Toplevel(window)
+        top.title("Saving")
+        label = Label(top, padx=30, pady=15)
+        label.pack()
+        dialog = (top, label)
+    dialog[1].config(text=f"Saving notes, {waiting} left...")
+    window.after(QUIT_POLL_MS, wait_for_saves, window, then, deadline, dialog)
+
+
 def open_login_screen(root):
     global login_screen
     def valid_login(username):
@@ -534,62 +1181,107 @@ def open_login_screen(root):
     login_screen.protocol("WM_DELETE_WINDOW", lambda: root.destroy())
 
 def user_pdf_selection(username, root):
+    # The list is filled once the warm up has loaded the modules and scanned the PDF
+    # library, the window doesn't wait for either on the Tk thread
+
     # Create the PDF selection window as a Toplevel window
     selection_window = tk.Toplevel(root)
     selection_window.title("Select PDF")
-    selection_window.geometry("300x200")
+    selection_window.geometry("300x300")
     
     # Display message
     message_label = tk.Label(selection_window, text=f"Hello, {username}. Please select a PDF to begin:")
     message_label.pack(pady=10)
 
-    def on_pdf_selection(pdf_id):
-        # You may want to pass the pdf_id (if different from chapter_title) to main_window
+    choices = [] # (title, pdf_id) of each line of the list, empty until the library is scanned
+
+    def on_pdf_selection(event=None):
+        selection = pdf_list.curselection()
+        if not selection or selection[0] >= len(choices):
+            return
         selection_window.destroy()  # Close the PDF selection window
-        main_window(username, pdf_id, root)  # Open the main window with the selected PDF
-    
-    # Dictionary of PDF chapter titles and corresponding IDs
-    pdf_options = {
-        "Chapter 6": 1,
-        "Chapter 3": 2,
-        "Chapter 2": 3,
-        "Example Chapter": 4
-    }
-
-    # Create a button for each PDF chapter title
-    for chapter_title, _ in pdf_options.items():
-        button = tk.Button(selection_window, text=chapter_title, command=lambda title=chapter_title: on_pdf_selection(title))
-        button.pack(fill='x', padx=50, pady=5)
+        main_window(username, choices[selection[0]][1], root)  # Open the main window with the selected PDF
+
+    # The library may hold many PDFs, so they are shown in a scrollable list
+    list_frame = Frame(selection_window)
+    list_frame.pack(fill='both', expand=True, padx=20)
+    scrollbar = Scrollbar(list_frame, orient='vertical')
+    scrollbar.pack(side='right', fill='y')
+    pdf_list = Listbox(list_frame, yscrollcommand=scrollbar.set)
+    pdf_list.pack(side='left', fill='both', expand=True)
+    scrollbar.config(command=pdf_list.yview)
+    pdf_list.insert("end", "Loading the PDF library...")
+    pdf_list.bind("<Double-Button-1>", on_pdf_selection)
+    pdf_list.bind("<Return>", on_pdf_selection)
+
+    open_button = tk.Button(selection_window, text="Open", command=on_pdf_selection)
+    open_button.pack(fill='x', padx=50, pady=5)
+
+    def fill_list():
+        # Every PDF in the library, listed by title, then the example chapter
+        if not selection_window.winfo_exists():
+            return
+        if startup_error is not None:
+            pdf_list.delete(0, "end")
+            pdf_list.insert("end", "The PDF library could not be loaded.")
+            return
+        if modules is None or not modules.pdf_library.scanned.is_set():
+            selection_window.after(STARTUP_POLL_MS, fill_list)
+            return
+        choices.extend((entry['title'], entry['pdf_id']) for entry in modules.pdf_library.documents())
+        if find_pdf(EXAMPLE_PDF_ID) is not None:
+            choices.append((EXAMPLE_PDF_ID, EXAMPLE_PDF_ID))
+        pdf_list.delete(0, "end")
+        for title, _ in choices:
+            pdf_list.insert("end", title)
+
+    fill_list()
 
     # Make the selection window modal
     selection_window.grab_set()
 
-def main_window(username, pdf_id, root):
+# The example chapter opens a PDF of the library with prewritten notes, under its own pdf_id
+# (notes_id in its find_pdf entry)
+EXAMPLE_PDF_ID = "Example Chapter"
+EXAMPLE_PDF_FILE = "Sommerville-Chapter-2.pdf"
+
+def find_pdf(pdf_id):
+    # Library entry of a PDF by its ID or the name its notes were stored under before it had
+    # one, None if the PDF isn't in the library
+    if pdf_id == EXAMPLE_PDF_ID:
+        entry = modules.pdf_library.get_path(os.path.join(modules.pdf_library.directory, EXAMPLE_PDF_FILE))
+        if entry is None:
+            return None
+        return dict(entry, notes_id=EXAMPLE_PDF_ID, legacy_id=None)
+    return modules.pdf_library.get(pdf_id)
+
+def main_window(username, pdf_id, root, section_id=None):
     # Main UI function
 
+    # The warm up loads the modules and connects while the user logs in. Waiting for it
+    # on the Tk thread would freeze the UI for as long as the server takes to answer.
+    if startup_error is not None:
+        show_startup_error()
+        return
+    if modules is None or modules.notes_store is None:
+        root.after(STARTUP_POLL_MS, main_window, username, pdf_id, root, section_id)
+        return
+
     # ARA window initializastion
     main_app_window = tk.Toplevel(root)
     main_app_window.geometry("1200x700")
 
-    # Paths to selectable PDFs to be used with the ARA
-    pdf_paths = {
-        "Chapter 6": "../../Resources/Sommerville_Chapter_6_Survey_Highlighted.pdf",
-        "Chapter 3": "../../Resources/Chapter3.pdf",
-        "Chapter 2": "../../Resources/Sommerville-Chapter-2.pdf",
-        "Example Chapter": "../../Resources/Sommerville-Chapter-2.pdf",
-
-    }
-
-    # Create Databse object and check to see if it connected properly
-    db = Database("mongodb://localhost:27017/", "active_reading_assistant", "schema.json")
-    if db.connected == False:
-        db = None # DB set to None if unable to connect.
-
-    # Retrieve the path using the pdf_id (which is the same as the chapter title in your case)
-    pdf_path = pdf_paths[pdf_id]  # No need for the default path since the ID is guaranteed to be valid
-    notes_app = NotesApp(main_app_window, pdf_path, username, pdf_id, root, db)  # The chapter title is used as the pdf_id
-    if db:
-        notes_app.load_notes()  # Load notes for the selected PDF
+    # Get the shared notes store (Database or SectionStore). Saves made while it can't be
+    # reached go to the offline journal and are sent once it is back.
+    db = modules.JournalStore(modules.notes_journal, modules.notes_store, modules.notes_index,
+                              modules.notes_history, modules.notes_cache)
+
+    # Notes are stored under the PDF's content hash ID, which note search results from
+    # before IDs were hashes are looked up by their old name
+    entry = find_pdf(pdf_id)
+    notes_app = NotesApp(main_app_window, entry['path'], username, entry.get('notes_id', entry['pdf_id']), root, db,
+                         entry['legacy_id'], entry.get('toc'), entry['pdf_id'])
+    notes_app.load_notes(section_id)  # Shows the notes once fetched, the PDF is already up
     main_app_window.protocol("WM_DELETE_WINDOW", lambda: notes_app.quit_program(main_app_window))
 
 def main():
@@ -599,7 +1291,25 @@ def main():
     root = tk.Tk()      # Using TKinter library
     root.withdraw()
     open_login_screen(root) # Calls login screen first
+    # Load the heavy modules and connect to the database while the user logs in
+    threading.Thread(target=warm_up, name="warm-up", daemon=True).start()
+    finish_startup(root)
     root.mainloop()
+    if modules is not None:
+        modules.notes_writer.flush(QUIT_SAVE_TIMEOUT) # Don't lose saves still in the queue on exit
+        modules.notes_journal.sync() # Make sure offline saves are on disk
+        modules.notes_index.flush()
+
+def finish_startup(root):
+    # Waits on the Tk event loop for load_modules() to finish, then starts reporting
+    # finished saves from the Tk event loop
+    if startup_error is not None:
+        show_startup_error()
+        return
+    if modules is None:
+        root.after(STARTUP_POLL_MS, finish_startup, root)
+        return
+    modules.notes_writer.attach(root)
 
 if __name__ == "__main__":
     main()
\ No newline at end of file
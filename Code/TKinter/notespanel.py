@@ -0,0 +1,309 @@
+# File: notespanel.py
+# Project: CS 422 Project 1
+# Authors: ARA Team
+# Creation date: 10-18-2026
+# Description: This file contains the notes panel used by main.py. Sections are kept as
+#              lightweight SectionModel objects and NotesList only creates widgets
+#              (NoteSection) for the sections in or near the visible part of the panel,
+#              reusing them while the user scrolls. A chapter with hundreds of sections
+#              opens as fast as one with a few.
+
+# Modifications:
+# Date        Author       Change
+# ----------- ------------ -----------------------------------------------------
+# 10-18-2026  ARA Team     Initial creation of the file, NoteSection moved here from main.py
+# 10-18-2026  ARA Team     History button, opens the section's earlier versions
+# 10-18-2026  ARA Team     Text edits reach the autosave from <<Modified>>, once the text has the edit
+# ==============================================================================
+
+import tkinter as tk  # Used for the section widgets
+from tkinter import Frame, Label, Toplevel, Button, Entry
+import bisect  # Used to find the sections in view from their offsets
+
+from datastructs import newSectionID
+
+SECTION_TITLE_PLACEHOLDER = "Enter Section Title"
+OVERSCAN_PX = 300 # Sections this far above or below the visible area get widgets too
+SCROLL_STEP_PX = 20 # Distance one mouse wheel step scrolls the panel
+
+
+# The data of one section of notes. Only sections near the viewport have widgets, so
+# everything the app needs to know about a section lives here.
+class SectionModel:
+    def __init__(self, title="", notes="", section_id=None):
+        self.section_id = section_id or newSectionID() # Stable ID, kept across saves and loads
+        self.title_text = title     # Title as typed, empty if there isn't one
+        self.notes = notes          # Text of the notes
+        self.collapsed = False      # Whether the notes are hidden, leaving the title and buttons
+        self.version = 0            # Counts edits to the title or notes
+        self.saved_version = None   # Version the database has, None if it may not have the section yet
+
+    @property
+    def title(self):
+        # Gets current title of the section, or default if there isn't one
+        return self.title_text.strip() or "Untitled Section"
+
+    def mark_modified(self):
+        # Records that the section changed since it was last saved
+        self.version += 1
+
+    def mark_saved(self, version=None):
+        # Records that the database has this section as of version (default: right now)
+        if version is None:
+            version = self.version
+        if self.saved_version is None or version > self.saved_version:
+            self.saved_version = version
+
+    @property
+    def dirty(self):
+        # Whether the section has changes the database doesn't have yet
+        return self.saved_version != self.version
+
+
+# Widgets showing one SectionModel. NotesList moves them to another section when the one
+# they show scrolls out of view, see show().
+class NoteSection:
+    def __init__(self, master, notes_app, notes_list):
+        self.frame = Frame(master) # main frame for holding the notes
+        self.notes_app = notes_app  # Store the reference to the NotesApp instance (used for prompts)
+        self.notes_list = notes_list # NotesList the widgets belong to
+        self.model = None # Section shown, None while the widgets are unused
+        self.loading = False # Set while show() fills the widgets, so that isn't counted as an edit
+
+        # Use an Entry widget instead of a Label for the section title
+        self.title_var = tk.StringVar(self.frame) # Every change to the title goes to the model
+        self.title_var.trace_add("write", self.on_title_modified)
+        self.title_entry = Entry(self.frame, fg='grey', bg='lightgrey', width=20, textvariable=self.title_var)
+        self.title_entry.bind("<FocusIn>", self.on_title_entry_click)
+        self.title_entry.bind("<FocusOut>", self.on_title_focusout)
+        self.title_entry.pack(side='top', fill='x')
+
+        # Toggle to collapse or expand notes section
+        self.toggle_button = Button(self.frame, text="-", command=self.toggle)
+        self.toggle_button.pack(side='top', fill='x')
+
+        # Delete section button
+        self.delete_button = Button(self.frame, text="Delete", command=self.on_delete_click)
+        self.delete_button.pack(side='top', fill='x')
+
+        # Earlier versions of the section
+        self.history_button = Button(self.frame, text="History", command=self.on_history_click)
+        self.history_button.pack(side='top', fill='x')
+
+        # Creates text area for writing notes
+        self.text_area = tk.Text(self.frame, height=5, width=50)
+        self.text_area.pack(side='top', fill='x', expand=True)
+
+        # Bind a key press event to the text area to detect when the user starts typing
+        self.text_area.bind("<KeyPress>", self.on_text_entry)
+        # Tk sets the text's modified flag on every edit
+        self.text_area.bind("<<Modified>>", self.on_text_modified)
+
+    def show(self, model):
+        # Fills the widgets with a section
+        self.model = None
+        self.loading = True
+        self.title_entry.delete(0, "end")
+        if model.title_text:
+            self.title_entry.insert(0, model.title_text)
+            self.title_entry.config(fg='black', bg='lightgrey')
+        else:
+            self.title_entry.insert(0, SECTION_TITLE_PLACEHOLDER)
+            self.title_entry.config(fg='grey', bg='lightgrey')
+        self.text_area.delete("1.0", "end")
+        self.text_area.insert("1.0", model.notes)
+        self.text_area.edit_reset() # Undo history belonged to the previous section
+        self.text_area.edit_modified(False) # Ignore the flag set by loading the text
+        self.show_notes(not model.collapsed)
+        self.loading = False
+        self.model = model
+
+    def show_notes(self, visible):
+        # Shows or hides the text area
+        if visible and not self.text_area.winfo_manager():
+            self.text_area.pack(side='top', fill='x', expand=True)
+        elif not visible and self.text_area.winfo_manager():
+            self.text_area.pack_forget()
+        self.toggle_button.configure(text="-" if visible else "+")
+
+    # when user starts taking notes, display prompt 'recite'
+    def on_text_entry(self, event):
+        # Call the update_prompt method on the NotesApp instance
+        self.notes_app.update_prompt('Recite')
+
+    def on_text_modified(self, event):
+        # Copies the edit to the model, then clears the flag so the next edit fires the event again.
+        # The autosave hears of the edit here rather than on <KeyPress>, which runs before the
+        # key's character is in the text.
+        if self.text_area.edit_modified():
+            if self.model is not None:
+                self.model.notes = self.text_area.get("1.0", "end-1c")
+                self.model.mark_modified()
+                self.notes_app.on_notes_edited()
+            self.text_area.edit_modified(False)
+
+    def on_title_modified(self, *args):
+        # Copies a title edit to the model, the placeholder counts as no title
+        if self.model is None or self.loading:
+            return
+        title = self.title_var.get()
+        if title == SECTION_TITLE_PLACEHOLDER:
+            title = ""
+        if title != self.model.title_text:
+            self.model.title_text = title
+            self.model.mark_modified()
+            self.notes_app.on_notes_edited()
+
+    def toggle(self):
+        # Collapse or expand text area
+        if self.model is not None:
+            self.model.collapsed = not self.model.collapsed
+            self.show_notes(not self.model.collapsed)
+            self.notes_list.refresh() # The section changed height
+
+    def on_title_entry_click(self, event):
+        # Clear the entry field when it gets modified
+        if self.title_entry.get() == SECTION_TITLE_PLACEHOLDER:
+            self.title_entry.delete(0, "end")
+            self.title_entry.config(fg='black')
+
+    def on_title_focusout(self, event):
+        # Resets the title field if empty
+        if not self.title_entry.get().strip():
+            self.title_entry.delete(0, "end")
+            self.title_entry.insert(0, SECTION_TITLE_PLACEHOLDER)
+            self.title_entry.config(fg='grey')
+
+    def delete_section(self, model, root):
+        # Remove section from the notes, the deletion is sent to the database with the next save
+        if model in self.notes_app.sections:
+            self.notes_app.remove_section(model)
+        root.withdraw()
+
+    def on_history_click(self):
+        if self.model is not None:
+            self.notes_app.open_section_history(self.model)
+
+    def on_delete_click(self):
+        # Confirms deletion of a notes section
+        model = self.model # The widgets may show another section by the time the user answers
+        popup = Toplevel() # Popup location
+        label = Label(popup, text="Are you sure you want to delete your notes?") # Popup message
+        label.pack(fill='x', padx=50, pady=5)
+
+        # Functionality for 'yes'
+        logout_button = Button(popup, text="Yes", command=lambda: self.delete_section(model, popup))
+        logout_button.pack(side="left", fill='x', expand=True, padx=10, pady=10)
+
+        # Functionaslity for 'no'
+        quit_button = Button(popup, text="No", command=lambda: popup.withdraw())
+        quit_button.pack(side="right", fill='x', expand=True, padx=10, pady=10)
+
+
+# Scrollable list of sections on a canvas that only has NoteSection widgets for the
+# sections in or near view. Every section is either expanded or collapsed, so their
+# offsets are worked out from two measured heights without creating any widgets.
+class NotesList:
+    def __init__(self, canvas, scrollbar, notes_app, models):
+        self.canvas = canvas
+        self.notes_app = notes_app
+        self.models = models        # SectionModels in display order, the list is shared with NotesApp
+        self.views = {}             # section_id -> NoteSection showing it
+        self.pool = []              # Hidden NoteSections ready to be reused
+        self.items = {}             # NoteSection -> its canvas window item
+        self.heights = None         # (expanded, collapsed) height of a section, measured once
+        self.offsets = [0]          # Top of each section, then the height of the whole list
+
+        canvas.config(yscrollcommand=scrollbar.set, yscrollincrement=SCROLL_STEP_PX)
+        scrollbar.config(command=self.yview)
+        canvas.bind("<Configure>", lambda event: self.refresh())
+        self.bind_wheel(canvas)
+
+    def bind_wheel(self, widget):
+        # Mouse wheel scrolling (Button-4/5 on Linux)
+        widget.bind("<MouseWheel>", lambda event: self.yview('scroll', -1 if event.delta > 0 else 1, 'units'))
+        widget.bind("<Button-4>", lambda event: self.yview('scroll', -1, 'units'))
+        widget.bind("<Button-5>", lambda event: self.yview('scroll', 1, 'units'))
+
+    def yview(self, *args):
+        # Scrolls the canvas, then gives widgets to the sections that came into view
+        self.canvas.yview(*args)
+        self.refresh()
+
+    def new_view(self):
+        # Creates a hidden NoteSection and its canvas window
+        view = NoteSection(self.canvas, self.notes_app, self)
+        self.items[view] = self.canvas.create_window(0, 0, anchor='nw', window=view.frame, state='hidden')
+        for widget in (view.frame, view.title_entry, view.toggle_button, view.delete_button, view.history_button):
+            self.bind_wheel(widget) # The text area keeps scrolling its own text
+        return view
+
+    def measure(self):
+        # Measures the height of an expanded and a collapsed section
+        view = self.new_view()
+        view.show(SectionModel())
+        self.canvas.update_idletasks()
+        expanded = view.frame.winfo_reqheight()
+        self.heights = (expanded, expanded - view.text_area.winfo_reqheight())
+        view.model = None
+        self.pool.append(view)
+
+    def refresh(self):
+        # Lays the list out again after scrolling, resizing or a change to the sections
+        if self.heights is None:
+            self.measure()
+        expanded, collapsed = self.heights
+        offsets = [0]
+        for model in self.models:
+            offsets.append(offsets[-1] + (collapsed if model.collapsed else expanded))
+        self.offsets = offsets
+        width = self.canvas.winfo_width()
+        self.canvas.config(scrollregion=(0, 0, width, offsets[-1]))
+
+        # Sections overlapping the visible area plus OVERSCAN_PX above and below it
+        top = self.canvas.canvasy(0) - OVERSCAN_PX
+        bottom = self.canvas.canvasy(self.canvas.winfo_height()) + OVERSCAN_PX
+        first = max(0, bisect.bisect_right(offsets, top) - 1)
+        last = min(len(self.models), bisect.bisect_left(offsets, bottom))
+        wanted = {self.models[index].section_id: index for index in range(first, last)}
+
+        # Widgets of sections that left the view (or were deleted) go back to the pool,
+        # except the one being typed in
+        focused = self.focused_view()
+        present = {model.section_id for model in self.models} if focused else ()
+        for section_id in list(self.views):
+            view = self.views[section_id]
+            if section_id in wanted or (view is focused and section_id in present):
+                continue
+            del self.views[section_id]
+            view.model = None
+            self.canvas.itemconfigure(self.items[view], state='hidden')
+            self.pool.append(view)
+
+        for index, model in enumerate(self.models):
+            if model.section_id not in wanted and model.section_id not in self.views:
+                continue
+            view = self.views.get(model.section_id)
+            if view is None:
+                view = self.pool.pop() if self.pool else self.new_view()
+                view.show(model)
+                self.views[model.section_id] = view
+            item = self.items[view]
+            self.canvas.coords(item, 0, offsets[index])
+            self.canvas.itemconfigure(item, width=width, state='normal')
+
+    def focused_view(self):
+        # The NoteSection holding the keyboard focus, if any
+        widget = self.canvas.focus_get()
+        for view in self.views.values():
+            if widget in (view.title_entry, view.text_area):
+                return view
+        return None
+
+    def scroll_to(self, model):
+        # Scrolls a section into view and returns its NoteSection
+        self.refresh() # The offsets must include the section
+        index = self.models.index(model)
+        self.canvas.yview_moveto(self.offsets[index] / max(1, self.offsets[-1]))
+        self.refresh()
+        return self.views.get(model.section_id)
@@ -0,0 +1,163 @@
+# File: pagecache.py
+# Project: CS 422 Project 1
+# Authors: ARA Team
+# Creation date: 10-18-2026
+# Description: This file contains the rendered page cache used by the PDF viewer, and a
+#              background worker that pre-renders neighbouring pages into it so page
+#              turns can be served from memory.
+
+# Modifications:
+# Date        Author       Change
+# ----------- ------------ -----------------------------------------------------
+# 10-18-2026  ARA Team     Initial creation of the file, LRU cache and prefetch worker
+# 10-18-2026  ARA Team     Cache and prefetch page tiles instead of whole pages
+# 10-18-2026  ARA Team     Worker also renders visible tiles in progressive mode
+# 10-18-2026  ARA Team     Worker renders the progressive preview too, ahead of the tiles
+# 10-18-2026  ARA Team     A tile that fails is skipped instead of stopping the worker, see gave_up()
+# 10-18-2026  ARA Team     The worker's document is guarded by its renderer's lock, not a process-wide one
+# ==============================================================================
+
+import threading  # Used to run the prefetch worker off the Tk main thread
+from collections import OrderedDict  # Keeps cache entries in least-recently-used order
+import fitz  # PyMuPDF, the worker opens its own handle to the PDF
+
+from render import PageRenderer
+
+
+# Bounded least-recently-used cache of rendered page tiles.
+# Keys are (pdf path, page number, scale, column, row) and values are PPM bytes, so
+# the memory limit is simply the sum of the stored image sizes.
+class PageCache:
+    def __init__(self, max_bytes=64 * 1024 * 1024):
+        self.max_bytes = max_bytes      # Memory limit for all cached images
+        self.size = 0                   # Bytes currently held
+        self.entries = OrderedDict()    # key -> image bytes, oldest first
+        self.lock = threading.Lock()    # The prefetch worker writes from another thread
+
+    def get(self, key):
+        # Returns the cached image for key (and marks it recently used), or None
+        with self.lock:
+            data = self.entries.get(key)
+            if data is not None:
+                self.entries.move_to_end(key)
+            return data
+
+    def put(self, key, data):
+        # Stores an image, evicting the least recently used ones to stay under the limit
+        if len(data) > self.max_bytes:
+            return  # Would never fit, don't flush the whole cache for it
+        with self.lock:
+            old = self.entries.pop(key, None)
+            if old is not None:
+                self.size -= len(old)
+            self.entries[key] = data
+            self.size += len(data)
+            while self.size > self.max_bytes:
+                _, evicted = self.entries.popitem(last=False)
+                self.size -= len(evicted)
+
+    def __contains__(self, key):
+        with self.lock:
+            return key in self.entries
+
+    def clear(self):
+        with self.lock:
+            self.entries.clear()
+            self.size = 0
+
+
+# Background worker that renders requested tiles of one PDF into a PageCache: the
+# visible tiles in progressive mode, and the tiles of neighbouring pages. In progressive
+# mode it renders the low resolution preview of the missing tiles first.
+# Only the most recent request is kept, so flipping quickly never builds a backlog.
+class PagePrefetcher:
+    def __init__(self, pdf_path, cache):
+        self.pdf_path = pdf_path
+        self.cache = cache
+        self.pending = []                       # (page number, scale, column, row) still to render
+        self.preview_wanted = None              # Preview to render before any tile, see request_preview
+        self.preview_ready = (None, None)       # (preview, PPM bytes or None if it failed) of the last one
+        self.failed = set()                     # Tiles that couldn't be rendered, not tried again
+        self.broken = False                     # Set if the PDF couldn't be opened at all
+        self.condition = threading.Condition()  # Wakes the worker when there is work
+        self.closed = False
+        self.thread = threading.Thread(target=self._run, name="page-prefetch", daemon=True)
+        self.thread.start()
+
+    def prefetch(self, tiles):
+        # Replaces the pending work with the given tiles, skipping ones already cached
+        with self.condition:
+            self.pending = [tile for tile in tiles
+                            if (self.pdf_path,) + tuple(tile) not in self.cache and tuple(tile) not in self.failed]
+            self.condition.notify()
+
+    def request_preview(self, preview):
+        # Asks for a region of a page, as the arguments of PageRenderer.render_region_ppm,
+        # to be rendered before any tile. Replaces a preview still waiting.
+        with self.condition:
+            if self.preview_ready[0] != preview:
+                self.preview_wanted = preview
+                self.condition.notify()
+
+    def rendered_preview(self, preview):
+        # Returns the PPM bytes of a requested preview once it is rendered, or None
+        with self.condition:
+            return self.preview_ready[1] if self.preview_ready[0] == preview else None
+
+    def gave_up(self, tile):
+        # Whether the worker couldn't render a tile, so there is no use waiting for it
+        with self.condition:
+            return self.broken or tuple(tile) in self.failed
+
+    def close(self):
+        # Stops the worker after the tile it is currently rendering
+        with self.condition:
+            self.closed = True
+            self.pending = []
+            self.preview_wanted = None
+            self.condition.notify()
+
+    def _run(self):
+        # The worker has its own document so it never shares page objects with the UI
+        try:
+            document = fitz.open(self.pdf_path)
+        except Exception as e:
+            print("Pages can't be pre-rendered:", e)
+            with self.condition:
+                self.broken = True
+                self.pending = []
+            return
+        renderer = PageRenderer(document)
+        try:
+            while True:
+                with self.condition:
+                    while not self.pending and self.preview_wanted is None and not self.closed:
+                        self.condition.wait()
+                    if self.closed:
+                        return
+                    preview, self.preview_wanted = self.preview_wanted, None
+                    if preview is None:
+                        tile = self.pending.pop(0)
+
+                # A page that can't be rendered is skipped, the worker carries on with the rest
+                if preview is not None:
+                    ppm_data = None
+                    if 0 <= preview[0] < document.page_count:
+                        try:
+                            ppm_data = renderer.render_region_ppm(*preview)
+                        except Exception as e:
+                            print(f"Preview of page {preview[0] + 1} could not be rendered: {e}")
+                    with self.condition:
+                        self.preview_ready = (preview, ppm_data)
+                    continue
+                key = (self.pdf_path,) + tuple(tile)
+                if 0 <= tile[0] < document.page_count and key not in self.cache:
+                    try:
+                        self.cache.put(key, renderer.render_tile_ppm(*tile))
+                    except Exception as e:
+                        print(f"Page {tile[0] + 1} could not be rendered: {e}")
+                        with self.condition:
+                            self.failed.add(tuple(tile))
+        finally:
+            with renderer.lock:
+                document.close()
@@ -0,0 +1,106 @@
+# File: render.py
+# Project: CS 422 Project 1
+# Authors: ARA Team
+# Creation date: 10-18-2026
+# Description: This file contains the PDF page rendering helpers used by main.py. Pages are
+#              rendered by PyMuPDF straight into memory and handed to TKinter without
+#              touching the filesystem.
+
+# Modifications:
+# Date        Author       Change
+# ----------- ------------ -----------------------------------------------------
+# 10-18-2026  ARA Team     Initial creation of the file, in-memory PPM rendering
+# 10-18-2026  ARA Team     Serialize PyMuPDF calls between the UI and prefetch threads
+# 10-18-2026  ARA Team     Tile rendering for zoomed and HiDPI pages
+# 10-18-2026  ARA Team     Low resolution region rendering for progressive previews
+# 10-18-2026  ARA Team     One lock per renderer instead of one for the whole process, each thread has its own document
+# ==============================================================================
+
+import tkinter as tk  # Used to build the PhotoImage shown on the PDF canvas
+import threading  # Used to guard a renderer's document and parsed pages
+import math  # Used to work out the tile grid
+from collections import OrderedDict  # Keeps parsed pages in least-recently-used order
+import fitz  # PyMuPDF, used to render PDF pages into pixmaps
+
+# Zoomed pages are split into square tiles of this many device pixels, and only the
+# tiles inside the visible part of the canvas are ever rendered
+TILE_SIZE = 256
+
+
+def render_page_ppm(document, page_number, zoom=1.0):
+    # Renders a page of an open document and returns it as binary PPM bytes.
+    # PPM is just a tiny header followed by the raw RGB samples, so unlike PNG
+    # there is no compression step and the pixmap is copied exactly once. The document
+    # must not be in use on another thread.
+    page = document.load_page(page_number)
+    pix = page.get_pixmap(matrix=fitz.Matrix(zoom, zoom), alpha=False)
+    return pix.tobytes("ppm")
+
+
+def ppm_to_photo(ppm_data):
+    # Builds a TKinter PhotoImage from in-memory PPM bytes (must run on the Tk thread)
+    return tk.PhotoImage(data=ppm_data, format="PPM")
+
+
+def tile_grid(width, height, scale):
+    # Returns the (columns, rows) of tiles covering a width x height point page at scale
+    return math.ceil(width * scale / TILE_SIZE), math.ceil(height * scale / TILE_SIZE)
+
+
+def visible_tiles(width, height, scale, x0, y0, x1, y1):
+    # Returns the (column, row) of every tile overlapping the viewport (x0, y0)-(x1, y1),
+    # given in device pixels relative to the top left corner of the page
+    columns, rows = tile_grid(width, height, scale)
+    first_column, last_column = max(0, int(x0 // TILE_SIZE)), min(columns - 1, int((x1 - 1) // TILE_SIZE))
+    first_row, last_row = max(0, int(y0 // TILE_SIZE)), min(rows - 1, int((y1 - 1) // TILE_SIZE))
+    return [(column, row) for row in range(first_row, last_row + 1)
+            for column in range(first_column, last_column + 1)]
+
+
+# Renders tiles of the pages of one open document.
+# Each page is parsed once into a PyMuPDF display list, so rendering a tile only
+# rasterizes the clipped area instead of re-interpreting the whole page. Every thread that
+# renders opens its own document, so the lock only guards this one: renders of the other
+# threads' documents never wait for it.
+class PageRenderer:
+    def __init__(self, document, max_display_lists=4):
+        self.document = document
+        self.max_display_lists = max_display_lists
+        self.display_lists = OrderedDict()  # page number -> fitz.DisplayList, oldest first
+        self.lock = threading.Lock()        # Held around every use of the document
+
+    def page_size(self, page_number):
+        # Returns the (width, height) of a page in PDF points, without parsing its contents
+        with self.lock:
+            if page_number in self.display_lists:
+                rect = self.display_lists[page_number].rect
+            else:
+                rect = self.document.load_page(page_number).rect
+        return rect.width, rect.height
+
+    def render_tile_ppm(self, page_number, scale, column, row):
+        # Renders one tile of a page at scale (pixels per point) as binary PPM bytes
+        return self.render_region_ppm(page_number, scale, column * TILE_SIZE, row * TILE_SIZE,
+                                      (column + 1) * TILE_SIZE, (row + 1) * TILE_SIZE)
+
+    def render_region_ppm(self, page_number, scale, x0, y0, x1, y1, subsample=1):
+        # Renders the area (x0, y0)-(x1, y1), in device pixels at scale, of a page as binary
+        # PPM bytes. With subsample > 1 the area is rendered at 1/subsample of the resolution.
+        with self.lock:
+            display_list = self._display_list(page_number)
+            rect = display_list.rect
+            clip = fitz.Rect(rect.x0 + x0 / scale, rect.y0 + y0 / scale,
+                             rect.x0 + x1 / scale, rect.y0 + y1 / scale) & rect
+            matrix = fitz.Matrix(scale / subsample, scale / subsample)
+            pix = display_list.get_pixmap(matrix=matrix, clip=clip, alpha=False)
+            return pix.tobytes("ppm")
+
+    def _display_list(self, page_number):
+        # Returns the parsed page, keeping the few most recently used ones (caller holds self.lock)
+        display_list = self.display_lists.pop(page_number, None)
+        if display_list is None:
+            display_list = self.document.load_page(page_number).get_displaylist()
+        self.display_lists[page_number] = display_list
+        if len(self.display_lists) > self.max_display_lists:
+            self.display_lists.popitem(last=False)
+        return display_list
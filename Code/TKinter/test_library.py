@@ -0,0 +1,47 @@
+# File: test_library.py
+# Project: CS 422 Project 1
+# Authors: ARA Team
+# Creation date: 10-18-2026
+# Description: This file contains tests for the PDF library scan in library.py. They scan
+#              a temporary directory of PDFs made on the fly.
+#              Usage: python -m pytest Code/TKinter
+
+# Modifications:
+# Date        Author       Change
+# ----------- ------------ -----------------------------------------------------
+# 10-18-2026  ARA Team     Initial creation of the file, files that can't be stat'ed
+# ==============================================================================
+
+import os
+import tempfile
+import unittest
+from unittest import mock
+import fitz  # PyMuPDF, used to make the test PDF
+
+from library import PdfLibrary
+
+
+class PdfLibraryScanTest(unittest.TestCase):
+    def setUp(self):
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        self.directory = directory.name
+        document = fitz.open()
+        document.new_page()
+        document.save(os.path.join(self.directory, "good.pdf"))
+        document.close()
+
+    @unittest.skipUnless(hasattr(os, "symlink"), "needs symbolic links")
+    def test_broken_link_is_skipped(self):
+        try:
+            os.symlink(os.path.join(self.directory, "missing.pdf"), os.path.join(self.directory, "broken.pdf"))
+        except OSError:
+            self.skipTest("can't create symbolic links here")
+        library = PdfLibrary(self.directory, os.path.join(self.directory, "catalog.json"))
+        with mock.patch("builtins.print"):
+            self.assertEqual(library.scan(), 1)
+        self.assertEqual(list(library.files), [os.path.join(self.directory, "good.pdf")])
+
+
+if __name__ == "__main__":
+    unittest.main()
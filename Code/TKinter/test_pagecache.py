@@ -0,0 +1,81 @@
+# File: test_pagecache.py
+# Project: CS 422 Project 1
+# Authors: ARA Team
+# Creation date: 10-18-2026
+# Description: This file contains tests for the page cache and the prefetch worker in
+#              pagecache.py. They render a small PDF made on the fly and need no display.
+#              Usage: python -m pytest Code/TKinter
+
+# Modifications:
+# Date        Author       Change
+# ----------- ------------ -----------------------------------------------------
+# 10-18-2026  ARA Team     Initial creation of the file, a page that fails to render
+# ==============================================================================
+
+import os
+import tempfile
+import unittest
+from unittest import mock
+import fitz  # PyMuPDF, used to make the test PDF
+
+import pagecache
+from pagecache import PageCache, PagePrefetcher
+from render import PageRenderer
+
+WAIT_SECONDS = 5 # Longest wait for the worker
+
+
+# Renders like PageRenderer, except that every render of page 1 raises
+class FailingRenderer(PageRenderer):
+    def render_region_ppm(self, page_number, *args, **kwargs):
+        if page_number == 1:
+            raise RuntimeError("damaged page")
+        return super().render_region_ppm(page_number, *args, **kwargs)
+
+
+class PrefetcherFailureTest(unittest.TestCase):
+    def setUp(self):
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        self.pdf_path = os.path.join(directory.name, "pages.pdf")
+        document = fitz.open()
+        for _ in range(3):
+            document.new_page()
+        document.save(self.pdf_path)
+        document.close()
+
+        patch = mock.patch.object(pagecache, "PageRenderer", FailingRenderer)
+        patch.start()
+        self.addCleanup(patch.stop)
+        self.cache = PageCache()
+        self.prefetcher = PagePrefetcher(self.pdf_path, self.cache)
+        self.addCleanup(self.prefetcher.close)
+
+    def wait_for(self, condition):
+        with self.prefetcher.condition:
+            return self.prefetcher.condition.wait_for(condition, WAIT_SECONDS)
+
+    def test_failed_tile_is_skipped(self):
+        with mock.patch("builtins.print"):
+            self.prefetcher.prefetch([(1, 1.0, 0, 0), (2, 1.0, 0, 0)])
+            self.assertTrue(self.wait_for(lambda: not self.prefetcher.pending and (1, 1.0, 0, 0) in self.prefetcher.failed))
+            # The worker is still alive and renders the next page
+            self.assertTrue(self.wait_for(lambda: (self.pdf_path, 2, 1.0, 0, 0) in self.cache))
+        self.assertTrue(self.prefetcher.thread.is_alive())
+        self.assertTrue(self.prefetcher.gave_up((1, 1.0, 0, 0)))
+        self.assertFalse(self.prefetcher.gave_up((2, 1.0, 0, 0)))
+
+    def test_failed_preview_is_reported_once(self):
+        preview = (1, 1.0, 0, 0, 256, 256, 4)
+        with mock.patch("builtins.print"):
+            self.prefetcher.request_preview(preview)
+            self.assertTrue(self.wait_for(lambda: self.prefetcher.preview_ready[0] == preview))
+        self.assertIsNone(self.prefetcher.rendered_preview(preview))
+        self.assertTrue(self.prefetcher.thread.is_alive())
+
+        self.prefetcher.prefetch([(0, 1.0, 0, 0)])
+        self.assertTrue(self.wait_for(lambda: (self.pdf_path, 0, 1.0, 0, 0) in self.cache))
+
+
+if __name__ == "__main__":
+    unittest.main()
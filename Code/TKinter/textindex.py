@@ -0,0 +1,151 @@
+# File: textindex.py
+# Project: CS 422 Project 1
+# Authors: ARA Team
+# Creation date: 10-18-2026
+# Description: This file contains the full-text search index of the PDFs. The text of every
+#              page is extracted once with PyMuPDF into an inverted index (word -> pages and
+#              word positions), saved on disk under the file's content hash and loaded from
+#              there the next time, so a search never has to touch the PDF.
+#              Usage: python Code/TKinter/textindex.py [pdf ...] [--query TEXT]
+
+# Modifications:
+# Date        Author       Change
+# ----------- ------------ -----------------------------------------------------
+# 10-18-2026  ARA Team     Initial creation of the file
+# 10-18-2026  ARA Team     Indexing no longer takes the rendering lock, the indexed document is only used by the index build
+# ==============================================================================
+
+import os  # Used to find and write the index files
+import re  # Used to split text into words
+import json  # Index file format
+import glob  # Used to find the PDFs in Resources/
+import time  # Used to report build and search times
+import hashlib  # Used to key index files by the PDF's content
+import argparse  # Used to read the command line options
+import fitz  # PyMuPDF, used to extract the text of each page
+
+INDEX_DIR = os.path.join(os.path.expanduser("~"), ".ara", "index")
+INDEX_VERSION = 1 # Bump when the file format or tokenizer changes, old files are then rebuilt
+HASH_CHUNK_SIZE = 1024 * 1024
+
+WORD_PATTERN = re.compile(r"[^\W_]+") # Letters and digits, so "process-model" is two words
+
+
+def tokenize(text):
+    # Splits text into lower case words
+    return [word.lower() for word in WORD_PATTERN.findall(text)]
+
+
+def file_hash(path):
+    # SHA-256 of the file's contents, read in chunks
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(HASH_CHUNK_SIZE), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+# Inverted index of one PDF. postings maps each word to a list of (page, positions),
+# ordered by page, where positions are the word's offsets among the words of that page.
+class TextIndex:
+    def __init__(self, page_count, postings):
+        self.page_count = page_count
+        self.postings = postings
+
+    def search(self, query):
+        # Returns (page, hits) for every page containing the query, ordered by page.
+        # A query of several words matches them as a phrase.
+        terms = tokenize(query)
+        if not terms:
+            return []
+        following = [dict(self.postings.get(term, ())) for term in terms[1:]]
+        results = []
+        for page, positions in self.postings.get(terms[0], ()):
+            hits = positions
+            for offset, term_pages in enumerate(following, 1):
+                term_positions = set(term_pages.get(page, ()))
+                hits = [position for position in hits if position + offset in term_positions]
+                if not hits:
+                    break
+            if hits:
+                results.append((page, len(hits)))
+        return results
+
+    def to_json(self):
+        return {"version": INDEX_VERSION, "page_count": self.page_count,
+                "postings": {word: [[page, positions] for page, positions in pages]
+                             for word, pages in self.postings.items()}}
+
+    @staticmethod
+    def from_json(data):
+        postings = {word: [(page, positions) for page, positions in pages]
+                    for word, pages in data["postings"].items()}
+        return TextIndex(data["page_count"], postings)
+
+
+def build_index(pdf_path):
+    # Extracts the text of every page and builds its TextIndex
+    postings = {}
+    document = fitz.open(pdf_path)
+    try:
+        for page_number in range(document.page_count):
+            words = document.load_page(page_number).get_text("words")
+            pages = {}
+            position = 0
+            for entry in words:
+                for word in tokenize(entry[4]): # entry is (x0, y0, x1, y1, word, block, line, word number)
+                    pages.setdefault(word, []).append(position)
+                    position += 1
+            for word, positions in pages.items():
+                postings.setdefault(word, []).append((page_number, positions))
+        return TextIndex(document.page_count, postings)
+    finally:
+        document.close()
+
+
+def load_index(pdf_path, index_dir=INDEX_DIR):
+    # Returns the PDF's TextIndex, from disk if it was built before, otherwise building
+    # and saving it. Index files are named after the content hash, so a changed PDF gets
+    # a new index and copies of the same PDF share one.
+    index_path = os.path.join(index_dir, file_hash(pdf_path) + ".json")
+    if os.path.exists(index_path):
+        try:
+            with open(index_path, "r", encoding="utf-8") as f:
+                data = json.load(f)
+            if data.get("version") == INDEX_VERSION:
+                return TextIndex.from_json(data)
+        except ValueError:
+            print("Rebuilding damaged search index:", index_path)
+
+    index = build_index(pdf_path)
+    os.makedirs(index_dir, exist_ok=True)
+    temp_path = index_path + ".tmp"
+    with open(temp_path, "w", encoding="utf-8") as f:
+        json.dump(index.to_json(), f, separators=(",", ":"))
+    os.replace(temp_path, index_path) # Never leave a half written index behind
+    return index
+
+
+def main():
+    # Builds (or loads) the index of each PDF and reports how long it took
+    resources = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "..", "Resources")
+    parser = argparse.ArgumentParser(description="Build the full-text search index of PDFs.")
+    parser.add_argument("pdfs", nargs="*", help="PDF files, all of Resources/ by default")
+    parser.add_argument("--query", help="search each PDF for this text")
+    parser.add_argument("--index-dir", default=INDEX_DIR, help="where index files are kept")
+    args = parser.parse_args()
+
+    for pdf_path in args.pdfs or sorted(glob.glob(os.path.join(resources, "*.pdf"))):
+        start = time.perf_counter()
+        index = load_index(pdf_path, args.index_dir)
+        elapsed = (time.perf_counter() - start) * 1000
+        print(f"{os.path.basename(pdf_path)}: {index.page_count} pages, {len(index.postings)} words, {elapsed:.1f} ms")
+        if args.query:
+            start = time.perf_counter()
+            results = index.search(args.query)
+            elapsed = (time.perf_counter() - start) * 1000
+            print(f"  '{args.query}': pages {[page + 1 for page, _ in results]} in {elapsed:.2f} ms")
+
+
+if __name__ == "__main__":
+    main()
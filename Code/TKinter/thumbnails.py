@@ -0,0 +1,124 @@
+# File: thumbnails.py
+# Project: CS 422 Project 1
+# Authors: ARA Team
+# Creation date: 10-18-2026
+# Description: This file contains the page thumbnails shown in the navigator next to the PDF.
+#              A background worker renders the thumbnails the strip asks for at low
+#              resolution and keeps them as PNG files named after the PDF's content hash,
+#              so each PDF's thumbnails are only rendered once, not once per session.
+
+# Modifications:
+# Date        Author       Change
+# ----------- ------------ -----------------------------------------------------
+# 10-18-2026  ARA Team     Initial creation of the file
+# 10-18-2026  ARA Team     The worker's own document needs no lock, renders no longer wait for other threads
+# 10-18-2026  ARA Team     A page that fails is skipped instead of stopping the worker, keyed by the library's pdf_id
+# ==============================================================================
+
+import os  # Used to find and write the thumbnail files
+import threading  # Used to run the thumbnail worker off the Tk main thread
+import fitz  # PyMuPDF, the worker opens its own handle to the PDF
+
+
+THUMBNAIL_DIR = os.path.join(os.path.expanduser("~"), ".ara", "thumbnails")
+THUMBNAIL_WIDTH = 96 # Pixels, the height follows the page
+
+
+def render_thumbnail_png(document, page_number, width=THUMBNAIL_WIDTH):
+    # Renders a page of an open document width pixels wide, as PNG bytes. Thumbnails are
+    # small enough that compressing them costs little and keeps the cache small. The
+    # document must not be in use on another thread.
+    page = document.load_page(page_number)
+    scale = width / page.rect.width
+    pix = page.get_pixmap(matrix=fitz.Matrix(scale, scale), alpha=False)
+    return pix.tobytes("png")
+
+
+# Background worker that loads or renders the thumbnails of one PDF. The strip asks for
+# the pages in view with request() and picks up finished ones with take(). Only the most
+# recent request is kept, so scrolling quickly never builds a backlog. pdf_id is the
+# library's content hash of the PDF, see PdfLibrary.
+class ThumbnailStore:
+    def __init__(self, pdf_path, pdf_id, directory=THUMBNAIL_DIR, width=THUMBNAIL_WIDTH):
+        self.pdf_path = pdf_path
+        self.pdf_id = pdf_id
+        self.directory = directory
+        self.width = width
+        self.pending = []                       # Page numbers still to load
+        self.ready = {}                         # page number -> PNG bytes, not taken yet
+        self.failed = set()                     # Pages that couldn't be loaded, not asked for again
+        self.working = False                    # Set while the worker loads a page
+        self.condition = threading.Condition()  # Wakes the worker when there is work
+        self.closed = False
+        self.thread = threading.Thread(target=self._run, name="thumbnails", daemon=True)
+        self.thread.start()
+
+    def request(self, pages):
+        # Replaces the pending work with the given pages
+        with self.condition:
+            self.pending = [page for page in pages if page not in self.ready and page not in self.failed]
+            self.condition.notify()
+
+    def take(self):
+        # Returns the thumbnails finished since the last call, as page number -> PNG bytes
+        with self.condition:
+            ready, self.ready = self.ready, {}
+            return ready
+
+    def busy(self):
+        # Whether a requested thumbnail hasn't been taken yet
+        with self.condition:
+            return bool(self.pending or self.ready or self.working)
+
+    def close(self):
+        # Stops the worker after the page it is currently loading
+        with self.condition:
+            self.closed = True
+            self.pending = []
+            self.condition.notify()
+
+    def _run(self):
+        # Thumbnails are kept per content hash and width, so a changed PDF gets new ones
+        cache_dir = os.path.join(self.directory, f"{self.pdf_id}-{self.width}")
+        document = None # Only opened if a thumbnail isn't on disk yet
+        try:
+            while True:
+                with self.condition:
+                    while not self.pending and not self.closed:
+                        self.condition.wait()
+                    if self.closed:
+                        return
+                    page_number = self.pending.pop(0)
+                    self.working = True
+
+                path = os.path.join(cache_dir, f"{page_number}.png")
+                try:
+                    try:
+                        with open(path, "rb") as f:
+                            data = f.read()
+                    except FileNotFoundError:
+                        if document is None:
+                            document = fitz.open(self.pdf_path) # Only this thread uses it
+                        data = render_thumbnail_png(document, page_number, self.width)
+                        os.makedirs(cache_dir, exist_ok=True)
+                        temp_path = path + ".tmp"
+                        with open(temp_path, "wb") as f:
+                            f.write(data)
+                        os.replace(temp_path, path) # Never leave a half written thumbnail behind
+                except Exception as e: # A damaged page or a full disk only costs that thumbnail
+                    print(f"Thumbnail of page {page_number + 1} could not be made: {e}")
+                    data = None
+
+                with self.condition:
+                    if data is None:
+                        self.failed.add(page_number)
+                    else:
+                        self.ready[page_number] = data
+                    self.working = False
+        finally:
+            # Nothing is left looking busy if the worker stops
+            with self.condition:
+                self.pending = []
+                self.working = False
+            if document is not None:
+                document.close()